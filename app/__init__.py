@@ -9,7 +9,6 @@ from flask import Flask
 
 from app.extensions import db as sa_db, login_manager, csrf, limiter
 
-from app.db.mongo import close_mongo_client
 from config import Config  # <-- use ROOT config.py, not app.config
 
 if TYPE_CHECKING:
@@ -47,16 +46,96 @@ def create_app(config_object: type[ConfigType] | None = None) -> Flask:
     login_manager.login_view = "auth.login"  # type: ignore[assignment]
     login_manager.login_message_category = "info"
 
-    # ----------------- Ensure Mongo Indexes -----------------
-    # Important: do NOT let the whole app crash if duplicates exist in dev.
+    # ----------------- SQLite additive columns -----------------
     with app.app_context():
         try:
-            from app.db.mongo import ensure_patient_indexes
-            ensure_patient_indexes()
+            from app.db.schema import ensure_sql_columns
+            ensure_sql_columns()
         except Exception as exc:
-            # If you still have duplicates, you'll see DuplicateKeyError here.
-            # Run the dedupe script, then restart.
-            app.logger.warning(f"Mongo index creation skipped/failed: {exc!r}")
+            app.logger.warning(f"SQL column check skipped/failed: {exc!r}")
+
+    # ----------------- Audit log writer -----------------
+    from app.utils.audit import configure_audit_sink
+
+    with app.app_context():
+        configure_audit_sink(
+            sa_db.engine,
+            enabled=app.config.get("AUDIT_ASYNC_ENABLED", False),
+            batch_size=app.config.get("AUDIT_BATCH_SIZE", 100),
+            flush_ms=app.config.get("AUDIT_FLUSH_MS", 200),
+            max_queue=app.config.get("AUDIT_MAX_QUEUE", 10000),
+        )
+
+    # ----------------- Prediction daily rollup -----------------
+    # Importing registers the StrokePrediction insert / delete listeners
+    from app.db.prediction_rollup import rollup_cli
+
+    app.cli.add_command(rollup_cli)
+
+    # ----------------- Admin dashboard KPI cache -----------------
+    from app.db.admin_kpis import configure_kpi_cache
+
+    configure_kpi_cache(app.config.get("KPI_CACHE_TTL_SECONDS", 30))
+
+    # ----------------- Mongo indexes -----------------
+    # Indexes are managed with `flask indexes diff|apply` (app/db/indexes.py);
+    # startup only compares the applied index set version with the spec.
+    from app.db.indexes import check_patient_indexes, indexes_cli
+
+    app.cli.add_command(indexes_cli)
+
+    with app.app_context():
+        try:
+            status = check_patient_indexes(apply=app.config.get("MONGO_APPLY_INDEXES_ON_START", False))
+            if not status["current"]:
+                app.logger.warning(
+                    f"Mongo index set is {status['recorded'] or 'not applied'}, "
+                    f"spec is {status['expected']}: run `flask indexes apply`"
+                )
+        except Exception as exc:
+            # If duplicates exist, applying fails with DuplicateKeyError:
+            # run the dedupe script, then `flask indexes apply`.
+            app.logger.warning(f"Mongo index check skipped/failed: {exc!r}")
+
+    # ----------------- ML model (opt-in eager warm-up) -----------------
+    from app.ml import predict_service
+
+    predict_service.configure_model_loading(mmap=app.config.get("ML_MODEL_MMAP", False))
+    predict_service.configure_prediction_cache(
+        maxsize=app.config.get("ML_CACHE_SIZE", 4096),
+        ttl_seconds=app.config.get("ML_CACHE_TTL_SECONDS", 3600),
+    )
+    if app.config.get("ML_PRELOAD_MODEL", False):
+        try:
+            report = predict_service.warm_up_model()
+            app.logger.info(f"ML model warm-up: {report}")
+        except FileNotFoundError as exc:
+            app.logger.warning(f"ML model warm-up skipped: {exc}")
+
+    # Micro-batching for concurrent single-row predictions (opt-in)
+    from app.ml.batcher import PredictionQueueFull, configure_batcher
+
+    configure_batcher(
+        enabled=app.config.get("ML_BATCHING_ENABLED", False),
+        max_batch_rows=app.config.get("ML_BATCH_MAX_ROWS", 32),
+        max_wait_ms=app.config.get("ML_BATCH_MAX_WAIT_MS", 2),
+        max_queue=app.config.get("ML_BATCH_MAX_QUEUE", 1024),
+        timeout_seconds=app.config.get("ML_BATCH_TIMEOUT_SECONDS", 5),
+    )
+
+    @app.errorhandler(PredictionQueueFull)
+    def _prediction_queue_full(exc: PredictionQueueFull):
+        # Backpressure: shed load instead of queueing without bound
+        return "Prediction service is busy, please retry shortly.", 503, {"Retry-After": "1"}
+
+    # Hot reload: pick up a new instance/stroke_model.joblib without restart
+    watch_seconds = float(app.config.get("ML_MODEL_WATCH_SECONDS", 0) or 0)
+    if watch_seconds > 0:
+        from app.ml.registry import ensure_model_watcher, start_model_watcher
+
+        start_model_watcher(watch_seconds)
+        # gunicorn --preload forks after this point; restart in each worker
+        app.before_request(ensure_model_watcher)
 
     # ----------------- Blueprints -----------------
     from app.routes.auth import bp as auth_bp
@@ -77,10 +156,8 @@ def create_app(config_object: type[ConfigType] | None = None) -> Flask:
     app.register_blueprint(admin_bp)
     app.register_blueprint(privacy_bp)
 
-    # ----------------- Teardown Mongo -----------------
-    @app.teardown_appcontext
-    def teardown_mongo(exception: BaseException | None) -> None:  # pragma: no cover
-        close_mongo_client(None)
+    # NOTE: no per-request Mongo teardown – app.db.mongo keeps one pooled
+    # client per worker process and closes it at interpreter exit.
 
     # ----------------- Logging (optional) -----------------
     if not app.debug and not app.testing:
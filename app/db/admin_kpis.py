@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from app.extensions import db
+from app.models import Session, StrokePrediction, User
+
+
+# ----------------------------------------------------------------------
+# Admin dashboard KPIs
+# ----------------------------------------------------------------------
+# One aggregate query per table (users grouped by role, predictions
+# total + today, sessions) instead of a COUNT per number, and the
+# resulting snapshot is cached per process for KPI_CACHE_TTL_SECONDS.
+# Any ORM insert / update / delete of a User or StrokePrediction marks
+# its session, and the cached snapshot is dropped when that transaction
+# commits or rolls back – never at flush, where a snapshot rebuilt before
+# a rollback would outlive it. This worker's dashboard reflects its own
+# writes at once; other workers catch up within the TTL. Core bulk writes
+# (purge_predictions) mark the session themselves.
+
+USER_ROLES = ("admin", "doctor", "hcp", "patient")
+
+
+def compute_admin_kpis(now: datetime | None = None) -> Dict[str, int]:
+    """Dashboard numbers in three queries: user, stroke_predictions, sessions."""
+    now = now or datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # GROUP BY role: one scan of the covering ix_user_role
+    by_role = dict(
+        db.session.query(User.role, func.count()).group_by(User.role).all()
+    )
+
+    # Both counts in one statement; "today" is a range on
+    # ix_stroke_predictions_created_at, not a CASE over every row
+    total_predictions, predictions_today = db.session.query(
+        select(func.count()).select_from(StrokePrediction).scalar_subquery(),
+        select(func.count())
+        .where(StrokePrediction.created_at >= today_start)
+        .scalar_subquery(),
+    ).one()
+
+    active_sessions = db.session.query(func.count(Session.id)).scalar()
+
+    return {
+        "total_users": int(sum(by_role.values())),
+        "admin_count": int(by_role.get("admin", 0)),
+        "doctor_count": int(by_role.get("doctor", 0)),
+        "hcp_count": int(by_role.get("hcp", 0)),
+        "patient_count": int(by_role.get("patient", 0)),
+        "total_predictions": int(total_predictions),
+        "predictions_today": int(predictions_today),
+        "active_sessions": int(active_sessions or 0),
+    }
+
+
+class KpiSnapshotCache:
+    """
+    Single-entry TTL cache for the KPI snapshot.
+
+    `invalidate` bumps a generation counter: a snapshot computed while a
+    write landed is returned to its caller but not stored, so a stale
+    result can never outlive the invalidation.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self._lock = threading.Lock()
+        self._value: Dict[str, int] | None = None
+        self._day: str | None = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, compute: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+        today = datetime.utcnow().date().isoformat()
+        with self._lock:
+            if (
+                self._value is not None
+                and self._day == today  # "predictions today" resets at midnight
+                and time.monotonic() < self._expires_at
+            ):
+                self.hits += 1
+                return dict(self._value)
+            self.misses += 1
+            generation = self._generation
+
+        snapshot = compute()
+
+        if self.ttl_seconds > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._value = dict(snapshot)
+                    self._day = today
+                    self._expires_at = time.monotonic() + self.ttl_seconds
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl_seconds,
+                "cached": self._value is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+_CACHE = KpiSnapshotCache()
+
+
+def configure_kpi_cache(ttl_seconds: float = 30.0) -> KpiSnapshotCache:
+    """Set the snapshot TTL (0 disables caching) and drop any cached snapshot."""
+    _CACHE.ttl_seconds = float(ttl_seconds)
+    _CACHE.invalidate()
+    return _CACHE
+
+
+def get_admin_kpis() -> Dict[str, int]:
+    return _CACHE.get(compute_admin_kpis)
+
+
+def invalidate_admin_kpis(*_: Any) -> None:
+    _CACHE.invalidate()
+
+
+def get_kpi_cache_stats() -> Dict[str, Any]:
+    return _CACHE.stats()
+
+
+_DIRTY_KEY = "admin_kpis_dirty"
+
+
+def invalidate_admin_kpis_on_commit(session: Any = None) -> None:
+    """Drop the snapshot when `session`'s (default: db.session) transaction ends."""
+    (session if session is not None else db.session()).info[_DIRTY_KEY] = True
+
+
+def _mark_dirty(mapper: Any, connection: Any, target: Any) -> None:
+    session = object_session(target)
+    if session is not None:
+        invalidate_admin_kpis_on_commit(session)
+
+
+def _on_transaction_end(session: OrmSession) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        _CACHE.invalidate()
+
+
+for _model in (User, StrokePrediction):
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _mark_dirty)
+
+event.listen(OrmSession, "after_commit", _on_transaction_end)
+event.listen(OrmSession, "after_rollback", _on_transaction_end)
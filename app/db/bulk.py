@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, TypeVar
+
+from pymongo.errors import BulkWriteError
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of up to `size` items without materialising the input."""
+    if size < 1:
+        raise ValueError("size must be >= 1")
+
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BulkWriter:
+    """
+    Run unordered `bulk_write` calls on a small pool of writer threads.
+
+    The caller keeps producing (parsing + scoring) the next chunk while
+    earlier chunks are in flight. At most `writers * 2` chunks are queued,
+    so memory stays bounded on multi-million-row feeds. With ordered=False
+    a bad document does not stop the rest of its chunk; such failures are
+    counted in `write_errors`.
+    """
+
+    def __init__(self, collection: Any, writers: int = 2) -> None:
+        if writers < 1:
+            raise ValueError("writers must be >= 1")
+
+        self.collection = collection
+        self._pool = ThreadPoolExecutor(max_workers=writers, thread_name_prefix="bulk-writer")
+        self._slots = threading.BoundedSemaphore(writers * 2)
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+
+        self.started_at = time.perf_counter()
+        self.batches = 0
+        self.operations = 0
+        self.matched = 0
+        self.modified = 0
+        self.upserted = 0
+        self.write_errors = 0
+
+    def submit(self, operations: List[Any]) -> None:
+        if not operations:
+            return
+
+        self._reap()
+        self._slots.acquire()  # backpressure: wait for a free writer slot
+        try:
+            future = self._pool.submit(self._write, operations)
+        except BaseException:
+            # e.g. the pool is already shut down: the slot was never used
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _reap(self) -> None:
+        # Drop finished chunks; fail fast if one raised (e.g. lost server)
+        pending = []
+        for future in self._futures:
+            if not future.done():
+                pending.append(future)
+            else:
+                future.result()
+        self._futures = pending
+
+    def _write(self, operations: List[Any]) -> None:
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            details = {
+                "nMatched": result.matched_count,
+                "nModified": result.modified_count,
+                "nUpserted": result.upserted_count,
+                "writeErrors": [],
+            }
+        except BulkWriteError as exc:
+            details = exc.details
+
+        with self._lock:
+            self.batches += 1
+            self.operations += len(operations)
+            self.matched += details.get("nMatched", 0)
+            self.modified += details.get("nModified", 0)
+            self.upserted += details.get("nUpserted", 0)
+            self.write_errors += len(details.get("writeErrors", []))
+
+    def close(self) -> dict:
+        """Wait for every chunk, re-raise the first non-bulk error, return stats."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._pool.shutdown(wait=True)
+        return self.stats()
+
+    def stats(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started_at
+            return {
+                "batches": self.batches,
+                "operations": self.operations,
+                "matched": self.matched,
+                "modified": self.modified,
+                "upserted": self.upserted,
+                "write_errors": self.write_errors,
+                "elapsed_seconds": elapsed,
+                "ops_per_second": self.operations / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self._pool.shutdown(wait=True, cancel_futures=True)
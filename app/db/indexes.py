@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+import click
+from flask.cli import AppGroup
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.db.mongo import get_meta_collection, get_patient_collection
+
+
+# ----------------------------------------------------------------------
+# Declarative index spec for the patients collection
+# ----------------------------------------------------------------------
+# The desired indexes live here, not in create_index calls at startup.
+# `flask indexes diff` compares them with list_indexes(); `flask indexes
+# apply` creates / rebuilds / drops only what differs and records the
+# applied spec's fingerprint in the meta collection. Application start
+# only compares that recorded fingerprint with INDEX_SET_VERSION (one
+# find_one).
+#
+# Every list view queries active patients only, so most list indexes are
+# partial on is_active: true – smaller, and is_active needs no key slot.
+
+ACTIVE_ONLY: Dict[str, Any] = {"system_metadata.is_active": True}
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    keys: Tuple[Tuple[str, int], ...]
+    unique: bool = False
+    partial: Dict[str, Any] | None = field(default=None, hash=False)
+
+    def to_document(self) -> Dict[str, Any]:
+        """Comparable form, shaped like a list_indexes() entry."""
+        doc: Dict[str, Any] = {"name": self.name, "key": [list(k) for k in self.keys]}
+        if self.unique:
+            doc["unique"] = True
+        if self.partial is not None:
+            doc["partialFilterExpression"] = self.partial
+        return doc
+
+    def to_model(self) -> IndexModel:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.partial is not None:
+            options["partialFilterExpression"] = self.partial
+        return IndexModel(list(self.keys), **options)
+
+
+PATIENT_INDEXES: Tuple[IndexSpec, ...] = (
+    # Upsert key of the Kaggle importers; manual patients have no original_id
+    IndexSpec(
+        "uniq_original_id_if_int",
+        (("original_id", ASCENDING),),
+        unique=True,
+        partial={"original_id": {"$type": "int"}},
+    ),
+    # doctor_patients: keyset pages on (score desc, original_id, _id)
+    IndexSpec(
+        "idx_active_score_oid",
+        (
+            ("risk_assessment.score", DESCENDING),
+            ("original_id", ASCENDING),
+            ("_id", ASCENDING),
+        ),
+        partial=ACTIVE_ONLY,
+    ),
+    # doctor_patients with a risk filter; dashboard high-risk counts
+    IndexSpec(
+        "idx_active_level_score_oid",
+        (
+            ("risk_assessment.level", ASCENDING),
+            ("risk_assessment.score", DESCENDING),
+            ("original_id", ASCENDING),
+            ("_id", ASCENDING),
+        ),
+        partial=ACTIVE_ONLY,
+    ),
+    # hcp_patients: sorted by original_id, with and without a risk filter.
+    # Not partial: the search $or branches (original_id / name) are
+    # planned on their own and must be able to use an index each.
+    IndexSpec("idx_oid", (("original_id", ASCENDING), ("_id", ASCENDING))),
+    IndexSpec("idx_demo_name", (("demographics.name", ASCENDING),)),
+    IndexSpec(
+        "idx_active_level_oid",
+        (("risk_assessment.level", ASCENDING), ("original_id", ASCENDING)),
+        partial=ACTIVE_ONLY,
+    ),
+    # hcp_patients_high: level == "High", oldest first
+    IndexSpec(
+        "idx_active_level_age",
+        (("risk_assessment.level", ASCENDING), ("demographics.age", DESCENDING)),
+        partial=ACTIVE_ONLY,
+    ),
+    # admin_patients: also lists unflagged / inactive documents, so these
+    # are not partial; "newest" without a risk filter uses _id_
+    IndexSpec(
+        "idx_level_id",
+        (("risk_assessment.level", ASCENDING), ("_id", DESCENDING)),
+    ),
+    IndexSpec(
+        "idx_score_id",
+        (("risk_assessment.score", DESCENDING), ("_id", ASCENDING)),
+    ),
+    IndexSpec(
+        "idx_level_score_id",
+        (
+            ("risk_assessment.level", ASCENDING),
+            ("risk_assessment.score", DESCENDING),
+            ("_id", ASCENDING),
+        ),
+    ),
+)
+
+
+def index_set_version(specs: Sequence[IndexSpec] = PATIENT_INDEXES) -> str:
+    """Fingerprint of an index set (changes whenever any spec changes)."""
+    payload = json.dumps([s.to_document() for s in specs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+INDEX_SET_VERSION = index_set_version()
+
+_META_ID = "patients.indexes"
+
+
+# ----------------------------------------------------------------------
+# Diff / apply
+# ----------------------------------------------------------------------
+@dataclass
+class IndexDiff:
+    create: List[IndexSpec] = field(default_factory=list)
+    rebuild: List[IndexSpec] = field(default_factory=list)  # same name, other definition
+    drop: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.create or self.rebuild or self.drop)
+
+
+def _existing_document(info: Dict[str, Any]) -> Dict[str, Any]:
+    doc: Dict[str, Any] = {
+        "name": info["name"],
+        "key": [[k, int(v) if isinstance(v, (int, float)) else v] for k, v in info["key"].items()],
+    }
+    if info.get("unique"):
+        doc["unique"] = True
+    if info.get("partialFilterExpression") is not None:
+        doc["partialFilterExpression"] = json.loads(
+            json.dumps(info["partialFilterExpression"], default=str)
+        )
+    return doc
+
+
+def diff_indexes(coll: Any, specs: Sequence[IndexSpec] = PATIENT_INDEXES) -> IndexDiff:
+    """Compare `specs` with the collection's list_indexes()."""
+    existing = {
+        info["name"]: _existing_document(info)
+        for info in coll.list_indexes()
+        if info["name"] != "_id_"
+    }
+
+    result = IndexDiff()
+    for spec in specs:
+        current = existing.pop(spec.name, None)
+        if current is None:
+            result.create.append(spec)
+        elif current != json.loads(json.dumps(spec.to_document(), default=str)):
+            result.rebuild.append(spec)
+        else:
+            result.unchanged.append(spec.name)
+
+    result.drop = sorted(existing)
+    return result
+
+
+def apply_indexes(
+    coll: Any,
+    meta: Any,
+    specs: Sequence[IndexSpec] = PATIENT_INDEXES,
+    prune: bool = True,
+) -> IndexDiff:
+    """
+    Bring the collection in line with `specs` and record the version.
+
+    Indexes whose definition changed are dropped and rebuilt; indexes not
+    in the spec are dropped unless `prune` is False. All creations go in
+    one createIndexes command.
+    """
+    diff = diff_indexes(coll, specs)
+
+    for spec in diff.rebuild:
+        coll.drop_index(spec.name)
+    if prune:
+        for name in diff.drop:
+            coll.drop_index(name)
+
+    to_create = diff.create + diff.rebuild
+    if to_create:
+        coll.create_indexes([spec.to_model() for spec in to_create])
+
+    version = index_set_version(specs)
+    now = datetime.utcnow()
+    meta.update_one(
+        {"_id": _META_ID},
+        {
+            "$set": {"version": version, "applied_at": now, "indexes": [s.name for s in specs]},
+            "$push": {
+                "history": {
+                    "$each": [
+                        {
+                            "version": version,
+                            "applied_at": now,
+                            "created": [s.name for s in diff.create],
+                            "rebuilt": [s.name for s in diff.rebuild],
+                            "dropped": diff.drop if prune else [],
+                        }
+                    ],
+                    "$slice": -20,
+                }
+            },
+        },
+        upsert=True,
+    )
+    return diff
+
+
+def recorded_index_version(meta: Any) -> str | None:
+    doc = meta.find_one({"_id": _META_ID}, {"version": 1})
+    return doc.get("version") if doc else None
+
+
+def check_patient_indexes(apply: bool = False) -> Dict[str, Any]:
+    """
+    Startup check: one find_one on the meta collection. With `apply`
+    (dev convenience) an outdated index set is applied right away.
+    """
+    meta = get_meta_collection()
+    recorded = recorded_index_version(meta)
+
+    if recorded != INDEX_SET_VERSION and apply:
+        apply_indexes(get_patient_collection(), meta)
+        recorded = INDEX_SET_VERSION
+
+    return {
+        "expected": INDEX_SET_VERSION,
+        "recorded": recorded,
+        "current": recorded == INDEX_SET_VERSION,
+    }
+
+
+# ----------------------------------------------------------------------
+# flask indexes diff | apply | status
+# ----------------------------------------------------------------------
+indexes_cli = AppGroup("indexes", help="Manage the patients collection indexes.")
+
+
+def _echo_diff(diff: IndexDiff, prune: bool = True) -> None:
+    for spec in diff.create:
+        click.echo(f"  + {spec.name}")
+    for spec in diff.rebuild:
+        click.echo(f"  ~ {spec.name} (definition changed, rebuild)")
+    for name in diff.drop:
+        click.echo(f"  - {name}" + ("" if prune else " (kept)"))
+    click.echo(f"  = {len(diff.unchanged)} unchanged")
+
+
+@indexes_cli.command("diff")
+def indexes_diff() -> None:
+    """Show what `apply` would change."""
+    diff = diff_indexes(get_patient_collection())
+    click.echo(f"Index set {INDEX_SET_VERSION}:")
+    _echo_diff(diff)
+    if not diff.is_empty:
+        raise SystemExit(1)
+
+
+@indexes_cli.command("apply")
+@click.option("--keep-extra", is_flag=True, help="Do not drop indexes missing from the spec.")
+def indexes_apply(keep_extra: bool) -> None:
+    """Create / rebuild / drop indexes to match the spec."""
+    diff = apply_indexes(get_patient_collection(), get_meta_collection(), prune=not keep_extra)
+    click.echo(f"Applied index set {INDEX_SET_VERSION}:")
+    _echo_diff(diff, prune=not keep_extra)
+
+
+@indexes_cli.command("status")
+def indexes_status() -> None:
+    """Compare the recorded index set version with this code's spec."""
+    recorded = recorded_index_version(get_meta_collection())
+    click.echo(f"spec {INDEX_SET_VERSION}, applied {recorded or 'never'}")
+    if recorded != INDEX_SET_VERSION:
+        raise SystemExit(1)
@@ -1,19 +1,180 @@
 from __future__ import annotations
 
-from flask import current_app, g
-from pymongo import MongoClient, ASCENDING
-from pymongo.errors import DuplicateKeyError
+import atexit
+import os
+import threading
+from typing import Any
+
+from flask import current_app
+from pymongo import MongoClient, monitoring
+
+
+# ----------------------------------------------------------------------
+# Process-wide client manager
+# ----------------------------------------------------------------------
+# One MongoClient (and therefore one connection pool) per worker process.
+# PyMongo clients are thread-safe but NOT fork-safe, so the owning PID is
+# recorded and a fresh client is built the first time a forked child
+# (e.g. a gunicorn worker) asks for one.
+
+_CLIENT: MongoClient | None = None
+_CLIENT_PID: int | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Counts connection pool events so we can see how well connections
+    are being re-used under load (checkouts vs. connections created).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.pools_created = 0
+            self.pools_cleared = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checkout_failures = 0
+
+    def _inc(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def pool_created(self, event: Any) -> None:
+        self._inc("pools_created")
+
+    def pool_ready(self, event: Any) -> None:
+        pass
+
+    def pool_cleared(self, event: Any) -> None:
+        self._inc("pools_cleared")
+
+    def pool_closed(self, event: Any) -> None:
+        pass
+
+    def connection_created(self, event: Any) -> None:
+        self._inc("connections_created")
+
+    def connection_ready(self, event: Any) -> None:
+        pass
+
+    def connection_closed(self, event: Any) -> None:
+        self._inc("connections_closed")
+
+    def connection_check_out_started(self, event: Any) -> None:
+        pass
+
+    def connection_check_out_failed(self, event: Any) -> None:
+        self._inc("checkout_failures")
+
+    def connection_checked_out(self, event: Any) -> None:
+        self._inc("checkouts")
+
+    def connection_checked_in(self, event: Any) -> None:
+        self._inc("checkins")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pools_created": self.pools_created,
+                "pools_cleared": self.pools_cleared,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_open": self.connections_created - self.connections_closed,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_failures": self.checkout_failures,
+                "in_use": self.checkouts - self.checkins,
+            }
+
+
+_POOL_STATS = _PoolStatsListener()
+
+
+def _client_options(config: Any) -> dict:
+    """
+    Build MongoClient keyword options from the Flask config.
+    Anything left as None falls back to the PyMongo default.
+    """
+    options = {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": config.get("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "connectTimeoutMS": config.get("MONGO_CONNECT_TIMEOUT_MS"),
+        "socketTimeoutMS": config.get("MONGO_SOCKET_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def _reset_after_fork() -> None:
+    """
+    Drop the inherited client in a forked child WITHOUT closing it –
+    its sockets belong to the parent process.
+    """
+    global _CLIENT, _CLIENT_PID, _CLIENT_LOCK
+    _CLIENT = None
+    _CLIENT_PID = None
+    _CLIENT_LOCK = threading.Lock()
+    _POOL_STATS.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
 def _get_mongo_client() -> MongoClient:
     """
-    Lazily create a MongoClient bound to the current Flask app context.
-    Re-used for the duration of the request / CLI command via flask.g.
+    Return the process-wide MongoClient, creating it on first use.
+
+    The client (and its connection pool) is shared by every request and
+    CLI command in this process. If we detect that we are running in a
+    different PID than the one that created the client (fork without the
+    at-fork hook), a new client is created for this process.
+    """
+    global _CLIENT, _CLIENT_PID
+
+    pid = os.getpid()
+    client = _CLIENT
+    if client is not None and _CLIENT_PID == pid:
+        return client
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT_PID != pid:
+            if _CLIENT_PID != pid:
+                _POOL_STATS.reset()
+            uri = current_app.config["MONGO_URI"]
+            _CLIENT = MongoClient(
+                uri,
+                event_listeners=[_POOL_STATS],
+                **_client_options(current_app.config),
+            )
+            _CLIENT_PID = pid
+        return _CLIENT
+
+
+def get_pool_stats() -> dict:
+    """
+    Connection pool statistics for the current worker process.
+
+    A healthy, well re-used pool shows `checkouts` growing much faster
+    than `connections_created`.
     """
-    if "mongo_client" not in g:
-        uri = current_app.config["MONGO_URI"]
-        g.mongo_client = MongoClient(uri)
-    return g.mongo_client
+    stats = _POOL_STATS.snapshot()
+    stats["pid"] = os.getpid()
+    stats["client_initialised"] = _CLIENT is not None and _CLIENT_PID == os.getpid()
+    if stats["client_initialised"]:
+        opts = _CLIENT.options.pool_options  # type: ignore[union-attr]
+        stats["max_pool_size"] = opts.max_pool_size
+        stats["min_pool_size"] = opts.min_pool_size
+    return stats
 
 
 def get_patient_collection():
@@ -27,37 +188,31 @@ def get_patient_collection():
     return client[db_name][coll_name]
 
 
-def ensure_patient_indexes() -> None:
+def get_meta_collection():
     """
-    Create indexes for the patients collection.
-
-    - Unique index on original_id (ONLY for imported Kaggle patients)
-      using a partial index so manual patients (original_id=None) are allowed.
-    - Helpful query indexes for your list/filter screens.
+    Small collection for schema bookkeeping (e.g. the applied index set
+    version, see app/db/indexes.py), in the same database.
     """
-    coll = get_patient_collection()
-
-    # 1) Unique original_id for imported dataset docs (ints only)
-    # NOTE: Will throw DuplicateKeyError if duplicates already exist.
-    coll.create_index(
-        [("original_id", ASCENDING)],
-        name="uniq_original_id_if_int",
-        unique=True,
-        partialFilterExpression={"original_id": {"$type": "int"}},
-    )
-
-    # 2) Common query indexes (non-unique)
-    coll.create_index([("system_metadata.is_active", ASCENDING)], name="idx_is_active")
-    coll.create_index([("risk_assessment._level", ASCENDING)], name="idx_risk_level__underscore")
-    coll.create_index([("risk_assessment.level", ASCENDING)], name="idx_risk_level")
-    coll.create_index([("demographics.age", ASCENDING)], name="idx_demo_age")
-    coll.create_index([("demographics.name", ASCENDING)], name="idx_demo_name")
+    client = _get_mongo_client()
+    db_name = current_app.config.get("MONGO_DB_NAME", "strokecare")
+    coll_name = current_app.config.get("MONGO_META_COLLECTION", "schema_meta")
+    return client[db_name][coll_name]
 
 
 def close_mongo_client(exception: Exception | None = None) -> None:  # pragma: no cover
     """
-    Teardown handler – closes the client at the end of the request / CLI execution.
+    Close the process-wide client. Registered with atexit – NOT per request,
+    so the connection pool survives across requests.
     """
-    client: MongoClient | None = g.pop("mongo_client", None)
-    if client is not None:
+    global _CLIENT, _CLIENT_PID
+
+    with _CLIENT_LOCK:
+        client, _CLIENT = _CLIENT, None
+        owner, _CLIENT_PID = _CLIENT_PID, None
+
+    # Never close a client inherited from a parent process.
+    if client is not None and owner == os.getpid():
         client.close()
+
+
+atexit.register(close_mongo_client)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Callable, List, Sequence, Tuple
+
+from bson import SON, ObjectId, json_util
+
+
+# ----------------------------------------------------------------------
+# Keyset (cursor) pagination for Mongo list views
+# ----------------------------------------------------------------------
+# Instead of skip/offset, each page asks for the rows strictly after (or
+# before) the sort key of the last (first) row already shown. With an
+# index on the sort key, every page is one index range scan no matter
+# how deep the user pages.
+#
+# The sort key must be unique, so callers end it with ("_id", 1).
+# Fields may be null / missing: Mongo sorts those BEFORE every value,
+# which plain $gt / $lt ignore (type bracketing), so they are handled
+# explicitly below.
+
+SortSpec = Sequence[Tuple[str, int]]
+
+# What a sort key may hold. Tokens come back from the client unsigned:
+# anything else (an operator dict such as {"$ne": null}, a list) would
+# be spliced into the keyset filter as-is.
+_KEY_SCALARS = (str, int, float, bool, ObjectId, datetime)
+
+
+def encode_cursor(key: Sequence[Any], backward: bool = False) -> str:
+    """Opaque, URL-safe token for a sort key + paging direction."""
+    payload = json_util.dumps({"k": list(key), "b": bool(backward)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> Tuple[List[Any], bool] | None:
+    """Inverse of encode_cursor; None for a missing or tampered token."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key, backward = data["k"], data["b"]
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None
+
+    if not isinstance(key, list) or not isinstance(backward, bool):
+        return None
+    if not all(v is None or isinstance(v, _KEY_SCALARS) for v in key):
+        return None
+    return key, backward
+
+
+def _get_path(doc: dict, path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def sort_key_of(doc: dict, sort: SortSpec) -> List[Any]:
+    return [_get_path(doc, field) for field, _ in sort]
+
+
+def _after(field: str, value: Any, direction: int) -> dict | None:
+    """Condition for `field` strictly after `value` in `direction` order."""
+    if direction == 1:
+        if value is None:
+            return {field: {"$ne": None}}
+        return {field: {"$gt": value}}
+
+    # descending: smaller values, then null / missing last
+    if value is None:
+        return None
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def keyset_filter(sort: SortSpec, key: Sequence[Any], backward: bool = False) -> dict:
+    """
+    Filter for documents strictly after `key` in `sort` order (or
+    strictly before it when `backward`):
+
+        f1 > k1  OR  (f1 = k1 AND f2 > k2)  OR  ...
+    """
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        step = -direction if backward else direction
+        after = _after(field, key[i], step)
+        if after is None:
+            continue
+        equal = [{f: k} for (f, _), k in zip(sort[:i], key[:i])]
+        branches.append({"$and": [*equal, after]} if equal else after)
+
+    if not branches:
+        # Nothing can come after this key
+        return {"_id": {"$exists": False}}
+    return {"$or": branches}
+
+
+def _page_query(query: dict, sort: SortSpec, token: str | None) -> Tuple[dict, bool, bool]:
+    """(query for this page, backward, came_from_token) for a page token."""
+    cursor_state = decode_cursor(token)
+    if cursor_state is not None:
+        key, backward = cursor_state
+        if len(key) == len(sort):
+            return {"$and": [query, keyset_filter(sort, key, backward)]}, backward, True
+    return query, False, False
+
+
+def _page_tokens(
+    docs: List[dict],
+    limit: int,
+    backward: bool,
+    came_from_token: bool,
+    key_of: Callable[[dict], List[Any]],
+) -> Tuple[List[dict], str | None, str | None]:
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    if backward:
+        docs.reverse()
+
+    if not docs:
+        return docs, None, None
+
+    has_next = has_more if not backward else True
+    has_prev = has_more if backward else came_from_token
+
+    next_token = encode_cursor(key_of(docs[-1])) if has_next else None
+    prev_token = encode_cursor(key_of(docs[0]), backward=True) if has_prev else None
+    return docs, next_token, prev_token
+
+
+def fetch_keyset_page(
+    coll: Any,
+    query: dict,
+    sort: SortSpec,
+    limit: int,
+    token: str | None = None,
+    projection: dict | None = None,
+) -> Tuple[List[dict], str | None, str | None]:
+    """
+    One page of `coll.find(query)` in `sort` order.
+
+    Returns (docs, next_token, prev_token); a token is None when there is
+    no page in that direction. Reads limit + 1 rows to know whether
+    another page exists.
+    """
+    find_query, backward, came_from_token = _page_query(query, sort, token)
+
+    order = [(f, -d if backward else d) for f, d in sort]
+    docs = list(coll.find(find_query, projection).sort(order).limit(limit + 1))
+
+    return _page_tokens(docs, limit, backward, came_from_token, lambda d: sort_key_of(d, sort))
+
+
+PAGE_KEY_FIELD = "_page_key"
+
+
+def keyset_pipeline(match: dict, sort: SortSpec, limit: int, project: dict | None = None) -> list:
+    """$match / $sort / $limit / $project stages of one aggregate_keyset_page read."""
+    stage = dict(project or {})
+    stage[PAGE_KEY_FIELD] = [{"$ifNull": [f"${field}", None]} for field, _ in sort]
+    return [
+        {"$match": match},
+        {"$sort": SON(sort)},
+        {"$limit": limit},
+        {"$project": stage},
+    ]
+
+
+def aggregate_keyset_page(
+    coll: Any,
+    query: dict,
+    sort: SortSpec,
+    limit: int,
+    token: str | None = None,
+    project: dict | None = None,
+) -> Tuple[List[dict], str | None, str | None]:
+    """
+    fetch_keyset_page for views that reshape documents server-side:
+    $match + $sort + $limit on the stored fields (so indexes apply), then
+    `project` runs on the page's rows only.
+
+    The projected rows no longer carry the sort fields, so the sort key
+    rides along in PAGE_KEY_FIELD and is removed from the returned rows.
+    """
+    match, backward, came_from_token = _page_query(query, sort, token)
+
+    order = [(f, -d if backward else d) for f, d in sort]
+    pipeline = keyset_pipeline(match, order, limit + 1, project)
+    rows = list(coll.aggregate(pipeline))
+
+    rows, next_token, prev_token = _page_tokens(
+        rows, limit, backward, came_from_token, lambda r: list(r[PAGE_KEY_FIELD])
+    )
+    for row in rows:
+        row.pop(PAGE_KEY_FIELD, None)
+    return rows, next_token, prev_token
+
+
+# ----------------------------------------------------------------------
+# Same tokens for SQLAlchemy queries
+# ----------------------------------------------------------------------
+def _sql_key_value(value: Any) -> Any:
+    # json_util keeps only milliseconds of a datetime; the key must be exact
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _sql_bind_value(column: Any, value: Any) -> Any:
+    """Token key element as a value of `column`'s type; ValueError if it is not one."""
+    expected = column.type.python_type
+    if expected is datetime:
+        if not isinstance(value, str):
+            raise ValueError(f"{column.key}: expected an ISO datetime")
+        return datetime.fromisoformat(value)
+
+    allowed = (int, float) if expected is float else expected
+    if (isinstance(value, bool) and expected is not bool) or not isinstance(value, allowed):
+        raise ValueError(f"{column.key}: expected {expected.__name__}")
+    return value
+
+
+def fetch_sql_keyset_page(
+    query: Any,
+    columns: Sequence[Any],
+    limit: int,
+    token: str | None = None,
+    descending: bool = True,
+) -> Tuple[List[Any], str | None, str | None]:
+    """
+    fetch_keyset_page for a SQLAlchemy query. `columns` all sort in one
+    direction and end with the primary key; a page compares the row value
+    (c1, c2, ...) with the last key, which SQLite answers with one range
+    scan of an index on those columns.
+    """
+    from sqlalchemy import tuple_
+
+    cursor_state = decode_cursor(token)
+    backward = False
+    came_from_token = False
+
+    if cursor_state is not None and len(cursor_state[0]) == len(columns):
+        key, backward = cursor_state
+        try:
+            values = [_sql_bind_value(c, v) for c, v in zip(columns, key)]
+        except ValueError:
+            # tampered key: serve the first page, as for an unreadable token
+            values, backward = None, False
+
+        if values is not None:
+            bound = tuple_(*values)
+            row = tuple_(*columns)
+            query = query.filter(row < bound if descending != backward else row > bound)
+            came_from_token = True
+
+    newest_first = descending != backward
+    order = [c.desc() if newest_first else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    return _page_tokens(
+        rows,
+        limit,
+        backward,
+        came_from_token,
+        lambda r: [_sql_key_value(getattr(r, c.key)) for c in columns],
+    )
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any
+
+from app.db.risk_schema import (
+    RISK_LEVEL_EXPR,
+    RISK_READ_PROJECTION,
+    RISK_SCORE_EXPR,
+    risk_of,
+)
+
+
+class PatientRow:
+    """
+    Read-only view model for one row of the patient list screens
+    (doctor, HCP and admin).
+
+    A single shared class with __slots__: building a row is one small
+    object allocation – no per-row class creation and no per-instance
+    __dict__ – which matters when a list renders thousands of rows.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "gender",
+        "age",
+        "risk_level",
+        "risk_score",
+        "hypertension",
+        "stroke",
+        "last_update",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str | None,
+        gender: str | None = None,
+        age: Any = None,
+        risk_level: str | None = "Unknown",
+        risk_score: float = 0.0,
+        hypertension: Any = None,
+        stroke: Any = None,
+        last_update: Any = None,
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.gender = gender
+        self.age = age
+        self.risk_level = risk_level
+        self.risk_score = risk_score
+        self.hypertension = hypertension
+        self.stroke = stroke
+        self.last_update = last_update
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "PatientRow":
+        """
+        Build a row from a (projected) patient document; risk comes from
+        the schema read adapter, so unmigrated documents render too.
+        """
+        demo = doc.get("demographics") or {}
+        meta = doc.get("system_metadata") or {}
+        level, score = risk_of(doc)
+
+        return cls(
+            str(doc.get("_id")),
+            demo.get("name") or f"Patient {doc.get('original_id')}",
+            demo.get("gender"),
+            demo.get("age"),
+            level,
+            score,
+            None,
+            None,
+            meta.get("last_modified_at"),
+        )
+
+    @classmethod
+    def from_flat(cls, row: dict) -> "PatientRow":
+        """Build a row from a document shaped by PATIENT_ROW_FLAT_PROJECT."""
+        return cls(**{name: row.get(name) for name in cls.__slots__})
+
+    # HCP templates call the gender column "sex"
+    @property
+    def sex(self) -> str | None:
+        return self.gender
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"PatientRow(id={self.id!r}, name={self.name!r}, risk_level={self.risk_level!r})"
+
+
+# Fields PatientRow.from_doc reads – use as the find() projection
+PATIENT_ROW_PROJECTION = {
+    "original_id": 1,
+    "demographics.name": 1,
+    "demographics.gender": 1,
+    "demographics.age": 1,
+    "system_metadata.last_modified_at": 1,
+    **RISK_READ_PROJECTION,
+}
+
+
+def _either(nested: str, flat: str) -> dict:
+    return {"$ifNull": [f"${nested}", f"${flat}"]}
+
+
+# $project stage producing PatientRow fields directly, for both the
+# nested (imported / doctor / HCP) and the flat (admin-created) document
+# shapes – used where rows are flattened server-side, one page at a time
+PATIENT_ROW_FLAT_PROJECT = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "name": {
+        "$ifNull": [
+            _either("demographics.name", "name"),
+            {"$concat": ["Patient ", {"$toString": "$original_id"}]},
+        ]
+    },
+    "gender": _either("demographics.gender", "gender"),
+    "age": _either("demographics.age", "age"),
+    "risk_level": RISK_LEVEL_EXPR,
+    "risk_score": RISK_SCORE_EXPR,
+    "hypertension": _either("medical_history.hypertension", "hypertension"),
+    "stroke": _either("medical_history.stroke", "stroke"),
+    "last_update": {"$ifNull": ["$system_metadata.last_modified_at", "$created_at"]},
+}
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.admin_kpis import invalidate_admin_kpis, invalidate_admin_kpis_on_commit
+from app.extensions import db
+from app.models import PredictionDailyRollup, StrokePrediction, User
+
+
+# ----------------------------------------------------------------------
+# prediction_daily_rollup maintenance
+# ----------------------------------------------------------------------
+# Every ORM insert / delete of a StrokePrediction adds / subtracts one in
+# its (day, risk_level, user_role) row, on the flush's own connection –
+# so the rollup commits or rolls back together with the prediction.
+# user_role is the one stored on the prediction at insert time, so a
+# later role change or user deletion cannot move the count it removes.
+# Bulk deletes bypass ORM events: use purge_predictions(), which
+# subtracts the purged rows' counts in the same transaction.
+# `flask rollup backfill` rebuilds the table (or the days from --since
+# on) from stroke_predictions.
+
+ROLLUP = PredictionDailyRollup.__table__
+
+ANONYMOUS_ROLE = "anonymous"
+UNKNOWN_ROLE = "unknown"  # user_id whose user row no longer exists
+
+RollupKey = Tuple[date, str, str]
+
+
+def _day_of(created_at: datetime | None) -> date:
+    return (created_at or datetime.utcnow()).date()
+
+
+def _role_of(connection: Any, user_id: int | None) -> str:
+    if user_id is None:
+        return ANONYMOUS_ROLE
+    role = connection.execute(select(User.role).where(User.id == user_id)).scalar()
+    return role or UNKNOWN_ROLE
+
+
+def apply_rollup_deltas(connection: Any, deltas: Dict[RollupKey, int]) -> None:
+    """Add each delta to its rollup row (upsert); drop rows that reach zero."""
+    changes = [
+        {"day": day, "risk_level": level, "user_role": role, "count": delta}
+        for (day, level, role), delta in deltas.items()
+        if delta
+    ]
+    if not changes:
+        return
+
+    stmt = sqlite_insert(ROLLUP)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ROLLUP.c.day, ROLLUP.c.risk_level, ROLLUP.c.user_role],
+        set_={"count": ROLLUP.c.count + stmt.excluded["count"]},
+    )
+    connection.execute(stmt, changes)
+
+    if any(c["count"] < 0 for c in changes):
+        connection.execute(delete(ROLLUP).where(ROLLUP.c.count <= 0))
+
+
+def _rollup_key(target: StrokePrediction) -> RollupKey:
+    return (_day_of(target.created_at), target.risk_level, target.user_role or UNKNOWN_ROLE)
+
+
+def _stamp_role(mapper: Any, connection: Any, target: StrokePrediction) -> None:
+    if target.user_role is None:
+        target.user_role = _role_of(connection, target.user_id)
+
+
+def _on_insert(mapper: Any, connection: Any, target: StrokePrediction) -> None:
+    apply_rollup_deltas(connection, {_rollup_key(target): 1})
+
+
+def _on_delete(mapper: Any, connection: Any, target: StrokePrediction) -> None:
+    apply_rollup_deltas(connection, {_rollup_key(target): -1})
+
+
+event.listen(StrokePrediction, "before_insert", _stamp_role)
+event.listen(StrokePrediction, "after_insert", _on_insert)
+event.listen(StrokePrediction, "after_delete", _on_delete)
+
+
+# ----------------------------------------------------------------------
+# Grouping stroke_predictions (backfill / purge)
+# ----------------------------------------------------------------------
+def _grouped_predictions(*criteria: Any):
+    # Same key as _rollup_key(): the role stored on the prediction
+    day = func.date(StrokePrediction.created_at)
+    role = func.coalesce(StrokePrediction.user_role, UNKNOWN_ROLE)
+    return (
+        select(day, StrokePrediction.risk_level, role, func.count())
+        .where(*criteria)
+        .group_by(day, StrokePrediction.risk_level, role)
+    )
+
+
+def purge_predictions(before: datetime) -> int:
+    """
+    Delete predictions created before `before` and subtract them from the
+    rollup, in the caller's transaction (the caller commits).
+    """
+    older = StrokePrediction.created_at < before
+
+    deltas: Dict[RollupKey, int] = {}
+    for day, level, role, count in db.session.execute(_grouped_predictions(older)):
+        deltas[(date.fromisoformat(day), level, role)] = -int(count)
+
+    connection = db.session.connection()
+    apply_rollup_deltas(connection, deltas)
+    result = connection.execute(delete(StrokePrediction.__table__).where(older))
+
+    # A Core delete fires no ORM events: drop the KPI snapshot now and
+    # again when the caller's transaction ends
+    invalidate_admin_kpis()
+    invalidate_admin_kpis_on_commit()
+    return int(result.rowcount or 0)
+
+
+def rebuild_rollup(since: date | None = None) -> int:
+    """
+    Recompute the rollup from stroke_predictions – every day, or the days
+    from `since` on. One GROUP BY over the predictions; returns the number
+    of rollup rows written. The caller commits.
+    """
+    criteria: List[Any] = []
+    rollup_criteria: List[Any] = []
+    if since is not None:
+        criteria.append(StrokePrediction.created_at >= datetime.combine(since, datetime.min.time()))
+        rollup_criteria.append(ROLLUP.c.day >= since)
+
+    connection = db.session.connection()
+    connection.execute(delete(ROLLUP).where(*rollup_criteria))
+    result = connection.execute(
+        insert(ROLLUP).from_select(
+            ["day", "risk_level", "user_role", "count"],
+            _grouped_predictions(*criteria),
+        )
+    )
+    return int(result.rowcount or 0)
+
+
+# ----------------------------------------------------------------------
+# Reads (admin analytics)
+# ----------------------------------------------------------------------
+def predictions_per_bucket(start: date, end: date, monthly: bool = False) -> Dict[str, int]:
+    """Predictions per day ("YYYY-MM-DD") or month ("YYYY-MM"), start..end inclusive."""
+    bucket = func.strftime("%Y-%m", ROLLUP.c.day) if monthly else ROLLUP.c.day
+    rows = db.session.execute(
+        select(bucket, func.sum(ROLLUP.c.count))
+        .where(ROLLUP.c.day >= start, ROLLUP.c.day <= end)
+        .group_by(bucket)
+    )
+    return {str(key): int(total) for key, total in rows}
+
+
+def predictions_by_risk(start: date, end: date) -> Iterable[Tuple[str, int]]:
+    rows = db.session.execute(
+        select(ROLLUP.c.risk_level, func.sum(ROLLUP.c.count))
+        .where(ROLLUP.c.day >= start, ROLLUP.c.day <= end)
+        .group_by(ROLLUP.c.risk_level)
+    )
+    return [(level, int(total)) for level, total in rows]
+
+
+# ----------------------------------------------------------------------
+# flask rollup backfill
+# ----------------------------------------------------------------------
+rollup_cli = AppGroup("rollup", help="Maintain the prediction_daily_rollup table.")
+
+
+@rollup_cli.command("backfill")
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only rebuild days from this date (UTC) on; default: everything.",
+)
+def rollup_backfill(since: datetime | None) -> None:
+    """Rebuild the rollup from stroke_predictions."""
+    written = rebuild_rollup(since.date() if since else None)
+    db.session.commit()
+    click.echo(f"prediction_daily_rollup: {written} rows written")
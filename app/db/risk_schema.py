@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+
+# ----------------------------------------------------------------------
+# Canonical patient risk schema (schema_version 2)
+# ----------------------------------------------------------------------
+# Patient documents grew three spellings of the same data:
+#
+#   risk_assessment.{level, score, flag, factors, calculated_at}   importers, doctor edits
+#   risk_assessment.{_level, _score, _flag, _factors, _calculated_at}  HCP form, old recompute
+#   top-level risk_label / risk_score / probability                admin-created docs
+#
+# Version 2 keeps only the first (plus model_version / feature_hash from
+# the recompute job) and marks the document with schema_version = 2.
+# scripts/migrate_risk_schema.py rewrites existing documents; queries
+# filter and sort on risk_assessment.level / score only, and
+# risk_of() below reads documents that have not been migrated yet.
+
+CURRENT_SCHEMA_VERSION = 2
+
+RISK_LEVELS = ("Low", "Medium", "High")
+
+# legacy underscore key -> canonical key inside risk_assessment
+_UNDERSCORE_KEYS = {
+    "_level": "level",
+    "_score": "score",
+    "_flag": "flag",
+    "_factors": "factors",
+    "_calculated_at": "calculated_at",
+}
+
+# Flat top-level risk fields on admin-created documents
+_FLAT_FIELDS = ("risk_label", "risk_level", "risk_score", "probability")
+
+_FLAT_UNSET: Dict[str, str] = {field: "" for field in _FLAT_FIELDS}
+
+# $unset spec removing every legacy spelling; writers that $set single
+# risk_assessment.* keys send it along with schema_version
+LEGACY_RISK_UNSET: Dict[str, str] = {
+    **{f"risk_assessment.{key}": "" for key in _UNDERSCORE_KEYS},
+    "risk_assessment.probability": "",
+    **_FLAT_UNSET,
+}
+
+# Fields risk_of() may need, for use in find() projections
+RISK_READ_PROJECTION: Dict[str, int] = {
+    "schema_version": 1,
+    "risk_assessment.level": 1,
+    "risk_assessment.score": 1,
+    "risk_assessment._level": 1,
+    "risk_assessment._score": 1,
+    "risk_assessment.probability": 1,
+    **{field: 1 for field in _FLAT_FIELDS},
+}
+
+
+def _first(*values: Any) -> Any:
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+def _as_score(value: Any) -> float | None:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _label_for(score: float) -> str:
+    # Same thresholds as the model output (imported lazily: app.db must
+    # not pull in the ML stack at import time)
+    from app.ml.predict_service import _probability_to_label
+
+    return _probability_to_label(score)
+
+
+def canonical_risk(doc: dict) -> Dict[str, Any]:
+    """
+    Return the version-2 risk_assessment sub-document for any stored shape.
+
+    The plain keys win over the underscore keys (doctor edits only ever
+    wrote the plain ones), which win over the flat admin fields. A label
+    outside Low/Medium/High becomes "Unknown"; a document with only a
+    probability gets the model's label for it.
+    """
+    raw = doc.get("risk_assessment")
+    risk: Dict[str, Any] = dict(raw) if isinstance(raw, dict) else {}
+
+    for legacy, key in _UNDERSCORE_KEYS.items():
+        value = risk.pop(legacy, None)
+        if risk.get(key) is None and value is not None:
+            risk[key] = value
+
+    probability = risk.pop("probability", None)
+    score = _as_score(
+        _first(risk.get("score"), probability, doc.get("risk_score"), doc.get("probability"))
+    )
+    level = _first(risk.get("level"), doc.get("risk_label"), doc.get("risk_level"))
+
+    if level not in RISK_LEVELS:
+        level = _label_for(score) if level is None and score is not None else "Unknown"
+
+    risk["level"] = level
+    risk["score"] = score if score is not None else 0.0
+    risk.setdefault("flag", 0)
+    risk.setdefault("factors", [])
+    risk.setdefault("calculated_at", None)
+    return risk
+
+
+def risk_of(doc: dict) -> tuple[str, float]:
+    """
+    (level, score) of a patient document – the read adapter for list and
+    detail views. Migrated documents are read directly; anything older
+    goes through canonical_risk().
+    """
+    if doc.get("schema_version") == CURRENT_SCHEMA_VERSION:
+        risk = doc.get("risk_assessment") or {}
+        return risk.get("level") or "Unknown", float(risk.get("score") or 0.0)
+
+    risk = canonical_risk(doc)
+    return risk["level"], float(risk["score"])
+
+
+def migration_update(doc: dict) -> Dict[str, Any]:
+    """Update document ($set + $unset) that brings `doc` to the current version."""
+    return {
+        "$set": {
+            "risk_assessment": canonical_risk(doc),
+            "schema_version": CURRENT_SCHEMA_VERSION,
+        },
+        # the whole risk_assessment is replaced, so only flat keys remain
+        "$unset": dict(_FLAT_UNSET),
+    }
+
+
+def _first_expr(*paths: str) -> Any:
+    """Aggregation form of _first(): the first non-null of `paths`."""
+    expr: Any = None
+    for path in reversed(paths):
+        expr = {"$ifNull": [f"${path}", expr]}
+    return expr
+
+
+# Aggregation counterparts of risk_of(), for $project stages that flatten
+# rows server-side. Same precedence as canonical_risk(); a document with
+# a score but no label at all shows "Unknown" until it is migrated.
+RISK_LEVEL_EXPR: Dict[str, Any] = {
+    "$let": {
+        "vars": {
+            "level": _first_expr(
+                "risk_assessment.level",
+                "risk_assessment._level",
+                "risk_label",
+                "risk_level",
+            )
+        },
+        "in": {
+            "$cond": [{"$in": ["$$level", list(RISK_LEVELS)]}, "$$level", "Unknown"]
+        },
+    }
+}
+
+RISK_SCORE_EXPR: Dict[str, Any] = {
+    "$ifNull": [
+        _first_expr(
+            "risk_assessment.score",
+            "risk_assessment._score",
+            "risk_assessment.probability",
+            "risk_score",
+            "probability",
+        ),
+        0.0,
+    ]
+}
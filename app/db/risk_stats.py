@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+
+# ----------------------------------------------------------------------
+# Risk level distribution (dashboards / monitoring chart)
+# ----------------------------------------------------------------------
+# One aggregation instead of a count_documents() per bucket: $match the
+# active patients once, then $group on the document's risk label. The
+# label is risk_assessment.level (schema v2), falling back to the legacy
+# _level of documents not migrated yet; anything else lands in "Unknown".
+
+RISK_LEVELS = ("Low", "Medium", "High")
+
+ACTIVE_FILTER: Dict[str, Any] = {"system_metadata.is_active": True}
+
+# Older documents may have no is_active flag at all
+ACTIVE_OR_UNFLAGGED_FILTER: Dict[str, Any] = {
+    "$or": [
+        {"system_metadata.is_active": True},
+        {"system_metadata.is_active": {"$exists": False}},
+    ]
+}
+
+
+def risk_distribution_pipeline(match: Dict[str, Any]) -> list:
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"$ifNull": ["$risk_assessment.level", "$risk_assessment._level"]},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+def risk_distribution(coll: Any, include_unflagged: bool = False) -> Dict[str, int]:
+    """
+    Count active patients per risk level in a single round trip.
+
+    Returns {"Low", "Medium", "High", "Unknown", "total"} counts.
+    `include_unflagged` also counts documents without an is_active flag.
+    """
+    match = ACTIVE_OR_UNFLAGGED_FILTER if include_unflagged else ACTIVE_FILTER
+
+    counts = {level: 0 for level in RISK_LEVELS}
+    counts["Unknown"] = 0
+
+    for bucket in coll.aggregate(risk_distribution_pipeline(match)):
+        label = bucket.get("_id")
+        key = label if label in RISK_LEVELS else "Unknown"
+        counts[key] += int(bucket.get("count", 0))
+
+    counts["total"] = sum(counts.values())
+    return counts
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from app.extensions import db
+
+
+# ----------------------------------------------------------------------
+# Additive SQLite columns
+# ----------------------------------------------------------------------
+# There is no migration tool in this project: db.create_all() builds new
+# tables but never alters existing ones. Nullable columns added to a model
+# after a database was created are listed here and added in place at
+# startup, so an existing instance/strokecare.db keeps working.
+
+ADDITIVE_COLUMNS: dict[str, dict[str, str]] = {
+    "stroke_predictions": {
+        "model_version": "VARCHAR(64)",
+        "user_role": "VARCHAR(50)",
+    },
+    "audit_logs": {
+        "event_type": "VARCHAR(64)",
+        "resource_type": "VARCHAR(64)",
+        "resource_id": "VARCHAR(64)",
+    },
+}
+
+
+def _action_part(key: str) -> str:
+    # SQL for the `key=value` part audit() folds into action ("event |
+    # resource_type=…; resource_id=…; details=…"), NULL when absent
+    marker = f"{key}="
+    rest = f"substr(action, instr(action, '{marker}') + {len(marker)})"
+    return (
+        f"CASE WHEN instr(action, '{marker}') > 0 THEN "
+        f"substr({rest}, 1, CASE WHEN instr({rest}, ';') > 0 "
+        f"THEN instr({rest}, ';') - 1 ELSE length({rest}) END) END"
+    )
+
+
+# One-off UPDATEs run right after the column is added, filling it from
+# data older rows already carry
+ADDITIVE_BACKFILLS: dict[str, str] = {
+    "audit_logs.event_type": (
+        "UPDATE audit_logs SET event_type = CASE WHEN instr(action, ' | ') > 0 "
+        "THEN substr(action, 1, instr(action, ' | ') - 1) ELSE action END"
+    ),
+    # the user's current role is the best older rows can get
+    "stroke_predictions.user_role": (
+        "UPDATE stroke_predictions SET user_role = CASE WHEN user_id IS NULL "
+        "THEN 'anonymous' ELSE COALESCE((SELECT role FROM \"user\" "
+        "WHERE \"user\".id = stroke_predictions.user_id), 'unknown') END"
+    ),
+    "audit_logs.resource_type": f"UPDATE audit_logs SET resource_type = {_action_part('resource_type')}",
+    "audit_logs.resource_id": f"UPDATE audit_logs SET resource_id = {_action_part('resource_id')}",
+}
+
+# Model indexes added after the table was created; create_all only builds
+# them for new tables
+ADDITIVE_INDEXES: dict[str, tuple[str, ...]] = {
+    "user": ("ix_user_role",),
+    "stroke_predictions": ("ix_stroke_predictions_created_at",),
+    "audit_logs": (
+        "ix_audit_logs_created_at",
+        "ix_audit_logs_event_type_created_at",
+        "ix_audit_logs_user_id_created_at",
+        "ix_audit_logs_resource_type_created_at",
+        "ix_audit_logs_resource_created_at",
+    ),
+}
+
+
+# Derived tables added after databases were created: new table -> the
+# table it is computed from. Created (and filled) at startup when the
+# source table already exists.
+ADDITIVE_TABLES: dict[str, str] = {
+    "prediction_daily_rollup": "stroke_predictions",
+}
+
+
+def _fill_derived_table(table: str) -> None:
+    if table == "prediction_daily_rollup":
+        from app.db.prediction_rollup import rebuild_rollup
+
+        rebuild_rollup()
+
+
+def ensure_sql_columns() -> list[str]:
+    """
+    Add any missing ADDITIVE_COLUMNS (backfilled via ADDITIVE_BACKFILLS)
+    and ADDITIVE_INDEXES to existing tables, and create + fill missing
+    ADDITIVE_TABLES.
+    Tables that do not exist yet are skipped (create_all will build them).
+    Returns the "table.column" / "table.index" / table names that were added.
+    """
+    import app.models  # noqa: F401  (model tables / indexes into db.metadata)
+
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added: list[str] = []
+
+    for table, columns in ADDITIVE_COLUMNS.items():
+        if table not in existing_tables:
+            continue
+
+        present = {c["name"] for c in inspector.get_columns(table)}
+        for column, ddl in columns.items():
+            if column in present:
+                continue
+            db.session.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {ddl}'))
+            backfill = ADDITIVE_BACKFILLS.get(f"{table}.{column}")
+            if backfill:
+                db.session.execute(text(backfill))
+            added.append(f"{table}.{column}")
+
+    for table, names in ADDITIVE_INDEXES.items():
+        if table not in existing_tables:
+            continue
+
+        present = {ix["name"] for ix in inspector.get_indexes(table)}
+        model_indexes = {ix.name: ix for ix in db.metadata.tables[table].indexes}
+        for name in names:
+            if name in present:
+                continue
+            # after the ADD COLUMNs above, in the same transaction
+            db.session.execute(CreateIndex(model_indexes[name]))
+            added.append(f"{table}.{name}")
+
+    for table, source in ADDITIVE_TABLES.items():
+        if table in existing_tables or source not in existing_tables:
+            continue
+
+        db.metadata.tables[table].create(db.session.connection())
+        _fill_derived_table(table)
+        added.append(table)
+
+    if added:
+        db.session.commit()
+    return added
@@ -0,0 +1,266 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# app/ml/batcher.py
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Tuple
+
+from app.ml import predict_service
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionQueueFull(RuntimeError):
+    """Raised when the batching queue is full (backpressure → HTTP 503)."""
+
+
+class PredictionTimeout(PredictionQueueFull):
+    """Raised when a queued prediction is not scored within the timeout (→ HTTP 503)."""
+
+
+# Queued by stop(): the worker finishes the rows ahead of it, then exits
+_STOP = object()
+
+
+class PredictionBatcher:
+    """
+    In-process micro-batching for concurrent single-row predictions.
+
+    Request threads enqueue a feature dict and wait on a Future. One
+    worker thread takes the first waiting request, keeps collecting until
+    `max_batch_rows` are queued or `max_wait_ms` has passed, scores them
+    all with ONE `predict_service.predict_risk_rows` call and resolves
+    every Future. The queue is bounded: when `max_queue` requests are
+    already waiting, `submit` raises PredictionQueueFull instead of
+    letting latency grow without limit. A caller that waits longer than
+    `timeout_seconds` cancels its row and gets PredictionTimeout.
+    """
+
+    def __init__(
+        self,
+        max_batch_rows: int = 32,
+        max_wait_ms: float = 2.0,
+        max_queue: int = 1024,
+        timeout_seconds: float = 5.0,
+    ) -> None:
+        if max_batch_rows < 1:
+            raise ValueError("max_batch_rows must be >= 1")
+
+        self.max_batch_rows = int(max_batch_rows)
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue = max(1, int(max_queue))
+        self.timeout_seconds = float(timeout_seconds)
+
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future]]" = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.peak_queue_depth = 0
+
+    # ------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------
+    def submit(self, features: Dict[str, Any]) -> Future:
+        """Queue one prediction; the Future resolves to a predict_risk dict."""
+        self._ensure_worker()
+
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((features, future))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise PredictionQueueFull(
+                f"Prediction queue is full ({self.max_queue} waiting)"
+            ) from None
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self.submitted += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, depth)
+        return future
+
+    def predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking drop-in replacement for predict_service.predict_risk."""
+        future = self.submit(features)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeout:
+            # Not scored yet: cancel, so the worker skips the row
+            future.cancel()
+            with self._lock:
+                self.timed_out += 1
+            raise PredictionTimeout(
+                f"Prediction not scored within {self.timeout_seconds:g}s"
+            ) from None
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Let the worker score what is already queued, then end it."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._thread_pid != os.getpid():
+                return
+            self._thread = None
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork – start one per worker process.
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread_pid != pid or self._thread is None:
+                if self._thread_pid != pid:
+                    # Items queued in the parent can never be served here.
+                    self._queue = queue.Queue(self.max_queue)
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="prediction-batcher",
+                    daemon=True,
+                )
+                self._thread_pid = pid
+                self._thread.start()
+
+    def _collect(self) -> Tuple[List[Tuple[Dict[str, Any], Future]], bool]:
+        """(batch, stop): stop is True once the _STOP marker was taken."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Window closed – still take anything already waiting
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+
+            # Skip callers that gave up (cancelled) before we got to them
+            live = [(f, fut) for f, fut in batch if fut.set_running_or_notify_cancel()]
+            if not live:
+                continue
+
+            try:
+                results = predict_service.predict_risk_rows([f for f, _ in live])
+            except Exception as exc:
+                logger.exception("Batched prediction failed")
+                for _, fut in live:
+                    fut.set_exception(exc)
+                with self._lock:
+                    self.failed += len(live)
+                    self.batches += 1
+                continue
+
+            for (_, fut), result in zip(live, results):
+                fut.set_result(result)
+
+            with self._lock:
+                self.completed += len(live)
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(live))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            scored = self.completed + self.failed
+            return {
+                "pid": os.getpid(),
+                "queue_depth": self._queue.qsize(),
+                "peak_queue_depth": self.peak_queue_depth,
+                "max_queue": self.max_queue,
+                "max_batch_rows": self.max_batch_rows,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "completed": self.completed,
+                "failed": self.failed,
+                "batches": self.batches,
+                "largest_batch": self.largest_batch,
+                "mean_batch_size": (scored / self.batches) if self.batches else 0.0,
+            }
+
+
+# ----------------------------------------------------------------------
+# Process-wide batcher (opt-in via ML_BATCHING_ENABLED)
+# ----------------------------------------------------------------------
+_BATCHER: PredictionBatcher | None = None
+
+
+def configure_batcher(
+    enabled: bool,
+    max_batch_rows: int = 32,
+    max_wait_ms: float = 2.0,
+    max_queue: int = 1024,
+    timeout_seconds: float = 5.0,
+) -> PredictionBatcher | None:
+    """Install (or remove) the batcher used by app.ml.model.predict_risk."""
+    global _BATCHER
+
+    if _BATCHER is not None:
+        _BATCHER.stop()
+
+    _BATCHER = (
+        PredictionBatcher(max_batch_rows, max_wait_ms, max_queue, timeout_seconds)
+        if enabled
+        else None
+    )
+    return _BATCHER
+
+
+def get_batcher() -> PredictionBatcher | None:
+    return _BATCHER
+
+
+def get_batcher_stats() -> Dict[str, Any]:
+    if _BATCHER is None:
+        return {"enabled": False, "pid": os.getpid()}
+    return {"enabled": True, **_BATCHER.stats()}
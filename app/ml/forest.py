@@ -0,0 +1,230 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# app/ml/forest.py
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+
+# Upper bound on (rows × trees) node indices held in memory at once
+_MAX_CELLS_PER_CHUNK = 1 << 20
+
+_ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+@dataclass(frozen=True)
+class CompiledForest:
+    """
+    A RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees are concatenated into one node table; `left` / `right`
+    hold GLOBAL node indices and `roots` the first node of each tree.
+    Leaves point at themselves (threshold = +inf) so a fixed number of
+    steps walks every tree to a leaf without per-tree branching.
+
+    `value` holds the per-leaf class probabilities, so predict_proba is
+    just the mean of `value[leaf]` over trees – the same maths as
+    sklearn's RandomForestClassifier.predict_proba.
+    """
+
+    feature: np.ndarray    # (n_nodes,) int64
+    threshold: np.ndarray  # (n_nodes,) float64
+    left: np.ndarray       # (n_nodes,) int64
+    right: np.ndarray      # (n_nodes,) int64
+    value: np.ndarray      # (n_nodes, n_classes) float64
+    roots: np.ndarray      # (n_trees,) int64
+    max_depth: int
+    n_features: int
+    classes: list
+
+    # sha256 of the joblib bundle this was exported from (None if built in memory)
+    source_sha256: str | None = None
+
+    # left/right interleaved: child of node i is _children[2*i + went_right].
+    # Saved with the export so a memory-mapped load does not rebuild it.
+    _children: np.ndarray | None = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self._children is None:
+            children = np.stack([self.left, self.right], axis=1).ravel()
+            object.__setattr__(self, "_children", children)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_sklearn(cls, model: RandomForestClassifier) -> "CompiledForest":
+        if not isinstance(model, RandomForestClassifier):
+            raise TypeError(f"Expected RandomForestClassifier, got {type(model).__name__}")
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for est in model.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            local = np.arange(n, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, local, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, local, tree.children_right) + offset)
+
+            # Normalise leaf values to probabilities (as DecisionTreeClassifier
+            # does in predict_proba, incl. the all-zero guard).
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            n_features=int(model.n_features_in_),
+            classes=[c.item() if hasattr(c, "item") else c for c in model.classes_],
+        )
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for a (n_rows, n_features) batch.
+
+        All trees are walked for all rows of a chunk at once: each step
+        gathers the split feature / threshold for every (row, tree) pair
+        and moves to the left or right child.
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds;
+        # round-trip through float32 so the splits are taken identically.
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has shape {X.shape}, expected (n_rows, {self.n_features})"
+            )
+
+        n_rows = X.shape[0]
+        out = np.empty((n_rows, self.value.shape[1]), dtype=np.float64)
+        chunk = max(1, _MAX_CELLS_PER_CHUNK // max(1, self.n_trees))
+
+        for start in range(0, n_rows, chunk):
+            stop = min(start + chunk, n_rows)
+            out[start:stop] = self._predict_chunk(X[start:stop])
+
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_base = (np.arange(n_rows) * n_features)[:, None]
+        idx = np.repeat(self.roots[None, :], n_rows, axis=0)
+
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_base + self.feature.take(idx))
+            # NaN inputs are unsupported: sklearn routes them with each
+            # node's learned missing-value direction, which is not
+            # compiled. The encoders (_to_number, fillna(0)) never emit NaN.
+            went_right = np.logical_not(x <= self.threshold.take(idx))
+            idx = self._children.take(idx * 2 + went_right)
+
+        return self.value.take(idx, axis=0).sum(axis=1) / self.n_trees
+
+    # ------------------------------------------------------------------
+    # Persistence (one uncompressed .npy per array + meta.json)
+    # ------------------------------------------------------------------
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name in _ARRAY_NAMES:
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        np.save(directory / "children.npy", np.ascontiguousarray(self._children))
+
+        meta = {
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "classes": self.classes,
+            "source_sha256": self.source_sha256,
+        }
+        (directory / "meta.json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, directory: Path, mmap_mode: str | None = None) -> "CompiledForest":
+        """
+        Load an exported forest. With mmap_mode="r" the node arrays are
+        memory-mapped read-only, so every worker process on the host
+        shares the same physical pages instead of holding its own copy.
+        """
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text())
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in _ARRAY_NAMES
+        }
+
+        children_path = directory / "children.npy"
+        if children_path.exists():
+            arrays["_children"] = np.load(children_path, mmap_mode=mmap_mode)
+
+        return cls(**arrays, **meta)
+
+
+def export_forest(model_path: Path, out_dir: Path) -> CompiledForest:
+    """
+    Flatten the RandomForest inside a joblib bundle and save its node
+    arrays to `out_dir`, stamped with the bundle's sha256.
+    """
+    import joblib
+
+    bundle = joblib.load(model_path)
+    forest = replace(
+        CompiledForest.from_sklearn(bundle["model"]),
+        source_sha256=file_sha256(model_path),
+    )
+    forest.save(out_dir)
+    return forest
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
@@ -22,6 +22,7 @@ from typing import Any, Dict
 # in app.ml.predict_service. This module is just a thin
 # backwards-compatible wrapper so existing routes that import
 # `predict_risk` from here still work.
+from app.ml.batcher import get_batcher
 from app.ml.predict_service import predict_risk as _predict_risk_impl
 
 
@@ -40,7 +41,15 @@ def predict_risk(features: Dict[str, Any]) -> Dict[str, Any]:
         {
             "probability": float,        # 0–1
             "stroke_flag": int,          # 0 or 1
-            "risk_level": "Low"|"Medium"|"High"
+            "risk_level": "Low"|"Medium"|"High",
+            "model_version": str
         }
+
+    With ML_BATCHING_ENABLED the call is queued on the micro-batcher
+    (app.ml.batcher) and scored together with concurrent requests; it
+    raises PredictionQueueFull when the queue is saturated.
     """
+    batcher = get_batcher()
+    if batcher is not None:
+        return batcher.predict(features)
     return _predict_risk_impl(features)
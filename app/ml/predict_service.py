@@ -16,14 +16,25 @@ AI Statement: Portions of this file were drafted or refined using
 # app/ml/predict_service.py
 from __future__ import annotations
 
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 
+from app.ml.forest import CompiledForest, file_sha256
+
+logger = logging.getLogger(__name__)
+
 
 # ----------------------------------------------------------------------
 # Paths & model bundle
@@ -31,45 +42,330 @@ from sklearn.preprocessing import LabelEncoder
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 MODEL_PATH = BASE_DIR / "instance" / "stroke_model.joblib"
+FOREST_PATH = MODEL_PATH.with_suffix(".forest")  # scripts/export_forest.py
+
+# Memory-mapped loading (see configure_model_loading / ML_MODEL_MMAP)
+_MMAP = False
+
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    One fully prepared model bundle. Immutable: a new bundle is built
+    off to the side and published by swapping `_ACTIVE`, so a request
+    that grabbed the old one finishes on it undisturbed.
+    """
+
+    model: Any
+    encoders: Dict[str, LabelEncoder]
+    # Encoders compiled to {value: code} lookup tables + fallback code
+    encoder_tables: Dict[str, Tuple[Dict[str, int], int]]
+    feature_order: List[str]
+    # RandomForest flattened into numpy node arrays (None for other models)
+    forest: CompiledForest | None
+    # sha256 of the bundle file – part of every prediction cache key
+    sha256: str
+    path: Path | None = None
+    loaded_at: float = 0.0
+
+    @property
+    def version(self) -> str:
+        """Short content hash stamped on every stored prediction."""
+        return self.sha256[:12]
+
+
+_DEFAULT_FEATURE_ORDER = [
+    "gender",
+    "age",
+    "hypertension",
+    "heart_disease",
+    "ever_married",
+    "work_type",
+    "Residence_type",
+    "avg_glucose_level",
+    "bmi",
+    "smoking_status",
+]
+
+# The bundle currently serving predictions (see app/ml/registry.py).
+# Readers take ONE reference per call; writers replace it atomically.
+_ACTIVE: LoadedModel | None = None
+_LOAD_LOCK = threading.Lock()
+
+# Batches up to this many rows use the compiled forest; bigger batches
+# go to sklearn, whose threaded C loop wins once per-call overhead is
+# amortised (see scripts/bench_forest.py).
+COMPILED_FOREST_MAX_ROWS = 128
+
+# Batch calls with more rows than this (imports, recompute) bypass the
+# prediction cache: their rows rarely repeat, and a per-row locked
+# lookup + put would contend with requests and evict every interactive
+# entry.
+CACHED_BATCH_MAX_ROWS = COMPILED_FOREST_MAX_ROWS
+
+# Numeric model inputs (everything else is label-encoded)
+_NUMERIC_COLS = ["age", "hypertension", "heart_disease", "avg_glucose_level", "bmi"]
+
+# Rows scored per predict_proba call in the batch API
+DEFAULT_BATCH_SIZE = 2048
+
+# Per-thread preallocated (1, n_features) float64 row for the fast path
+_ROW_BUFFER = threading.local()
 
-_MODEL: RandomForestClassifier | None = None
-_ENCODERS: Dict[str, LabelEncoder] | None = None
-_FEATURE_ORDER: list[str] | None = None
+
+# ----------------------------------------------------------------------
+# Prediction cache (LRU + TTL)
+# ----------------------------------------------------------------------
+class PredictionCache:
+    """
+    Bounded, thread-safe LRU cache with a per-entry TTL.
+
+    Keys are (model sha256, encoded feature tuple), so a re-trained
+    bundle can never be served stale results even before `clear()`.
+    maxsize=0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl_seconds: float = 3600.0) -> None:
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.configure(maxsize, ttl_seconds)
+
+    def configure(self, maxsize: int, ttl_seconds: float) -> None:
+        with self._lock:
+            self.maxsize = max(0, int(maxsize))
+            self.ttl_seconds = float(ttl_seconds)
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Dict[str, Any] | None:
+        if self.maxsize == 0:
+            return None
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key: Tuple[Any, ...], value: Dict[str, Any]) -> None:
+        if self.maxsize == 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+_PREDICTION_CACHE = PredictionCache()
+
+
+def configure_prediction_cache(maxsize: int = 4096, ttl_seconds: float = 3600.0) -> None:
+    """Resize / re-time the prediction cache (called from create_app)."""
+    _PREDICTION_CACHE.configure(maxsize, ttl_seconds)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit / miss / eviction counters for the prediction cache."""
+    return _PREDICTION_CACHE.stats()
+
+
+def _cache_key(bundle: LoadedModel, row: np.ndarray) -> Tuple[Any, ...]:
+    return (bundle.sha256, *row.tolist())
 
 
 # ----------------------------------------------------------------------
 # Lazy loader for the new model bundle (model + encoders + feature order)
 # ----------------------------------------------------------------------
-def _ensure_model_loaded() -> None:
-    global _MODEL, _ENCODERS, _FEATURE_ORDER
-
-    if _MODEL is not None:
-        return
-
-    if not MODEL_PATH.exists():
-        raise FileNotFoundError(f"Model file not found at: {MODEL_PATH}")
-
-    bundle = joblib.load(MODEL_PATH)
-
-    _MODEL = bundle["model"]
-    _ENCODERS = bundle.get("encoders", {})
-    _FEATURE_ORDER = bundle.get(
-        "feature_order",
-        [
-            "gender",
-            "age",
-            "hypertension",
-            "heart_disease",
-            "ever_married",
-            "work_type",
-            "Residence_type",
-            "avg_glucose_level",
-            "bmi",
-            "smoking_status",
-        ],
+def configure_model_loading(mmap: bool = False) -> None:
+    """
+    Choose how the bundle is loaded (called from create_app).
+
+    mmap=True opens the uncompressed joblib bundle with mmap_mode="r" and
+    memory-maps the exported forest arrays (FOREST_PATH), so all workers
+    on a host share one read-only copy of the node arrays.
+    """
+    global _MMAP
+    _MMAP = bool(mmap)
+
+
+def _load_forest(model: Any, bundle_sha256: str) -> CompiledForest | None:
+    if not isinstance(model, RandomForestClassifier):
+        return None
+
+    if _MMAP and FOREST_PATH.is_dir():
+        try:
+            forest = CompiledForest.load(FOREST_PATH, mmap_mode="r")
+            if forest.source_sha256 == bundle_sha256:
+                return forest
+            logger.warning(
+                "Exported forest at %s is stale – re-run scripts/export_forest.py",
+                FOREST_PATH,
+            )
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Could not memory-map forest at %s: %r", FOREST_PATH, exc)
+
+    return CompiledForest.from_sklearn(model)
+
+
+def _is_uncompressed(path: Path) -> bool:
+    """
+    joblib can only mmap bundles saved without compression (plain pickle,
+    first byte 0x80); mmap_mode on a compressed file fails to load.
+    """
+    with path.open("rb") as f:
+        return f.read(1) == b"\x80"
+
+
+def build_loaded_model(
+    bundle: Dict[str, Any],
+    sha256: str,
+    path: Path | None = None,
+) -> LoadedModel:
+    """Prepare a raw joblib bundle dict (encoder tables, compiled forest)."""
+    model = bundle["model"]
+    encoders = bundle.get("encoders", {})
+
+    return LoadedModel(
+        model=model,
+        encoders=encoders,
+        encoder_tables=_compile_encoders(encoders),
+        feature_order=list(bundle.get("feature_order", _DEFAULT_FEATURE_ORDER)),
+        forest=_load_forest(model, sha256),
+        sha256=sha256,
+        path=path,
+        loaded_at=time.time(),
     )
 
 
+def load_bundle(path: Path, sha256: str | None = None) -> LoadedModel:
+    """Read + prepare the bundle at `path` WITHOUT publishing it."""
+    if not path.exists():
+        raise FileNotFoundError(f"Model file not found at: {path}")
+
+    if sha256 is None:
+        sha256 = file_sha256(path)
+    bundle = joblib.load(
+        path,
+        mmap_mode="r" if _MMAP and _is_uncompressed(path) else None,
+    )
+    return build_loaded_model(bundle, sha256, path)
+
+
+def install_model(loaded: LoadedModel) -> LoadedModel | None:
+    """
+    Publish `loaded` as the serving model; returns the one it replaced.
+    A single reference assignment, so in-flight predictions never block.
+    """
+    global _ACTIVE
+
+    previous, _ACTIVE = _ACTIVE, loaded
+
+    # New bundle → old cache entries can never match again; free them.
+    if previous is None or previous.sha256 != loaded.sha256:
+        _PREDICTION_CACHE.clear()
+    return previous
+
+
+def _ensure_model_loaded() -> LoadedModel:
+    """Return the serving model, loading MODEL_PATH on first use."""
+    loaded = _ACTIVE
+    if loaded is not None:
+        return loaded
+
+    with _LOAD_LOCK:
+        if _ACTIVE is None:
+            install_model(load_bundle(MODEL_PATH))
+        return _ACTIVE  # type: ignore[return-value]
+
+
+def current_model_version() -> str | None:
+    """Version of the serving model (None until something is loaded)."""
+    loaded = _ACTIVE
+    return loaded.version if loaded is not None else None
+
+
+def process_memory() -> Dict[str, Any]:
+    """
+    Resident memory of THIS process in MB (Linux /proc; falls back to
+    peak RSS from getrusage elsewhere). RssFile covers memory-mapped
+    model pages that are shared with other workers.
+    """
+    report: Dict[str, Any] = {"pid": os.getpid()}
+
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile", "RssShmem"):
+                    report[f"{key}_mb"] = round(int(rest.split()[0]) / 1024, 1)
+    except OSError:
+        import resource
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["VmRSS_mb"] = round(peak_kb / 1024, 1)
+
+    return report
+
+
+def warm_up_model() -> Dict[str, Any]:
+    """
+    Eagerly load the bundle and run one prediction so the first real
+    request does not pay the load cost.
+
+    Run it in the gunicorn master (--preload) and the forked workers
+    share the loaded pages copy-on-write. Returns RSS before/after.
+    """
+    before = process_memory()
+    loaded = _ensure_model_loaded()
+    predict_risk({})
+    after = process_memory()
+
+    return {
+        "pid": after["pid"],
+        "model_version": loaded.version,
+        "mmap": _MMAP,
+        "rss_before_mb": before.get("VmRSS_mb"),
+        "rss_after_mb": after.get("VmRSS_mb"),
+        "rss_file_after_mb": after.get("RssFile_mb"),
+    }
+
+
 # ----------------------------------------------------------------------
 # Build features from MongoDB patient document
 # ----------------------------------------------------------------------
@@ -112,6 +408,12 @@ def build_features_from_patient_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
 # Safe label encoding for unseen categories
 # ----------------------------------------------------------------------
 def _safe_encode(enc: LabelEncoder, value: str) -> int:
+    """
+    Reference implementation of the unseen-category fallback.
+
+    Not used on the prediction path any more (see `_compile_encoder`),
+    kept so tests can prove the lookup tables give identical codes.
+    """
     classes = list(enc.classes_)
     if value in classes:
         return int(enc.transform([value])[0])
@@ -123,6 +425,44 @@ def _safe_encode(enc: LabelEncoder, value: str) -> int:
     return int(enc.transform([classes[0]])[0])
 
 
+def _compile_encoder(enc: LabelEncoder) -> Tuple[Dict[str, int], int]:
+    """
+    Compile a fitted LabelEncoder into a plain dict lookup table.
+
+    LabelEncoder codes are just positions in the sorted `classes_` array,
+    so the table is {class: index}. The second item is the code used for
+    unseen values: "Unknown"/"unknown"/"UNK" if present, else the first
+    class – the same fallback order as `_safe_encode`.
+    """
+    classes = [str(c) for c in enc.classes_]
+    table = {c: i for i, c in enumerate(classes)}
+
+    default = 0
+    for fallback in ["Unknown", "unknown", "UNK"]:
+        if fallback in table:
+            default = table[fallback]
+            break
+
+    return table, default
+
+
+def _compile_encoders(
+    encoders: Dict[str, LabelEncoder],
+) -> Dict[str, Tuple[Dict[str, int], int]]:
+    return {col: _compile_encoder(enc) for col, enc in encoders.items()}
+
+
+def _encode_value(table: Dict[str, int], default: int, value: Any) -> int:
+    """O(1) encode of a single raw value (hot path)."""
+    return table.get(str(value), default)
+
+
+def _encode_column(table: Dict[str, int], default: int, values: pd.Series) -> np.ndarray:
+    """Vectorized encode of a whole column (batch path)."""
+    codes = values.astype(str).map(table)
+    return codes.fillna(default).to_numpy(dtype=np.int64)
+
+
 # ----------------------------------------------------------------------
 # Probability → Risk label (UPDATED THRESHOLDS)
 # ----------------------------------------------------------------------
@@ -145,6 +485,99 @@ def _probability_to_label(p: float) -> str:
 # ----------------------------------------------------------------------
 # Core ML prediction logic
 # ----------------------------------------------------------------------
+def _encode_frame(bundle: LoadedModel, df: pd.DataFrame) -> np.ndarray:
+    """
+    Turn a DataFrame of raw feature dicts into the float matrix the model
+    expects (numeric cleanup + label encoding + column order).
+    """
+    # Numeric cleanup
+    for col in _NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    # Apply encoders (one dict mapping per column)
+    for col, (table, default) in bundle.encoder_tables.items():
+        if col in df.columns:
+            df[col] = _encode_column(table, default, df[col])
+
+    # Add any missing expected columns
+    for col in bundle.feature_order:
+        if col not in df.columns:
+            df[col] = 0
+
+    return df[bundle.feature_order].to_numpy()
+
+
+def _positive_proba(bundle: LoadedModel, X: np.ndarray) -> np.ndarray:
+    """P(stroke) for each row of an encoded feature matrix."""
+    if bundle.forest is not None and X.shape[0] <= COMPILED_FOREST_MAX_ROWS:
+        return bundle.forest.predict_proba(X)[:, 1]
+    return bundle.model.predict_proba(X)[:, 1]
+
+
+def _result_from_probability(bundle: LoadedModel, proba: float) -> Dict[str, Any]:
+    return {
+        "probability": proba,
+        "stroke_flag": int(proba >= 0.5),
+        "risk_level": _probability_to_label(proba),
+        "model_version": bundle.version,
+    }
+
+
+def _to_number(value: Any) -> float:
+    """Scalar equivalent of pd.to_numeric(errors="coerce").fillna(0)."""
+    if value is None:
+        return 0.0
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if number != number else number  # NaN → 0
+
+
+def _features_to_row(bundle: LoadedModel, features: Dict[str, Any]) -> np.ndarray:
+    """
+    Write one feature dict straight into this thread's preallocated
+    float64 row, in `feature_order`. Same output as `_encode_frame` on a
+    one-row DataFrame, without building the DataFrame.
+    """
+    n_features = len(bundle.feature_order)
+    row = getattr(_ROW_BUFFER, "row", None)
+    if row is None or row.shape[1] != n_features:
+        row = np.zeros((1, n_features), dtype=np.float64)
+        _ROW_BUFFER.row = row
+
+    _fill_row(bundle, features, row[0])
+    return row
+
+
+def _fill_row(bundle: LoadedModel, features: Dict[str, Any], out: np.ndarray) -> None:
+    for i, col in enumerate(bundle.feature_order):
+        if col not in features:
+            out[i] = 0.0
+            continue
+
+        encoder = bundle.encoder_tables.get(col)
+        if encoder is not None:
+            out[i] = _encode_value(encoder[0], encoder[1], features[col])
+        else:
+            out[i] = _to_number(features[col])
+
+
+def _predict_risk_pandas(features: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reference (pandas) implementation of `predict_risk`.
+    Kept for parity tests and the latency benchmark only.
+    """
+    bundle = _ensure_model_loaded()
+
+    X = _encode_frame(bundle, pd.DataFrame([features]))
+
+    proba = float(bundle.model.predict_proba(X)[0][1])
+
+    return _result_from_probability(bundle, proba)
+
+
 def predict_risk(features: Dict[str, Any]) -> Dict[str, Any]:
     """
     Predict stroke probability + risk level using the trained model bundle.
@@ -152,44 +585,90 @@ def predict_risk(features: Dict[str, Any]) -> Dict[str, Any]:
         {
             "probability": float,
             "stroke_flag": 0/1,
-            "risk_level": "Low"|"Medium"|"High"
+            "risk_level": "Low"|"Medium"|"High",
+            "model_version": str   # bundle that produced the score
         }
     """
-    _ensure_model_loaded()
-    assert _MODEL is not None
-    assert _ENCODERS is not None
-    assert _FEATURE_ORDER is not None
+    # One reference for the whole call – a hot reload mid-request
+    # cannot mix encoders from one bundle with trees from another.
+    bundle = _ensure_model_loaded()
 
-    df = pd.DataFrame([features])
+    X = _features_to_row(bundle, features)
 
-    # Numeric cleanup
-    numeric_cols = ["age", "hypertension", "heart_disease", "avg_glucose_level", "bmi"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    key = _cache_key(bundle, X[0])
+    cached = _PREDICTION_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-    # Apply encoders
-    for col, enc in _ENCODERS.items():
-        if col in df.columns:
-            df[col] = df[col].astype(str).apply(lambda v: _safe_encode(enc, v))
+    # Predict probability
+    proba = float(_positive_proba(bundle, X)[0])
 
-    # Add any missing expected columns
-    for col in _FEATURE_ORDER:
-        if col not in df.columns:
-            df[col] = 0
+    result = _result_from_probability(bundle, proba)
+    _PREDICTION_CACHE.put(key, result)
+    return result
 
-    df = df[_FEATURE_ORDER]
 
-    # Predict probability
-    proba = float(_MODEL.predict_proba(df.to_numpy())[0][1])
-    stroke_flag = int(proba >= 0.5)
+def _score_rows(bundle: LoadedModel, X: np.ndarray, use_cache: bool) -> List[Dict[str, Any]]:
+    """Results for encoded rows `X`; with `use_cache` only cache misses are scored."""
+    if not use_cache:
+        return [_result_from_probability(bundle, float(p)) for p in _positive_proba(bundle, X)]
 
-    risk_level = _probability_to_label(proba)
+    keys = [_cache_key(bundle, row) for row in X]
+    results: List[Dict[str, Any] | None] = [_PREDICTION_CACHE.get(k) for k in keys]
 
-    return {
-        "probability": proba,
-        "stroke_flag": stroke_flag,
-        "risk_level": risk_level,
-    }
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        probas = _positive_proba(bundle, X[missing])
+        for i, p in zip(missing, probas):
+            result = _result_from_probability(bundle, float(p))
+            _PREDICTION_CACHE.put(keys[i], result)
+            results[i] = result
+
+    return results  # type: ignore[return-value]
+
+
+def predict_risk_rows(features_list: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score a SMALL list of feature dicts with one model call, encoding each
+    row exactly as `predict_risk` does (no DataFrame). Used by the
+    micro-batcher, whose batches are a few dozen rows at most.
+    """
+    bundle = _ensure_model_loaded()
+
+    X = np.empty((len(features_list), len(bundle.feature_order)), dtype=np.float64)
+    for features, out in zip(features_list, X):
+        _fill_row(bundle, features, out)
+
+    return _score_rows(bundle, X, len(features_list) <= CACHED_BATCH_MAX_ROWS)
+
+
+def predict_risk_many(
+    features_list: Sequence[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Batch version of `predict_risk`.
+
+    Rows are encoded column-at-a-time and scored with ONE predict_proba
+    call per chunk of `batch_size` rows. Calls of up to
+    CACHED_BATCH_MAX_ROWS rows go through the prediction cache (only
+    misses are scored); bigger ones bypass it. Results come back in input
+    order.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+
+    bundle = _ensure_model_loaded()
+    use_cache = len(features_list) <= CACHED_BATCH_MAX_ROWS
+
+    results: List[Dict[str, Any]] = []
+
+    for start in range(0, len(features_list), batch_size):
+        chunk = features_list[start:start + batch_size]
+        X = _encode_frame(bundle, pd.DataFrame(list(chunk))).astype(np.float64)
+        results.extend(_score_rows(bundle, X, use_cache))
+
+    return results
 
 
 # ----------------------------------------------------------------------
@@ -209,3 +688,21 @@ def run_ml_on_patient_doc(doc: Dict[str, Any]) -> Tuple[float, int, str]:
     risk_level = result["risk_level"]
 
     return proba, stroke_flag, risk_level
+
+
+def run_ml_on_patient_docs(
+    docs: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Tuple[float, int, str]]:
+    """
+    Batch version of `run_ml_on_patient_doc` for scripts / bulk endpoints.
+    Returns one (probability, stroke_flag, risk_level) tuple per document,
+    in the same order as `docs`.
+    """
+    features_list = [build_features_from_patient_doc(d) for d in docs]
+    results = predict_risk_many(features_list, batch_size=batch_size)
+
+    return [
+        (float(r["probability"]), int(r["stroke_flag"]), r["risk_level"])
+        for r in results
+    ]
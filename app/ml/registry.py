@@ -0,0 +1,219 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# app/ml/registry.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from app.ml import predict_service
+from app.ml.forest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Hot reload for instance/stroke_model.joblib.
+
+    A daemon thread stats the bundle every `interval` seconds. When the
+    file changes and its sha256 differs from the serving model, the new
+    bundle is loaded and prepared on the watcher thread, then published
+    with `predict_service.install_model` – one reference swap, so
+    requests never wait on a load and never see a half-built model.
+
+    Deploy a new bundle with an atomic rename (train_model.py does), so
+    the watcher never reads a partially written file.
+    """
+
+    def __init__(self, path: Path, interval: float = 5.0) -> None:
+        self.path = Path(path)
+        self.interval = float(interval)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+
+        # (inode, size, mtime) of the last file we looked at
+        self._stat_key: tuple | None = None
+
+        self.checks = 0
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_reload_at: float | None = None
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+    def _stat(self) -> tuple:
+        st = os.stat(self.path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def check(self) -> bool:
+        """
+        Load + publish the bundle if it is a new version.
+        Returns True when the serving model was swapped.
+        """
+        with self._lock:
+            self.checks += 1
+            try:
+                stat_key = self._stat()
+            except FileNotFoundError:
+                return False
+
+            # Cheap path: nothing on disk changed since the last check
+            if stat_key == self._stat_key:
+                return False
+            self._stat_key = stat_key
+
+            sha256 = file_sha256(self.path)
+            active = predict_service._ACTIVE
+            if active is not None and active.sha256 == sha256:
+                return False
+
+            try:
+                loaded = predict_service.load_bundle(self.path, sha256)
+            except Exception as exc:
+                # Retried once the file changes again (e.g. copy finished)
+                self.failures += 1
+                self.last_error = repr(exc)
+                logger.warning("Model reload from %s failed: %r", self.path, exc)
+                return False
+
+            previous = predict_service.install_model(loaded)
+            self.reloads += 1
+            self.last_error = None
+            self.last_reload_at = time.time()
+
+        logger.info(
+            "Model reloaded: %s -> %s",
+            previous.version if previous is not None else None,
+            loaded.version,
+        )
+        return True
+
+    # ------------------------------------------------------------------
+    # Watcher thread
+    # ------------------------------------------------------------------
+    def is_running(self) -> bool:
+        thread = self._thread
+        return (
+            thread is not None
+            and self._thread_pid == os.getpid()
+            and thread.is_alive()
+        )
+
+    def start(self) -> None:
+        """Start the watcher in THIS process (threads do not survive fork)."""
+        if self.is_running():
+            return
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._stop,),
+            name="model-registry",
+            daemon=True,
+        )
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._thread_pid == os.getpid():
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:  # pragma: no cover - keep watching
+                logger.exception("Model registry check failed")
+
+    def _reset_after_fork(self) -> None:
+        # The lock may have been held by the parent's watcher thread.
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "interval_seconds": self.interval,
+            "watching": self.is_running(),
+            "checks": self.checks,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_reload_at": self.last_reload_at,
+        }
+
+
+# ----------------------------------------------------------------------
+# Process-wide registry
+# ----------------------------------------------------------------------
+_REGISTRY: ModelRegistry | None = None
+
+
+def _reset_after_fork() -> None:
+    if _REGISTRY is not None:
+        _REGISTRY._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def start_model_watcher(interval: float, path: Path | None = None) -> ModelRegistry:
+    """Create (once) and start the registry for this process."""
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        _REGISTRY = ModelRegistry(path or predict_service.MODEL_PATH, interval)
+    _REGISTRY.start()
+    return _REGISTRY
+
+
+def ensure_model_watcher() -> None:
+    """
+    Restart the watcher in a forked worker. Called before each request;
+    only a PID comparison once the thread is running.
+    """
+    registry = _REGISTRY
+    if registry is not None and not registry.is_running():
+        registry.start()
+
+
+def get_registry_stats() -> Dict[str, Any]:
+    """Serving model version + reload counters for this worker."""
+    loaded = predict_service._ACTIVE
+    stats: Dict[str, Any] = {
+        "pid": os.getpid(),
+        "model_version": loaded.version if loaded is not None else None,
+        "model_sha256": loaded.sha256 if loaded is not None else None,
+        "loaded_at": loaded.loaded_at if loaded is not None else None,
+    }
+    if _REGISTRY is not None:
+        stats["registry"] = _REGISTRY.stats()
+    return stats
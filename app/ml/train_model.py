@@ -16,6 +16,7 @@ AI Statement: Portions of this file were drafted or refined using
 # app/ml/train_model.py
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
 import joblib
@@ -26,6 +27,8 @@ from sklearn.metrics import classification_report, roc_auc_score
 from sklearn.model_selection import train_test_split, RandomizedSearchCV
 from sklearn.preprocessing import LabelEncoder
 
+from app.ml.forest import file_sha256
+
 
 # Resolve project base dir safely no matter where we run from
 BASE_DIR = Path(__file__).resolve().parents[2]
@@ -179,8 +182,12 @@ def train_balanced_model() -> None:
         "feature_order": feature_cols,
     }
 
-    joblib.dump(bundle, MODEL_PATH)
-    print(f"\n✔ NEW TUNED MODEL SAVED as {MODEL_PATH}")
+    # Write next to the target, then rename: a running app's model watcher
+    # (ML_MODEL_WATCH_SECONDS) only ever sees a complete bundle.
+    tmp_path = MODEL_PATH.with_name(f".{MODEL_PATH.name}.tmp")
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
+    print(f"\n✔ NEW TUNED MODEL SAVED as {MODEL_PATH} (sha256 {file_sha256(MODEL_PATH)[:12]})")
 
 
 if __name__ == "__main__":
@@ -27,6 +27,7 @@ from .session import Session
 from .stroke_prediction import StrokePrediction
 from .password_reset import PasswordResetToken
 from .audit_log import AuditLog
+from .prediction_rollup import PredictionDailyRollup
 
 __all__ = [
     "User",
@@ -34,4 +35,5 @@ __all__ = [
     "StrokePrediction",
     "PasswordResetToken",
     "AuditLog",
+    "PredictionDailyRollup",
 ]
@@ -23,11 +23,31 @@ from app.extensions import db
 
 class AuditLog(db.Model):
     __tablename__ = "audit_logs"
+    # Admin audit browser: newest first, optionally per event type or per
+    # user (SQLite index entries end with the rowid, so ties on
+    # created_at are ordered by id too – the keyset page key)
+    __table_args__ = (
+        db.Index("ix_audit_logs_created_at", "created_at"),
+        db.Index("ix_audit_logs_event_type_created_at", "event_type", "created_at"),
+        db.Index("ix_audit_logs_user_id_created_at", "user_id", "created_at"),
+        db.Index("ix_audit_logs_resource_type_created_at", "resource_type", "created_at"),
+        db.Index(
+            "ix_audit_logs_resource_created_at",
+            "resource_type",
+            "resource_id",
+            "created_at",
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, nullable=True, index=True)
+    user_id = db.Column(db.Integer, nullable=True)
     action = db.Column(db.String(255), nullable=False)
 
+    # Typed copies of what audit() folds into `action`
+    event_type = db.Column(db.String(64), nullable=True)
+    resource_type = db.Column(db.String(64), nullable=True)
+    resource_id = db.Column(db.String(64), nullable=True)
+
     # IMPORTANT: name must match your existing SQLite column.
     # In your DB the column is called "ip_address", so we use that.
     ip_address = db.Column(db.String(64))
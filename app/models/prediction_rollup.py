@@ -0,0 +1,43 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# app/models/prediction_rollup.py
+from __future__ import annotations
+
+from app.extensions import db
+
+
+class PredictionDailyRollup(db.Model):
+    """
+    Number of stroke_predictions per (UTC day, risk_level, user role).
+
+    Kept in step with stroke_predictions by app.db.prediction_rollup
+    (ORM insert / delete events and purge_predictions); analytics reads
+    this table instead of grouping the predictions themselves. user_role
+    is the predicting user's role at that time, "anonymous" without a
+    user.
+    """
+
+    __tablename__ = "prediction_daily_rollup"
+
+    # (day, ...) primary key: a date range is a range scan of the key
+    day = db.Column(db.Date, primary_key=True)
+    risk_level = db.Column(db.String(20), primary_key=True)
+    user_role = db.Column(db.String(50), primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:  # type: ignore[override]
+        return f"<PredictionDailyRollup {self.day} {self.risk_level} {self.user_role}={self.count}>"
@@ -30,16 +30,23 @@ class StrokePrediction(db.Model):
     # Link to the logged-in user who triggered the prediction
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
 
+    # That user's role when the prediction was made ("anonymous" without a
+    # user) – the prediction_daily_rollup key, fixed at insert time
+    user_role = db.Column(db.String(50), nullable=True)
+
     # ML outputs
     probability = db.Column(db.Float, nullable=False)      # e.g. 0.73
     stroke_flag = db.Column(db.Integer, nullable=False)    # 0 or 1
     risk_level = db.Column(db.String(20), nullable=False)  # "Low" / "Medium" / "High"
 
+    # Version (short sha256) of the model bundle that produced the score
+    model_version = db.Column(db.String(64), nullable=True)
+
     # Raw input features we passed into the model (gender, age, etc.)
     raw_features = db.Column(db.JSON, nullable=False)
 
     # When this prediction was created
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     # Relationship back to the user
     user = db.relationship("User", backref="stroke_predictions", lazy=True)
@@ -49,9 +56,11 @@ class StrokePrediction(db.Model):
         return {
             "id": self.id,
             "user_id": self.user_id,
+            "user_role": self.user_role,
             "probability": self.probability,
             "stroke_flag": self.stroke_flag,
             "risk_level": self.risk_level,
+            "model_version": self.model_version,
             "raw_features": self.raw_features,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
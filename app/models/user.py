@@ -23,7 +23,7 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     username = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
-    role = db.Column(db.String(50), default="patient")  # patient / doctor / hcp / admin
+    role = db.Column(db.String(50), default="patient", index=True)  # patient / doctor / hcp / admin
 
     # --------------------------
     # Password helpers
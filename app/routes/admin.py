@@ -16,9 +16,10 @@ AI Statement: Portions of this file were drafted or refined using
 # app/routes/admin.py
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 import json
+import re
 
 from bson.objectid import ObjectId
 from flask import (
@@ -35,8 +36,15 @@ from flask_login import login_required, current_user
 from sqlalchemy import func
 
 from app.extensions import db
-from app.models import User, StrokePrediction, AuditLog, Session
+from app.models import User, AuditLog
 from app.db.mongo import get_patient_collection
+from app.db.admin_kpis import get_admin_kpis
+from app.db.pagination import aggregate_keyset_page, fetch_sql_keyset_page
+from app.db.prediction_rollup import predictions_by_risk, predictions_per_bucket
+from app.db.patient_row import PATIENT_ROW_FLAT_PROJECT, PatientRow
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION
+from app.db.risk_stats import ACTIVE_OR_UNFLAGGED_FILTER
+from app.utils.audit import AUDIT_EVENT_TYPES
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -59,58 +67,57 @@ def _admin_dashboard_url() -> str:
     return url_for("admin.admin_dashboard")
 
 
-def _doc_to_patient_row(doc: dict) -> dict:
+def _parse_day(value: str | None) -> datetime | None:
+    """YYYY-MM-DD from a query string argument, None when missing / invalid."""
+    try:
+        return datetime.strptime((value or "").strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+# Admin patient browser: status / risk / search filters on the stored
+# fields, one keyset page per request, flattened by an aggregation
+# $project (both the nested and the flat admin-created shapes)
+ADMIN_PATIENT_STATUSES = ("active", "inactive", "all")
+
+ADMIN_PATIENT_SORTS = {
+    # _id_ / idx_level_id
+    "newest": [("_id", -1)],
+    # idx_score_id / idx_level_score_id
+    "risk": [("risk_assessment.score", -1), ("_id", 1)],
+}
+
+
+def _admin_patient_filter(status: str, risk_filter: str, search_query: str) -> dict:
     """
-    Flatten a Mongo patient document into a simple dict for the template.
-    Supports BOTH:
-      - imported Kaggle docs with nested demographics / medical_history / risk_assessment
-      - manually created docs with flat fields (gender, age, hypertension, stroke, etc.)
+    Mongo filter for the admin patient list. Admin-created documents have
+    no is_active flag, so "active" includes unflagged documents.
     """
-    demographics = (doc.get("demographics") or {}) if isinstance(doc.get("demographics"), dict) else {}
-    medical = (doc.get("medical_history") or {}) if isinstance(doc.get("medical_history"), dict) else {}
-    risk = (doc.get("risk_assessment") or {}) if isinstance(doc.get("risk_assessment"), dict) else {}
-
-    # Basic fields with fallback to flat keys
-    gender = demographics.get("gender") or doc.get("gender")
-    age = demographics.get("age")
-    if age is None:
-        age = doc.get("age")
-
-    hypertension = medical.get("hypertension")
-    if hypertension is None:
-        hypertension = doc.get("hypertension")
-
-    stroke_flag = medical.get("stroke")
-    if stroke_flag is None:
-        stroke_flag = doc.get("stroke")
-
-    # Risk level from ML / rules
-    probability = risk.get("probability")
-    level = risk.get("level") or doc.get("risk_label")
-
-    # If we only have probability, derive Low / Medium / High
-    if level is None and probability is not None:
-        try:
-            p = float(probability)
-        except (TypeError, ValueError):
-            p = 0.0
-
-        if p >= 0.66:
-            level = "High"
-        elif p >= 0.33:
-            level = "Medium"
-        else:
-            level = "Low"
-
-    return {
-        "_id": str(doc.get("_id")),
-        "name": doc.get("name"),
-        "gender": gender,
-        "age": age,
-        "hypertension": hypertension,
-        "stroke": stroke_flag,
-        "risk_level": level,  # used by admin/patients.html
-    }
+    parts: list = []
+
+    if status == "active":
+        parts.append(ACTIVE_OR_UNFLAGGED_FILTER)
+    elif status == "inactive":
+        parts.append({"system_metadata.is_active": False})
+
+    if risk_filter in ("high", "medium", "low"):
+        parts.append({"risk_assessment.level": risk_filter.capitalize()})
+
+    if search_query:
+        pattern = {"$regex": re.escape(search_query), "$options": "i"}
+        ors: list = [
+            {"demographics.name": pattern},
+            {"name": pattern},
+            {"patient_id": search_query},
+        ]
+        digits = re.sub(r"\D+", "", search_query)
+        if digits:
+            ors.append({"original_id": int(digits)})
+        parts.append({"$or": ors})
+
+    if not parts:
+        return {}
+    return parts[0] if len(parts) == 1 else {"$and": parts}
 
 
 # ---------------------------------------------------------
@@ -131,26 +138,9 @@ def admin_root():
 def admin_dashboard():
     _ensure_admin()
 
-    # Basic user stats
-    total_users = User.query.count()
-    admin_count = User.query.filter_by(role="admin").count()
-    doctor_count = User.query.filter_by(role="doctor").count()
-    hcp_count = User.query.filter_by(role="hcp").count()
-    patient_user_count = User.query.filter_by(role="patient").count()
-
-    # Stroke prediction stats
-    total_predictions = StrokePrediction.query.count()
-
-    today_start = datetime.utcnow().replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    predictions_today = (
-        StrokePrediction.query
-        .filter(StrokePrediction.created_at >= today_start)
-        .count()
-    )
-
-    active_sessions = Session.query.count()
+    # Users by role, predictions (total / today), sessions: three
+    # aggregate queries, cached until a user or prediction is written
+    metrics = get_admin_kpis()
 
     # Recent audit log entries
     recent_logs = (
@@ -160,17 +150,6 @@ def admin_dashboard():
         .all()
     )
 
-    metrics = {
-        "total_users": total_users,
-        "admin_count": admin_count,
-        "doctor_count": doctor_count,
-        "hcp_count": hcp_count,
-        "patient_count": patient_user_count,
-        "total_predictions": total_predictions,
-        "predictions_today": predictions_today,
-        "active_sessions": active_sessions,
-    }
-
     has_predict_view = "predict.predict" in current_app.view_functions
 
     return render_template(
@@ -187,46 +166,68 @@ def admin_dashboard():
 # --------------------------------------------------------------------
 # ADMIN ANALYTICS – predictions + risk + users by role
 # --------------------------------------------------------------------
+# Longer ranges are charted per month
+ANALYTICS_MAX_DAILY_POINTS = 180
+# Longest range the page shows; a longer one keeps its end date
+ANALYTICS_MAX_SPAN_DAYS = 5 * 366
+
+
+def _analytics_range(start_arg: str | None, end_arg: str | None) -> tuple[date, date]:
+    """
+    (start, end) from the query string: default the last 14 days, swapped
+    when reversed, and clamped to ANALYTICS_MAX_SPAN_DAYS – computed so
+    no date arithmetic can leave date.min / date.max.
+    """
+    end = _parse_day(end_arg)
+    end_date = end.date() if end else datetime.utcnow().date()
+
+    start = _parse_day(start_arg)
+    if start:
+        start_date = start.date()
+    else:
+        start_date = end_date - min(timedelta(days=13), end_date - date.min)
+
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+
+    max_span = timedelta(days=ANALYTICS_MAX_SPAN_DAYS - 1)
+    if end_date - start_date > max_span:
+        start_date = end_date - max_span
+    return start_date, end_date
+
+
 @bp.route("/analytics")
 @login_required
 def admin_analytics():
     _ensure_admin()
 
-    # ---------- PREDICTIONS OVER LAST 14 DAYS ----------
-    today = datetime.utcnow().date()
-    start_date = today - timedelta(days=13)  # inclusive window: 14 days
-
-    # Query counts per calendar day from StrokePrediction
-    daily_query = (
-        db.session.query(
-            func.date(StrokePrediction.created_at).label("day"),
-            func.count(StrokePrediction.id).label("count"),
-        )
-        .filter(StrokePrediction.created_at >= start_date)
-        .group_by(func.date(StrokePrediction.created_at))
-        .order_by(func.date(StrokePrediction.created_at))
-    )
+    # ---------- DATE RANGE (default: last 14 days) ----------
+    start_date, end_date = _analytics_range(request.args.get("start"), request.args.get("end"))
 
-    daily_rows = daily_query.all()
-    daily_map = {row.day: row.count for row in daily_rows}
+    # Read from prediction_daily_rollup: at most one row per day (or per
+    # month for long ranges) instead of grouping stroke_predictions
+    span_days = (end_date - start_date).days + 1
+    monthly = span_days > ANALYTICS_MAX_DAILY_POINTS
+    per_bucket = predictions_per_bucket(start_date, end_date, monthly=monthly)
 
     daily_labels: list[str] = []
     daily_values: list[int] = []
 
-    for i in range(14):
-        d = start_date + timedelta(days=i)
-        daily_labels.append(d.strftime("%Y-%m-%d"))
-        daily_values.append(int(daily_map.get(d, 0)))
-
-    # ---------- RISK LEVEL DISTRIBUTION (GLOBAL) ----------
-    risk_rows = (
-        db.session.query(
-            StrokePrediction.risk_level,
-            func.count(StrokePrediction.id),
-        )
-        .group_by(StrokePrediction.risk_level)
-        .all()
-    )
+    if monthly:
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            label = f"{year:04d}-{month:02d}"
+            daily_labels.append(label)
+            daily_values.append(per_bucket.get(label, 0))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    else:
+        for i in range(span_days):
+            label = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
+            daily_labels.append(label)
+            daily_values.append(per_bucket.get(label, 0))
+
+    # ---------- RISK LEVEL DISTRIBUTION (SAME RANGE) ----------
+    risk_rows = predictions_by_risk(start_date, end_date)
 
     # Normalise into Low / Medium / High buckets
     risk_buckets = {"Low": 0, "Medium": 0, "High": 0}
@@ -267,6 +268,77 @@ def admin_analytics():
         total_predictions=total_predictions,
         user_role_labels=user_role_labels,
         user_role_values=user_role_values,
+        start_date=start_date.isoformat(),
+        end_date=end_date.isoformat(),
+        monthly=monthly,
+    )
+
+
+# =========================================================
+# AUDIT LOG BROWSER
+# =========================================================
+# Newest first, keyset-paged on (created_at, id); each filter is an
+# equality prefix of an audit_logs index followed by created_at
+# (event_type / user_id / resource_type [+ resource_id]), so a page is
+# one index range scan however large the table is.
+AUDIT_SORT_COLUMNS = (AuditLog.created_at, AuditLog.id)
+
+
+@bp.route("/audit")
+@login_required
+def admin_audit_logs():
+    _ensure_admin()
+
+    args = request.args
+    filters = {
+        "event_type": (args.get("event_type") or "").strip(),
+        "user_id": (args.get("user_id") or "").strip(),
+        "resource_type": (args.get("resource_type") or "").strip(),
+        "resource_id": (args.get("resource_id") or "").strip(),
+        "date_from": (args.get("date_from") or "").strip(),
+        "date_to": (args.get("date_to") or "").strip(),
+    }
+
+    query = AuditLog.query
+    if filters["event_type"]:
+        query = query.filter(AuditLog.event_type == filters["event_type"])
+    if filters["user_id"].isdigit():
+        query = query.filter(AuditLog.user_id == int(filters["user_id"]))
+    else:
+        filters["user_id"] = ""
+    if filters["resource_type"]:
+        query = query.filter(AuditLog.resource_type == filters["resource_type"])
+        if filters["resource_id"]:
+            query = query.filter(AuditLog.resource_id == filters["resource_id"])
+    else:
+        filters["resource_id"] = ""
+
+    # Whole days, both ends inclusive
+    date_from = _parse_day(filters["date_from"])
+    if date_from is not None:
+        query = query.filter(AuditLog.created_at >= date_from)
+    else:
+        filters["date_from"] = ""
+    date_to = _parse_day(filters["date_to"])
+    if date_to is not None:
+        query = query.filter(AuditLog.created_at < date_to + timedelta(days=1))
+    else:
+        filters["date_to"] = ""
+
+    logs, next_token, prev_token = fetch_sql_keyset_page(
+        query,
+        AUDIT_SORT_COLUMNS,
+        limit=current_app.config.get("AUDIT_PAGE_SIZE", 100),
+        token=args.get("cursor"),
+    )
+
+    return render_template(
+        "admin/audit_logs.html",
+        logs=logs,
+        filters=filters,
+        event_types=AUDIT_EVENT_TYPES,
+        next_cursor=next_token,
+        prev_cursor=prev_token,
     )
 
 
@@ -398,11 +470,41 @@ def admin_patients():
     _ensure_admin()
     coll = get_patient_collection()
 
-    # Fetch all docs and flatten them so template gets risk_level etc.
-    docs = coll.find({})
-    patients = [_doc_to_patient_row(d) for d in docs]
+    status = (request.args.get("status") or "active").strip().lower()
+    if status not in ADMIN_PATIENT_STATUSES:
+        status = "active"
+
+    risk_filter = (request.args.get("filter") or "all").strip().lower()
+    if risk_filter not in ("high", "medium", "low"):
+        risk_filter = "all"
 
-    return render_template("admin/patients.html", patients=patients)
+    sort = (request.args.get("sort") or "newest").strip().lower()
+    if sort not in ADMIN_PATIENT_SORTS:
+        sort = "newest"
+
+    q = (request.args.get("q") or "").strip()
+
+    # One page of already-flattened rows per request
+    rows, next_token, prev_token = aggregate_keyset_page(
+        coll,
+        _admin_patient_filter(status, risk_filter, q),
+        ADMIN_PATIENT_SORTS[sort],
+        limit=current_app.config.get("PATIENTS_PAGE_SIZE", 50),
+        token=request.args.get("cursor"),
+        project=PATIENT_ROW_FLAT_PROJECT,
+    )
+    patients = [PatientRow.from_flat(r) for r in rows]
+
+    return render_template(
+        "admin/patients.html",
+        patients=patients,
+        status=status,
+        risk_filter=risk_filter,
+        sort=sort,
+        search_query=q,
+        next_cursor=next_token,
+        prev_cursor=prev_token,
+    )
 
 
 # CREATE
@@ -413,6 +515,7 @@ def admin_create_patient():
     coll = get_patient_collection()
 
     if request.method == "POST":
+        now = datetime.utcnow()
         doc = {
             "patient_id": request.form.get("patient_id", "").strip(),
             "name": request.form.get("name", "").strip(),
@@ -428,7 +531,24 @@ def admin_create_patient():
             "bmi": float(request.form.get("bmi") or 0),
             "smoking_status": request.form.get("smoking_status", "").strip(),
             "stroke": int(request.form.get("stroke") or 0),
-            "created_at": datetime.utcnow(),
+            "risk_assessment": {
+                "level": "Unknown",  # scored by the recompute job
+                "score": 0.0,
+                "flag": 0,
+                "factors": [],
+                "calculated_at": None,
+            },
+            "schema_version": CURRENT_SCHEMA_VERSION,
+            "created_at": now,
+            # the recompute job (and every clinical list) selects
+            # is_active: true only
+            "system_metadata": {
+                "created_by": getattr(current_user, "id", None),
+                "created_at": now,
+                "last_modified_by": getattr(current_user, "id", None),
+                "last_modified_at": now,
+                "is_active": True,
+            },
         }
 
         coll.insert_one(doc)
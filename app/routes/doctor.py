@@ -2,12 +2,11 @@
 from __future__ import annotations
 
 from datetime import datetime
-from io import StringIO
-import csv
 import re
 
 from flask import (
     Blueprint,
+    current_app,
     render_template,
     redirect,
     url_for,
@@ -15,6 +14,7 @@ from flask import (
     abort,
     flash,
     Response,
+    stream_with_context,
 )
 from flask_login import login_required, current_user
 from bson.objectid import ObjectId
@@ -22,6 +22,17 @@ from bson.objectid import ObjectId
 from app.extensions import db  # noqa: F401  (kept if used elsewhere)
 from app.models import StrokePrediction
 from app.db.mongo import get_patient_collection
+from app.db.pagination import fetch_keyset_page
+from app.db.patient_row import PATIENT_ROW_PROJECTION, PatientRow
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION, migration_update, risk_of
+from app.db.risk_stats import risk_distribution
+from app.utils.export import (
+    COLUMNAR_FORMATS,
+    EXPORT_PROJECTION,
+    columnar_available,
+    iter_columnar,
+    iter_csv,
+)
 
 bp = Blueprint("doctor", __name__, url_prefix="/doctor")
 
@@ -62,24 +73,9 @@ def doctor_dashboard():
     # Patient + risk KPIs (Mongo)
     # ---------------------------
     try:
-        base_filter: dict = {"system_metadata.is_active": True}
-
-        # total active patients
-        my_patients_count = coll.count_documents(base_filter)
-
-        # count high-risk patients (supports both level and _level)
-        high_risk_filter = {
-            "$and": [
-                base_filter,
-                {
-                    "$or": [
-                        {"risk_assessment._level": "High"},
-                        {"risk_assessment.level": "High"},
-                    ]
-                },
-            ]
-        }
-        high_risk_count = coll.count_documents(high_risk_filter)
+        distribution = risk_distribution(coll)
+        my_patients_count = distribution["total"]
+        high_risk_count = distribution["High"]
     except Exception:
         my_patients_count = 0
         high_risk_count = 0
@@ -173,7 +169,7 @@ def _build_patient_filter(
     """
     Builds a MongoDB filter based on:
       - risk_filter: all|high|medium|low
-      - search_query: matches name/gender/smoking_status OR dataset original_id
+      - search_query: matches name/gender/work_type/smoking_status OR dataset original_id
         (supports user typing "Patient 24289" or "24289")
     """
     base = {"system_metadata.is_active": True}
@@ -181,13 +177,10 @@ def _build_patient_filter(
     risk_filter_norm = (risk_filter or "all").strip().lower()
     search_query_norm = (search_query or "").strip()
 
-    risk_or = None
+    risk_match = None
     if risk_filter_norm in ("high", "medium", "low"):
-        label = risk_filter_norm.capitalize()  # High / Medium / Low
-        risk_or = [
-            {"risk_assessment.level": label},
-            {"risk_assessment._level": label},
-        ]
+        # High / Medium / Low on the canonical (schema v2) field
+        risk_match = {"risk_assessment.level": risk_filter_norm.capitalize()}
 
     text_or = None
     if search_query_norm:
@@ -197,6 +190,7 @@ def _build_patient_filter(
         ors = [
             {"demographics.name": {"$regex": escaped, "$options": "i"}},
             {"demographics.gender": {"$regex": escaped, "$options": "i"}},
+            {"demographics.work_type": {"$regex": escaped, "$options": "i"}},
             {"medical_history.smoking_status": {"$regex": escaped, "$options": "i"}},
         ]
 
@@ -211,16 +205,8 @@ def _build_patient_filter(
         text_or = ors
 
     # Combine safely
-    if risk_or and text_or:
-        return {
-            "$and": [
-                base,
-                {"$or": risk_or},
-                {"$or": text_or},
-            ]
-        }
-    if risk_or:
-        return {**base, "$or": risk_or}
+    if risk_match:
+        base = {**base, **risk_match}
     if text_or:
         return {**base, "$or": text_or}
     return base
@@ -229,6 +215,14 @@ def _build_patient_filter(
 # --------------------------------------------------------------------
 # PATIENT LIST (READ)
 # --------------------------------------------------------------------
+# Sort key of the list; _id makes it unique so keyset pages never skip
+# or repeat patients that share a score / original_id.
+PATIENT_LIST_SORT = [
+    ("risk_assessment.score", -1),
+    ("original_id", 1),
+    ("_id", 1),
+]
+
 @bp.route("/patients")
 @login_required
 def doctor_patients():
@@ -239,68 +233,37 @@ def doctor_patients():
 
     coll = get_patient_collection()
 
-    mongo_query: dict = {"system_metadata.is_active": True}
-
-    # Apply risk filter (use the ML canonical field)
-    if risk_filter in {"high", "medium", "low"}:
-        mongo_query["risk_assessment._level"] = risk_filter.title()  # "High"/"Medium"/"Low"
-    else:
+    if risk_filter not in {"high", "medium", "low"}:
         risk_filter = "all"
 
-    # Simple search (by original_id or a couple text fields)
-    if q:
-        or_clauses = []
-
-        # if numeric, match original_id
-        if q.isdigit():
-            or_clauses.append({"original_id": int(q)})
-
-        # text matches
-        or_clauses.extend(
-            [
-                {"demographics.gender": {"$regex": q, "$options": "i"}},
-                {"demographics.work_type": {"$regex": q, "$options": "i"}},
-                {"medical_history.smoking_status": {"$regex": q, "$options": "i"}},
-            ]
-        )
-
-        mongo_query["$or"] = or_clauses
-
-    docs = list(
-        coll.find(mongo_query).sort(
-            [("risk_assessment._score", -1), ("original_id", 1)]
-        )
+    # Same filter as the CSV export, so the export is exactly this view
+    mongo_query = _build_patient_filter(risk_filter, q)
+
+    # One page per request: keyset pagination on the list's sort key
+    # (index idx_active_score_oid / idx_active_level_score_oid)
+    page_size = current_app.config.get("PATIENTS_PAGE_SIZE", 50)
+    docs, next_token, prev_token = fetch_keyset_page(
+        coll,
+        mongo_query,
+        PATIENT_LIST_SORT,
+        limit=page_size,
+        token=request.args.get("cursor"),
+        projection=PATIENT_ROW_PROJECTION,
     )
 
-    # build view models (whatever you already do) – just ensure these map from _level/_score
-    patients = []
-    for d in docs:
-        ra = d.get("risk_assessment") or {}
-        demo = d.get("demographics") or {}
-        patients.append(
-            type(
-                "P",
-                (),
-                {
-                    "id": str(d.get("_id")),
-                    "name": demo.get("name") or f"Patient {d.get('original_id')}",
-                    "gender": demo.get("gender"),
-                    "age": demo.get("age"),
-                    "risk_level": ra.get("_level") or "Unknown",
-                    "risk_score": float(ra.get("_score") or 0.0),
-                },
-            )()
-        )
+    patients = [PatientRow.from_doc(d) for d in docs]
 
     return render_template(
         "doctor/patients.html",
         patients=patients,
         risk_filter=risk_filter,
         search_query=q,
+        next_cursor=next_token,
+        prev_cursor=prev_token,
     )
 
 # --------------------------------------------------------------------
-# EXPORT (scoped CSV, HIPAA-friendly: only current filter/view)
+# EXPORT (scoped CSV / Parquet / Arrow, HIPAA-friendly: only current filter/view)
 # --------------------------------------------------------------------
 @bp.route("/patients/export", methods=["GET"])
 @login_required
@@ -312,71 +275,37 @@ def doctor_export_patients():
     risk_filter = request.args.get("filter", "all")
     search_query = (request.args.get("q") or "").strip()
 
+    export_format = (request.args.get("format") or "csv").strip().lower()
+
+    if export_format != "csv":
+        if export_format not in COLUMNAR_FORMATS:
+            abort(400)
+        if not columnar_available():
+            flash("Parquet/Arrow export is not available on this server.", "warning")
+            return redirect(
+                url_for("doctor.doctor_patients", filter=risk_filter, q=search_query)
+            )
+
     mongo_filter = _build_patient_filter(risk_filter, search_query)
 
-    docs = coll.find(mongo_filter)
-
-    output = StringIO()
-    writer = csv.writer(output)
-
-    writer.writerow(
-        [
-            "patient_id",
-            "name",
-            "gender",
-            "age",
-            "work_type",
-            "residence_type",
-            "hypertension",
-            "heart_disease",
-            "avg_glucose_level",
-            "bmi",
-            "smoking_status",
-            "dataset_stroke_flag",
-            "risk_level",
-            "risk_score",
-        ]
+    cfg = current_app.config
+    docs = coll.find(
+        mongo_filter,
+        EXPORT_PROJECTION,
+        batch_size=cfg.get("EXPORT_CURSOR_BATCH_SIZE", 2000),
     )
 
-    for d in docs:
-        demo = d.get("demographics", {}) or {}
-        med = d.get("medical_history", {}) or {}
-        risk = d.get("risk_assessment", {}) or {}
-
-        level = risk.get("level")
-        if level is None:
-            level = risk.get("_level")
-
-        score = risk.get("score")
-        if score is None:
-            score = risk.get("_score")
-
-        writer.writerow(
-            [
-                str(d.get("_id")),
-                demo.get("name") or f"Patient {d.get('original_id')}",
-                demo.get("gender"),
-                demo.get("age"),
-                demo.get("work_type"),
-                demo.get("residence_type"),
-                med.get("hypertension"),
-                med.get("heart_disease"),
-                med.get("avg_glucose_level"),
-                med.get("bmi"),
-                med.get("smoking_status"),
-                med.get("stroke"),
-                level,
-                score,
-            ]
-        )
-
-    csv_data = output.getvalue()
-    output.close()
+    if export_format == "csv":
+        body = iter_csv(docs, cfg.get("EXPORT_CHUNK_ROWS", 500))
+        mimetype, extension = "text/csv", "csv"
+    else:
+        body = iter_columnar(docs, export_format, cfg.get("EXPORT_ROW_GROUP_ROWS", 50_000))
+        mimetype, extension = COLUMNAR_FORMATS[export_format]
 
-    filename = "stroke_patients_scoped_export.csv"
+    filename = f"stroke_patients_scoped_export.{extension}"
     return Response(
-        csv_data,
-        mimetype="text/csv",
+        stream_with_context(body),
+        mimetype=mimetype,
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
@@ -471,6 +400,7 @@ def doctor_add_patient():
             "last_modified_at": now,
             "is_active": True,
         },
+        "schema_version": CURRENT_SCHEMA_VERSION,
     }
 
     result = coll.insert_one(doc)
@@ -503,20 +433,25 @@ def doctor_update_patient_risk(patient_id: str):
     except Exception:
         abort(404)
 
+    active = {"_id": oid, "system_metadata.is_active": True}
+    doc = coll.find_one(active)
+    if not doc:
+        abort(404)
+
     now = datetime.utcnow()
 
-    coll.update_one(
-        {"_id": oid, "system_metadata.is_active": True},
-        {
-            "$set": {
-                "risk_assessment.level": new_label,
-                "risk_assessment.score": new_score,
-                "risk_assessment.calculated_at": now,
-                "system_metadata.last_modified_by": getattr(current_user, "id", None),
-                "system_metadata.last_modified_at": now,
-            }
-        },
+    # Bring the whole risk_assessment to the current schema first, so an
+    # unmigrated document keeps its legacy flag / factors
+    update = migration_update(doc)
+    update["$set"]["risk_assessment"].update(
+        level=new_label,
+        score=new_score,
+        calculated_at=now,
     )
+    update["$set"]["system_metadata.last_modified_by"] = getattr(current_user, "id", None)
+    update["$set"]["system_metadata.last_modified_at"] = now
+
+    coll.update_one(active, update)
 
     flash("Risk level updated.", "success")
     return redirect(url_for("doctor.doctor_patient_detail", patient_id=patient_id))
@@ -574,15 +509,7 @@ def doctor_patient_detail(patient_id: str):
 
     demo = doc.get("demographics", {}) or {}
     med = doc.get("medical_history", {}) or {}
-    risk = doc.get("risk_assessment", {}) or {}
-
-    level = risk.get("level")
-    if level is None:
-        level = risk.get("_level", "Unknown")
-
-    score = risk.get("score")
-    if score is None:
-        score = risk.get("_score", 0.0)
+    level, score = risk_of(doc)
 
     patient = {
         "id": str(doc["_id"]),
@@ -17,6 +17,7 @@ AI Statement: Portions of this file were drafted or refined using
 from __future__ import annotations
 
 from datetime import datetime
+import re
 
 from flask import (
     Blueprint,
@@ -30,6 +31,9 @@ from flask_login import login_required, current_user
 from bson.objectid import ObjectId
 
 from app.db.mongo import get_patient_collection
+from app.db.patient_row import PATIENT_ROW_PROJECTION, PatientRow
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION, risk_of
+from app.db.risk_stats import risk_distribution
 
 bp = Blueprint("hcp", __name__, url_prefix="/hcp")
 
@@ -66,7 +70,7 @@ def hcp_dashboard():
     In a real system we’d also scope to patients linked to this HCP.
 
     High-risk patients here are those where:
-      risk_assessment._level == "High"
+      risk_assessment.level == "High"
     which comes from our ML thresholds:
       High  : probability ≥ 0.30
       Medium: 0.12–0.29
@@ -76,12 +80,9 @@ def hcp_dashboard():
     coll = get_patient_collection()
 
     try:
-        base_filter: dict = {"system_metadata.is_active": True}
-
-        assigned_patients = coll.count_documents(base_filter)
-
-        high_risk_filter = base_filter | {"risk_assessment._level": "High"}
-        high_risk_patients = coll.count_documents(high_risk_filter)
+        distribution = risk_distribution(coll)
+        assigned_patients = distribution["total"]
+        high_risk_patients = distribution["High"]
     except Exception:
         assigned_patients = 0
         high_risk_patients = 0
@@ -105,6 +106,44 @@ def hcp_dashboard():
 # --------------------------------------------------------------------
 # ASSIGNED PATIENTS LIST (can view + add + delete)
 # --------------------------------------------------------------------
+# Risk filter mapping – same categories as doctor
+_RISK_FILTER_LEVELS = {
+    "low": "Low",
+    "medium": "Medium",
+    "high": "High",
+    "unknown": "Unknown",
+}
+
+HIGH_RISK_FILTER = {
+    "system_metadata.is_active": True,
+    "risk_assessment.level": "High",
+}
+
+
+def _hcp_patient_filter(risk_filter: str, search_query: str) -> dict:
+    """
+    Mongo filter for the HCP patient list: active patients, optional risk
+    level, optional search over name / dataset original_id.
+    """
+    mongo_filter: dict = {"system_metadata.is_active": True}
+
+    if risk_filter in _RISK_FILTER_LEVELS:
+        mongo_filter["risk_assessment.level"] = _RISK_FILTER_LEVELS[risk_filter]
+
+    if search_query:
+        ors: list[dict] = [
+            {"demographics.name": {"$regex": re.escape(search_query), "$options": "i"}},
+        ]
+        # original_id is an int: a regex never matched it, so compare the
+        # digits instead ("Patient 24289" or "24289")
+        digits = re.sub(r"\D+", "", search_query)
+        if digits:
+            ors.append({"original_id": int(digits)})
+        mongo_filter["$or"] = ors
+
+    return mongo_filter
+
+
 @bp.route("/patients")
 @login_required
 def hcp_patients():
@@ -115,8 +154,8 @@ def hcp_patients():
     • Read-only demographics + risk, but HCP can add/delete records.
 
     Risk fields come from:
-      risk_assessment._score  (float probability 0–1)
-      risk_assessment._level  ("Low"/"Medium"/"High"/"Unknown")
+      risk_assessment.score  (float probability 0–1)
+      risk_assessment.level  ("Low"/"Medium"/"High"/"Unknown")
     which are written by scripts/compute_ml_for_existing_docs.py
     using app.ml.predict_service.run_ml_on_patient_doc().
     """
@@ -127,52 +166,19 @@ def hcp_patients():
     search_query = (request.args.get("q") or "").strip()
     risk_filter = request.args.get("risk_filter", "all")
 
-    mongo_filter: dict = {"system_metadata.is_active": True}
-
     # (In a real system you’d also scope to this HCP’s caseload.)
-
-    # Risk filter mapping – same categories as doctor
-    risk_map = {
-        "low": "Low",
-        "medium": "Medium",
-        "high": "High",
-        "unknown": "Unknown",
-    }
-    if risk_filter in risk_map:
-        mongo_filter["risk_assessment._level"] = risk_map[risk_filter]
-
-    # Simple text search over name / original_id
-    if search_query:
-        mongo_filter["$or"] = [
-            {"demographics.name": {"$regex": search_query, "$options": "i"}},
-            {"original_id": {"$regex": search_query, "$options": "i"}},
-        ]
+    mongo_filter = _hcp_patient_filter(risk_filter, search_query)
 
     try:
         docs = (
-            coll.find(mongo_filter)
+            coll.find(mongo_filter, PATIENT_ROW_PROJECTION)
             .sort("original_id", 1)
             .limit(50)
         )
     except Exception:
         docs = []
 
-    patients: list[dict] = []
-    for d in docs:
-        demo = d.get("demographics", {}) or {}
-        risk = d.get("risk_assessment", {}) or {}
-
-        patients.append(
-            {
-                "id": str(d["_id"]),
-                "name": demo.get("name") or f"Patient {d.get('original_id')}",
-                "age": demo.get("age"),
-                "sex": demo.get("gender"),
-                "risk_level": risk.get("_level", "Unknown"),
-                # IMPORTANT: use the ML field `_score`, not legacy `score`
-                "risk_score": float(risk.get("_score") or 0.0),
-            }
-        )
+    patients = [PatientRow.from_doc(d) for d in docs]
 
     return render_template(
         "hcp/patients.html",
@@ -223,10 +229,11 @@ def hcp_patient_new():
             "original_id": None,
             "demographics": demo,
             "risk_assessment": {
-                "_level": "Unknown",   # will be recomputed by ML script
-                "_score": 0.0,
-                "_factors": [],
-                "_calculated_at": None,
+                "level": "Unknown",   # will be recomputed by ML script
+                "score": 0.0,
+                "flag": 0,
+                "factors": [],
+                "calculated_at": None,
             },
             "system_metadata": {
                 "is_active": True,
@@ -235,6 +242,7 @@ def hcp_patient_new():
                 "created_by_role": "hcp",
                 "created_by": getattr(current_user, "id", None),
             },
+            "schema_version": CURRENT_SCHEMA_VERSION,
         }
 
         coll.insert_one(doc)
@@ -282,8 +290,8 @@ def hcp_patient_detail(patient_id: str):
     HCP patient care view.
 
     Shows a single patient with their ML-based risk score and label.
-    Risk fields come directly from risk_assessment._score / _level
-    written by our recompute script using the same ML model.
+    Risk fields come from risk_assessment.score / level written by
+    our recompute script using the same ML model.
     """
     _ensure_hcp()
 
@@ -324,14 +332,14 @@ def hcp_patient_detail(patient_id: str):
         )
         if d:
             demo = d.get("demographics", {}) or {}
-            risk = d.get("risk_assessment", {}) or {}
+            level, score = risk_of(d)
             patient = {
                 "id": str(d["_id"]),
                 "name": demo.get("name") or f"Patient {d.get('original_id')}",
                 "age": demo.get("age"),
                 "sex": demo.get("gender"),
-                "risk_level": risk.get("_level", "Unknown"),
-                "risk_score": float(risk.get("_score") or 0.0),
+                "risk_level": level,
+                "risk_score": score,
             }
     except Exception:
         patient = None
@@ -443,50 +451,13 @@ def hcp_monitoring():
 
     # ---- real Mongo-backed risk distribution for the chart ----
     try:
-        # Treat everything without explicit is_active=False as active
-        base_filter = {
-            "$or": [
-                {"system_metadata.is_active": True},
-                {"system_metadata.is_active": {"$exists": False}},
-            ]
-        }
-
-        def level_filter(label: str) -> dict:
-            """Match either _level or level with the given label."""
-            return {
-                "$and": [
-                    base_filter,
-                    {
-                        "$or": [
-                            {"risk_assessment._level": label},
-                            {"risk_assessment.level": label},
-                        ]
-                    },
-                ]
-            }
-
-        low_count = coll.count_documents(level_filter("Low"))
-        med_count = coll.count_documents(level_filter("Medium"))
-        high_count = coll.count_documents(level_filter("High"))
-
-        # Unknown = active docs that are NOT Low/Medium/High (on either key)
-        unknown_filter = {
-            "$and": [
-                base_filter,
-                {
-                    "$nor": [
-                        {"risk_assessment._level": {"$in": ["Low", "Medium", "High"]}},
-                        {"risk_assessment.level": {"$in": ["Low", "Medium", "High"]}},
-                    ]
-                },
-            ]
-        }
-        unknown_count = coll.count_documents(unknown_filter)
-
-        total_patients = coll.count_documents(base_filter)
+        # One aggregation; everything without explicit is_active=False
+        # counts as active here
+        distribution = risk_distribution(coll, include_unflagged=True)
 
+        total_patients = distribution["total"]
         risk_labels = ["Low", "Medium", "High", "Unknown"]
-        risk_values = [low_count, med_count, high_count, unknown_count]
+        risk_values = [distribution[label] for label in risk_labels]
 
     except Exception:
         total_patients = 0
@@ -514,40 +485,19 @@ def hcp_patients_high():
     List of high-risk patients for HCP.
 
     High risk is based on:
-      risk_assessment._level == "High"
+      risk_assessment.level == "High"
     which comes from the same ML thresholds as the rest of the app.
     """
     _ensure_hcp()
 
     coll = get_patient_collection()
 
-    mongo_filter = {
-        "system_metadata.is_active": True,
-        "risk_assessment._level": "High",
-    }
-
-    docs = list(
-        coll.find(mongo_filter)
+    docs = (
+        coll.find(HIGH_RISK_FILTER, PATIENT_ROW_PROJECTION)
         .sort("demographics.age", -1)
         .limit(50)
     )
 
-    patients: list[dict] = []
-    for d in docs:
-        demo = d.get("demographics", {}) or {}
-        risk = d.get("risk_assessment", {}) or {}
-        meta = d.get("system_metadata", {}) or {}
-
-        patients.append(
-            {
-                "id": str(d["_id"]),
-                "name": demo.get("name") or f"Patient {d.get('original_id')}",
-                "age": demo.get("age"),
-                "sex": demo.get("gender"),
-                "risk_level": risk.get("_level", "Unknown"),
-                "risk_score": float(risk.get("_score") or 0.0),
-                "last_update": meta.get("last_modified_at"),
-            }
-        )
+    patients = [PatientRow.from_doc(d) for d in docs]
 
     return render_template("hcp/patients_high.html", patients=patients)
@@ -16,8 +16,10 @@ AI Statement: Portions of this file were drafted or refined using
 # app/routes/main.py
 from __future__ import annotations
 
-from flask import Blueprint, redirect, url_for, render_template
-from flask_login import current_user
+from functools import wraps
+
+from flask import Blueprint, abort, redirect, url_for, render_template, jsonify
+from flask_login import current_user, login_required
 
 bp = Blueprint("main", __name__)
 
@@ -51,7 +53,20 @@ def index():
         return redirect(url_for("auth.login"))
 
     return _route_for_role()
-from app.db.mongo import get_patient_collection  # add near the top
+from app.db.mongo import get_patient_collection, get_pool_stats  # add near the top
+
+
+def _admin_debug(view):
+    """Operational counters are for logged-in admins only."""
+
+    @wraps(view)
+    @login_required
+    def wrapped(*args, **kwargs):
+        if current_user.role != "admin":
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped
 
 
 @bp.route("/debug/mongo")
@@ -59,3 +74,46 @@ def debug_mongo():
     coll = get_patient_collection()
     count = coll.count_documents({})
     return f"MongoDB OK — patients collection has {count} document(s)."
+
+
+@bp.route("/debug/mongo/pool")
+@_admin_debug
+def debug_mongo_pool():
+    """Per-worker connection pool counters (no patient data)."""
+    return jsonify(get_pool_stats())
+
+
+@bp.route("/debug/ml/cache")
+@_admin_debug
+def debug_ml_cache():
+    """Per-worker prediction cache counters (no patient data)."""
+    from app.ml.predict_service import get_cache_stats
+
+    return jsonify(get_cache_stats())
+
+
+@bp.route("/debug/ml/model")
+@_admin_debug
+def debug_ml_model():
+    """Serving model version + hot-reload counters for this worker."""
+    from app.ml.registry import get_registry_stats
+
+    return jsonify(get_registry_stats())
+
+
+@bp.route("/debug/ml/batcher")
+@_admin_debug
+def debug_ml_batcher():
+    """Per-worker micro-batching queue depth + batch size counters."""
+    from app.ml.batcher import get_batcher_stats
+
+    return jsonify(get_batcher_stats())
+
+
+@bp.route("/debug/audit")
+@_admin_debug
+def debug_audit():
+    """Per-worker audit writer queue / dropped / written counters."""
+    from app.utils.audit import get_audit_stats
+
+    return jsonify(get_audit_stats())
@@ -94,7 +94,8 @@ def predict() -> str:
         # 2) Run ML model
         result = predict_risk(features)
         # result looks like:
-        # {"probability": 0.73, "stroke_flag": 1, "risk_level": "High"}
+        # {"probability": 0.73, "stroke_flag": 1, "risk_level": "High",
+        #  "model_version": "3f9c2a1b7d04"}
 
         # 3) Save to database
         pred = StrokePrediction(
@@ -102,6 +103,7 @@ def predict() -> str:
             probability=float(result.get("probability", 0.0)),
             stroke_flag=int(result.get("stroke_flag", 0)),
             risk_level=str(result.get("risk_level", "Low")),
+            model_version=result.get("model_version"),
             raw_features=features,
             created_at=datetime.utcnow(),
         )
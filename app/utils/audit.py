@@ -16,7 +16,14 @@ AI Statement: Portions of this file were drafted or refined using
 # app/utils/audit.py
 from __future__ import annotations
 
-from typing import Any
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
 
 from flask import request
 from flask_login import current_user
@@ -24,6 +31,246 @@ from flask_login import current_user
 from app.extensions import db
 from app.models import AuditLog
 
+logger = logging.getLogger(__name__)
+
+# event_type values written by the app (suggestions in the admin audit browser)
+AUDIT_EVENT_TYPES = (
+    "user_login",
+    "user_login_failed",
+    "user_login_lockout",
+    "user_login_blocked",
+    "user_logout",
+    "user_registered",
+)
+
+# Queued by AuditSink.stop(): the worker writes the rows ahead of it, then exits
+_STOP = object()
+
+
+class AuditSink:
+    """
+    Buffered, asynchronous audit_logs writer.
+
+    Request threads only put a row dict on a bounded queue; one
+    background thread inserts the rows in batches – one transaction per
+    `batch_size` rows or per `flush_ms` window, whichever comes first –
+    on its own connection, so a burst of logins never waits on a SQLite
+    fsync and never shares the request's session transaction. When
+    `max_queue` rows are already waiting the event is dropped (and
+    counted) rather than blocking the request.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        batch_size: int = 100,
+        flush_ms: float = 200.0,
+        max_queue: int = 10000,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self.engine = engine
+        self.batch_size = int(batch_size)
+        self.flush_wait = max(0.0, float(flush_ms)) / 1000.0
+        self.max_queue = max(1, int(max_queue))
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.peak_queue_depth = 0
+
+    # ------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue one audit_logs row; False when it was dropped (queue full)."""
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self.enqueued += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, depth)
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything queued so far; False if that took longer than `timeout`."""
+        if self._thread is None or self._thread_pid != os.getpid():
+            return self._queue.empty()
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Write everything queued, then end the worker; False on timeout."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._thread_pid != os.getpid():
+                return True
+            self._thread = None
+
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return False
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        # Threads do not survive fork – start one per worker process.
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread_pid != pid or self._thread is None:
+                if self._thread_pid != pid:
+                    # Rows queued in the parent are the parent's to write.
+                    self._queue = queue.Queue(self.max_queue)
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="audit-writer",
+                    daemon=True,
+                )
+                self._thread_pid = pid
+                self._thread.start()
+
+    def _collect(self) -> tuple[List[Dict[str, Any]], List[threading.Event], bool]:
+        """(rows, flush waiters, stop): stop once the _STOP marker was taken."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], [], True
+        if isinstance(first, threading.Event):
+            return [], [first], False
+
+        rows = [first]
+        deadline = time.monotonic() + self.flush_wait
+
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return rows, [], True
+            if isinstance(item, threading.Event):
+                # flush(): write what we have now, then wake the caller
+                return rows, [item], False
+            rows.append(item)
+
+        return rows, [], False
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(AuditLog.__table__.insert(), rows)
+        except Exception:
+            logger.exception("Audit batch of %d rows could not be written", len(rows))
+            with self._lock:
+                self.failed += len(rows)
+                self.batches += 1
+            return
+
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            rows, waiters, stop = self._collect()
+            if rows:
+                self._write(rows)
+            for event in waiters:
+                event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "queued": self._queue.qsize(),
+                "peak_queue_depth": self.peak_queue_depth,
+                "max_queue": self.max_queue,
+                "batch_size": self.batch_size,
+                "flush_ms": self.flush_wait * 1000.0,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+
+# ----------------------------------------------------------------------
+# Process-wide sink (AUDIT_ASYNC_ENABLED); stopped at interpreter exit
+# ----------------------------------------------------------------------
+_SINK: AuditSink | None = None
+
+
+def configure_audit_sink(
+    engine: Any,
+    enabled: bool,
+    batch_size: int = 100,
+    flush_ms: float = 200.0,
+    max_queue: int = 10000,
+) -> AuditSink | None:
+    """Install (or remove) the sink audit() writes through."""
+    global _SINK
+
+    previous = _SINK
+    _SINK = AuditSink(engine, batch_size, flush_ms, max_queue) if enabled else None
+    if previous is not None:
+        previous.stop()
+    return _SINK
+
+
+def get_audit_sink() -> AuditSink | None:
+    return _SINK
+
+
+def get_audit_stats() -> Dict[str, Any]:
+    if _SINK is None:
+        return {"enabled": False, "pid": os.getpid()}
+    return {"enabled": True, **_SINK.stats()}
+
+
+def flush_audit_sink(timeout: float = 5.0) -> bool:
+    """Write queued audit rows now (tests, CLI commands, shutdown)."""
+    return True if _SINK is None else _SINK.flush(timeout)
+
+
+def stop_audit_sink(timeout: float = 5.0) -> bool:
+    """Write queued audit rows and end the writer thread (interpreter exit)."""
+    return True if _SINK is None else _SINK.stop(timeout)
+
+
+atexit.register(stop_audit_sink)
+
 
 def audit(
     user_id: int | None,
@@ -41,8 +288,12 @@ def audit(
       - action (plus optional metadata)
       - ip_address
 
-    The optional resource_type / resource_id / details are folded into
-    the action text, so we don't need extra DB columns.
+    event_type (= action), resource_type and resource_id are also stored
+    in their own indexed columns for the admin audit browser; the action
+    text keeps the readable "action | key=value; ..." form.
+
+    With the async sink configured the row is only queued (see
+    AuditSink); otherwise it is committed right away.
     """
 
     # Fallback to current_user if user_id not explicitly passed
@@ -74,9 +325,26 @@ def audit(
     else:
         full_action = action
 
+    row = {
+        "user_id": user_id,
+        "action": full_action,
+        "event_type": action[:64],
+        "resource_type": resource_type[:64] if resource_type else None,
+        "resource_id": str(resource_id)[:64] if resource_id is not None else None,
+        "ip_address": ip,
+    }
+
+    if _SINK is not None:
+        # Timestamp the event now, not when the batch is written
+        _SINK.submit({**row, "created_at": datetime.utcnow()})
+        return
+
     entry = AuditLog()
     entry.user_id = user_id
-    entry.action = full_action
+    entry.action = row["action"]
+    entry.event_type = row["event_type"]
+    entry.resource_type = row["resource_type"]
+    entry.resource_id = row["resource_id"]
 
     # Match your model/DB column name
     if hasattr(entry, "ip_address"):
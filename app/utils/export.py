@@ -13,3 +13,270 @@ AI Statement: Portions of this file were drafted or refined using
 ===========================================================
 '''
 
+# app/utils/export.py
+#
+# Scoped patient export (doctor "Export" button).
+#
+#   CSV      – always available, streamed as text chunks
+#   Parquet  – typed columns, one row group per batch   (needs pyarrow)
+#   Arrow    – Arrow IPC stream, one record batch each  (needs pyarrow)
+#
+# Every format reads the same projected Mongo cursor and is produced as a
+# generator, so a response can stream it with bounded memory.
+
+from __future__ import annotations
+
+import csv
+from io import StringIO
+from typing import Any, Dict, Iterable, Iterator, List
+
+from app.db.bulk import chunked
+from app.db.risk_schema import RISK_READ_PROJECTION, risk_of
+
+try:  # optional: only needed for the columnar formats
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+
+EXPORT_COLUMNS = [
+    "patient_id",
+    "name",
+    "gender",
+    "age",
+    "work_type",
+    "residence_type",
+    "hypertension",
+    "heart_disease",
+    "avg_glucose_level",
+    "bmi",
+    "smoking_status",
+    "dataset_stroke_flag",
+    "risk_level",
+    "risk_score",
+]
+
+# Only the fields export_row reads (one projection for every format)
+EXPORT_PROJECTION = {
+    "original_id": 1,
+    "demographics.name": 1,
+    "demographics.gender": 1,
+    "demographics.age": 1,
+    "demographics.work_type": 1,
+    "demographics.residence_type": 1,
+    "medical_history.hypertension": 1,
+    "medical_history.heart_disease": 1,
+    "medical_history.avg_glucose_level": 1,
+    "medical_history.bmi": 1,
+    "medical_history.smoking_status": 1,
+    "medical_history.stroke": 1,
+    **RISK_READ_PROJECTION,
+}
+
+
+def export_row(d: dict) -> list:
+    demo = d.get("demographics", {}) or {}
+    med = d.get("medical_history", {}) or {}
+    level, score = risk_of(d)
+
+    return [
+        str(d.get("_id")),
+        demo.get("name") or f"Patient {d.get('original_id')}",
+        demo.get("gender"),
+        demo.get("age"),
+        demo.get("work_type"),
+        demo.get("residence_type"),
+        med.get("hypertension"),
+        med.get("heart_disease"),
+        med.get("avg_glucose_level"),
+        med.get("bmi"),
+        med.get("smoking_status"),
+        med.get("stroke"),
+        level,
+        score,
+    ]
+
+
+def iter_csv(docs, chunk_rows: int = 500):
+    """
+    Yield the export as CSV text chunks of up to `chunk_rows` rows.
+
+    One small buffer is reused for every chunk, so memory stays flat no
+    matter how many documents the cursor returns.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def drain() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    try:
+        writer.writerow(EXPORT_COLUMNS)
+        yield drain()  # headers go out before the first batch is fetched
+
+        pending = 0
+        for d in docs:
+            writer.writerow(export_row(d))
+            pending += 1
+            if pending >= chunk_rows:
+                yield drain()
+                pending = 0
+
+        if pending:
+            yield drain()
+    finally:
+        # Client went away (or we finished): release the server-side cursor
+        close = getattr(docs, "close", None)
+        if close is not None:
+            close()
+
+
+# ----------------------------------------------------------------------
+# Columnar formats (Parquet / Arrow IPC)
+# ----------------------------------------------------------------------
+class ExportFormatUnavailable(RuntimeError):
+    """Raised when a columnar export is requested without pyarrow."""
+
+
+# format -> (mimetype, file extension)
+COLUMNAR_FORMATS: Dict[str, tuple[str, str]] = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# Column kinds, in EXPORT_COLUMNS order. "category" columns are
+# dictionary-encoded strings (a handful of distinct values each).
+EXPORT_COLUMN_KINDS: Dict[str, str] = {
+    "patient_id": "string",
+    "name": "string",
+    "gender": "category",
+    "age": "float",
+    "work_type": "category",
+    "residence_type": "category",
+    "hypertension": "int",
+    "heart_disease": "int",
+    "avg_glucose_level": "float",
+    "bmi": "float",
+    "smoking_status": "category",
+    "dataset_stroke_flag": "int",
+    "risk_level": "category",
+    "risk_score": "float",
+}
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def _as_str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _as_float(value: Any) -> float | None:
+    try:
+        return None if value is None or value == "" else float(value)
+    except (TypeError, ValueError):
+        return None  # e.g. "N/A" bmi in the raw Kaggle data
+
+
+def _as_int(value: Any) -> int | None:
+    try:
+        return None if value is None or value == "" else int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_CONVERTERS = {"string": _as_str, "category": _as_str, "float": _as_float, "int": _as_int}
+
+
+def export_schema() -> "pa.Schema":
+    if pa is None:
+        raise ExportFormatUnavailable("Parquet/Arrow export requires the 'pyarrow' package")
+
+    types = {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "float": pa.float64(),
+        "int": pa.int8(),
+    }
+    return pa.schema([(name, types[EXPORT_COLUMN_KINDS[name]]) for name in EXPORT_COLUMNS])
+
+
+def export_record_batch(docs: List[dict], schema: "pa.Schema") -> "pa.RecordBatch":
+    """Convert a chunk of documents into one typed Arrow record batch."""
+    columns: List[List[Any]] = [[] for _ in EXPORT_COLUMNS]
+    converters = [_CONVERTERS[EXPORT_COLUMN_KINDS[name]] for name in EXPORT_COLUMNS]
+
+    for d in docs:
+        for values, convert, raw in zip(columns, converters, export_row(d)):
+            values.append(convert(raw))
+
+    arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that hands its bytes back on drain()."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self._parts.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_columnar(docs: Iterable[dict], fmt: str, batch_rows: int = 50_000) -> Iterator[bytes]:
+    """
+    Yield a Parquet file or Arrow IPC stream as byte chunks.
+
+    Documents are converted `batch_rows` at a time straight from the
+    cursor; each batch becomes one Parquet row group / Arrow record batch
+    and is handed to the client before the next one is read.
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    schema = export_schema()
+
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, schema, compression="snappy")
+    else:
+        # Stream (not file) format: allows a new dictionary per batch
+        writer = pa.ipc.new_stream(out, schema)
+
+    try:
+        for chunk in chunked(docs, batch_rows):
+            writer.write_batch(export_record_batch(chunk, schema))
+            yield sink.drain()
+
+        writer.close()
+        yield sink.drain()
+    finally:
+        close = getattr(docs, "close", None)
+        if close is not None:
+            close()
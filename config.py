@@ -37,6 +37,73 @@ class Config:
     MONGO_URI = os.environ.get("MONGO_URI", "mongodb://127.0.0.1:27017")
     MONGO_DBNAME = os.environ.get("MONGO_DBNAME", "strokecare")
 
+    # Connection pool (one MongoClient per worker process, see app/db/mongo.py)
+    MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 300000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+        os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+    )
+
+    # Patient indexes are applied with `flask indexes apply`; set to 1 to
+    # apply an outdated index set at startup instead (dev convenience)
+    MONGO_APPLY_INDEXES_ON_START = os.environ.get("MONGO_APPLY_INDEXES_ON_START", "0") == "1"
+
+    # Rows per page in the (keyset-paginated) patient list views
+    PATIENTS_PAGE_SIZE = int(os.environ.get("PATIENTS_PAGE_SIZE", 50))
+
+    # Streaming patient export: documents fetched per Mongo getMore, and
+    # CSV rows buffered per chunk sent to the client
+    EXPORT_CURSOR_BATCH_SIZE = int(os.environ.get("EXPORT_CURSOR_BATCH_SIZE", 2000))
+    EXPORT_CHUNK_ROWS = int(os.environ.get("EXPORT_CHUNK_ROWS", 500))
+    # Parquet / Arrow exports (need pyarrow): rows per row group / batch
+    EXPORT_ROW_GROUP_ROWS = int(os.environ.get("EXPORT_ROW_GROUP_ROWS", 50000))
+
+    # -------------------------
+    # ML model loading
+    # -------------------------
+    # Load + warm the model inside create_app (use with `gunicorn --preload`
+    # so workers share the pages), and memory-map the exported forest arrays.
+    ML_PRELOAD_MODEL = os.environ.get("ML_PRELOAD_MODEL", "0") == "1"
+    ML_MODEL_MMAP = os.environ.get("ML_MODEL_MMAP", "0") == "1"
+
+    # Poll instance/stroke_model.joblib every N seconds and hot-swap new
+    # versions (0 disables the watcher)
+    ML_MODEL_WATCH_SECONDS = float(os.environ.get("ML_MODEL_WATCH_SECONDS", 0))
+
+    # Micro-batch concurrent /predict calls into one model call: wait up
+    # to ML_BATCH_MAX_WAIT_MS for ML_BATCH_MAX_ROWS rows; answer 503 once
+    # ML_BATCH_MAX_QUEUE requests are already waiting.
+    ML_BATCHING_ENABLED = os.environ.get("ML_BATCHING_ENABLED", "0") == "1"
+    ML_BATCH_MAX_ROWS = int(os.environ.get("ML_BATCH_MAX_ROWS", 32))
+    ML_BATCH_MAX_WAIT_MS = float(os.environ.get("ML_BATCH_MAX_WAIT_MS", 2))
+    ML_BATCH_MAX_QUEUE = int(os.environ.get("ML_BATCH_MAX_QUEUE", 1024))
+    ML_BATCH_TIMEOUT_SECONDS = float(os.environ.get("ML_BATCH_TIMEOUT_SECONDS", 5))
+
+    # Per-process prediction cache (0 disables)
+    ML_CACHE_SIZE = int(os.environ.get("ML_CACHE_SIZE", 4096))
+    ML_CACHE_TTL_SECONDS = int(os.environ.get("ML_CACHE_TTL_SECONDS", 3600))
+
+    # -------------------------
+    # Audit log writer
+    # -------------------------
+    # Queue audit events and insert them from a background thread, one
+    # transaction per AUDIT_BATCH_SIZE rows or AUDIT_FLUSH_MS; events are
+    # dropped (and counted) once AUDIT_MAX_QUEUE rows are waiting.
+    AUDIT_ASYNC_ENABLED = os.environ.get("AUDIT_ASYNC_ENABLED", "1") == "1"
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", 100))
+    AUDIT_FLUSH_MS = float(os.environ.get("AUDIT_FLUSH_MS", 200))
+    AUDIT_MAX_QUEUE = int(os.environ.get("AUDIT_MAX_QUEUE", 10000))
+    # Rows per page of the admin audit browser
+    AUDIT_PAGE_SIZE = int(os.environ.get("AUDIT_PAGE_SIZE", 100))
+
+    # Admin dashboard KPI snapshot cache (seconds, 0 disables); user and
+    # prediction writes invalidate it in the writing process
+    KPI_CACHE_TTL_SECONDS = float(os.environ.get("KPI_CACHE_TTL_SECONDS", 30))
+
     # -------------------------
     # Session Security settings
     # -------------------------
@@ -0,0 +1,115 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_audit_writer.py
+#
+# Request-thread cost of audit() during a failed-login burst:
+#
+#   inline – one INSERT + COMMIT (an fsync) per event in the caller
+#   async  – AuditSink: the caller only queues the row; a background
+#            thread inserts batches of AUDIT_BATCH_SIZE rows
+#
+# Runs `--threads` workers firing `--events` audit() calls in total
+# against a file-backed SQLite database in a temp directory (an
+# in-memory database has no fsync to wait on).
+#
+#     python -m scripts.bench_audit_writer [--events 2000] [--threads 8]
+
+from __future__ import annotations
+
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import click
+
+from app import create_app
+from app.extensions import db
+from app.models import AuditLog
+from app.utils import audit as audit_module
+from config import Config
+
+
+def _app(db_path: Path, async_enabled: bool, batch_size: int):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        AUDIT_ASYNC_ENABLED = async_enabled
+        AUDIT_BATCH_SIZE = batch_size
+        MONGO_SERVER_SELECTION_TIMEOUT_MS = 50
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _burst(app, events: int, threads: int) -> dict:
+    def one(i: int) -> float:
+        with app.test_request_context("/auth/login", environ_base={"REMOTE_ADDR": "10.0.0.9"}):
+            started = time.perf_counter()
+            audit_module.audit(
+                None,
+                "user_login_failed",
+                resource_type="auth",
+                details=f"Failed login attempt. ip=10.0.0.9 email=bench{i}@stroke.test",
+            )
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(one, range(events)))
+    elapsed = time.perf_counter() - started
+
+    audit_module.flush_audit_sink(30)
+    with app.app_context():
+        rows = db.session.query(AuditLog).count()
+
+    return {
+        "seconds": elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "rows": rows,
+        "stats": audit_module.get_audit_stats(),
+    }
+
+
+@click.command()
+@click.option("--events", default=2000, show_default=True)
+@click.option("--threads", default=8, show_default=True)
+@click.option("--batch-size", default=100, show_default=True)
+def main(events: int, threads: int, batch_size: int) -> None:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, async_enabled in (("inline", False), ("async", True)):
+            app = _app(Path(tmp) / f"{name}.db", async_enabled, batch_size)
+            results[name] = _burst(app, events, threads)
+
+    click.echo(f"{events} audit events from {threads} threads")
+    for name, r in results.items():
+        click.echo(
+            f"  {name:<7} {r['seconds'] * 1000:8.1f} ms total  "
+            f"p50 {r['p50_ms']:7.3f} ms  p99 {r['p99_ms']:7.3f} ms  rows {r['rows']}"
+        )
+    stats = results["async"]["stats"]
+    click.echo(
+        f"  async writer: {stats['batches']} batches, {stats['dropped']} dropped, "
+        f"peak queue {stats['peak_queue_depth']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
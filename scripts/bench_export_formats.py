@@ -0,0 +1,127 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_export_formats.py
+#
+# Size and speed of the doctor patient export formats:
+#
+#   csv      – app.utils.export.iter_csv (what analysts pull today)
+#   parquet  – iter_columnar(..., "parquet"), snappy, typed columns
+#   arrow    – iter_columnar(..., "arrow"), Arrow IPC stream
+#
+# "write" is producing the response body from documents, "parse" is what
+# the analyst pays afterwards to load the file into a typed table
+# (pandas.read_csv for CSV, pyarrow readers for the others).
+#
+# Synthetic documents shaped like the Kaggle import; no MongoDB needed.
+# Requires pyarrow.
+#
+#     python -m scripts.bench_export_formats [--rows 200000]
+
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import time
+
+import click
+import pandas as pd
+
+from app.utils.export import columnar_available, iter_columnar, iter_csv
+
+
+def _synthetic_docs(n: int) -> list[dict]:
+    rng = random.Random(7)
+    works = ("Private", "Self-employed", "Govt_job", "children", "Never_worked")
+    smoking = ("never smoked", "formerly smoked", "smokes", "Unknown")
+    levels = ("Low", "Medium", "High")
+    return [
+        {
+            "_id": f"{i:024x}",
+            "original_id": i,
+            "demographics": {
+                "gender": rng.choice(("Female", "Male")),
+                "age": float(rng.randint(1, 82)),
+                "work_type": rng.choice(works),
+                "residence_type": rng.choice(("Urban", "Rural")),
+            },
+            "medical_history": {
+                "hypertension": rng.randint(0, 1),
+                "heart_disease": rng.randint(0, 1),
+                "avg_glucose_level": round(rng.uniform(55, 270), 2),
+                "bmi": round(rng.uniform(15, 50), 1),
+                "smoking_status": rng.choice(smoking),
+                "stroke": int(rng.random() < 0.05),
+            },
+            "risk_assessment": {"level": rng.choice(levels), "score": rng.random()},
+            "schema_version": 2,
+        }
+        for i in range(n)
+    ]
+
+
+def _write(path: str, chunks) -> float:
+    t0 = time.perf_counter()
+    mode = "w" if path.endswith(".csv") else "wb"
+    with open(path, mode) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return time.perf_counter() - t0
+
+
+def _parse(path: str) -> float:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    t0 = time.perf_counter()
+    if path.endswith(".csv"):
+        pd.read_csv(path)
+    elif path.endswith(".parquet"):
+        pq.read_table(path)
+    else:
+        with pa.OSFile(path, "rb") as f:
+            pa.ipc.open_stream(f).read_all()
+    return time.perf_counter() - t0
+
+
+@click.command()
+@click.option("--rows", default=200_000, show_default=True, help="Synthetic documents to export.")
+def main(rows: int) -> None:
+    if not columnar_available():
+        raise click.ClickException("pyarrow is not installed")
+
+    docs = _synthetic_docs(rows)
+    click.echo(f"{rows} rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        formats = {
+            "csv": lambda: iter_csv(iter(docs)),
+            "parquet": lambda: iter_columnar(iter(docs), "parquet"),
+            "arrow": lambda: iter_columnar(iter(docs), "arrow"),
+        }
+        for name, make in formats.items():
+            path = os.path.join(tmp, f"export.{name}")
+            write_s = _write(path, make())
+            parse_s = _parse(path)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            click.echo(
+                f"  {name:<8} {size_mb:7.2f} MB   write {write_s * 1000:7.0f} ms   "
+                f"parse {parse_s * 1000:6.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_forest.py
+#
+# Compiled numpy forest vs sklearn RandomForestClassifier.predict_proba
+# on instance/stroke_model.joblib for batch sizes 1, 100 and 10k.
+#
+#     python -m scripts.bench_forest [--repeats 20]
+
+from __future__ import annotations
+
+import time
+
+import click
+import joblib
+import numpy as np
+
+from app.ml.forest import CompiledForest
+from app.ml.predict_service import MODEL_PATH
+
+BATCH_SIZES = (1, 100, 10_000)
+
+
+def _best_of(fn, X: np.ndarray, repeats: int) -> float:
+    fn(X)  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0  # ms
+
+
+@click.command()
+@click.option("--repeats", default=20, show_default=True, type=int)
+def main(repeats: int) -> None:
+    model = joblib.load(MODEL_PATH)["model"]
+
+    start = time.perf_counter()
+    forest = CompiledForest.from_sklearn(model)
+    compile_ms = (time.perf_counter() - start) * 1000.0
+
+    print(f"Model: {MODEL_PATH}")
+    print(
+        f"{forest.n_trees} trees, {forest.feature.shape[0]} nodes, "
+        f"max depth {forest.max_depth} (compiled in {compile_ms:.1f} ms)\n"
+    )
+    print(f"{'rows':>7} {'sklearn ms':>11} {'numpy ms':>10} {'speed-up':>9} {'max |diff|':>11}")
+
+    rng = np.random.default_rng(42)
+    # Plausible encoded inputs: categorical codes + realistic numeric ranges
+    low = np.array([0, 0, 0, 0, 0, 0, 0, 55, 10, 0], dtype=np.float64)
+    high = np.array([2, 82, 1, 1, 1, 4, 1, 272, 60, 3], dtype=np.float64)
+
+    for n in BATCH_SIZES:
+        X = rng.uniform(low, high, size=(n, forest.n_features))
+        X[:, [0, 2, 3, 4, 5, 6, 9]] = np.round(X[:, [0, 2, 3, 4, 5, 6, 9]])
+
+        diff = np.abs(forest.predict_proba(X) - model.predict_proba(X)).max()
+        reps = repeats if n < 10_000 else max(1, repeats // 5)
+
+        sk_ms = _best_of(model.predict_proba, X, reps)
+        np_ms = _best_of(forest.predict_proba, X, reps)
+
+        print(f"{n:>7} {sk_ms:>11.3f} {np_ms:>10.3f} {sk_ms / np_ms:>8.2f}x {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_model_memory.py
+#
+# Per-worker memory report for the three model loading modes, simulating
+# gunicorn workers with os.fork() (Linux only):
+#
+#   lazy          – every worker joblib.loads the bundle itself (old behaviour)
+#   preload       – master loads before fork (ML_PRELOAD_MODEL=1 + --preload)
+#   preload+mmap  – as above, forest arrays memory-mapped (ML_MODEL_MMAP=1)
+#
+# Pss ("proportional set size") splits shared pages between the processes
+# sharing them, so it is the honest per-worker cost.
+#
+#     python -m scripts.export_forest        # needed for the mmap mode
+#     python -m scripts.bench_model_memory [--workers 4]
+
+from __future__ import annotations
+
+import json
+import os
+
+import click
+
+from app.ml import predict_service
+
+
+def _smaps_rollup() -> dict:
+    report: dict = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                report[key] = int(rest.split()[0]) / 1024  # MB
+    report["Private"] = report.pop("Private_Clean", 0) + report.pop("Private_Dirty", 0)
+    return report
+
+
+def _reset_model() -> None:
+    predict_service._ACTIVE = None
+
+
+def _run_mode(name: str, workers: int, preload: bool, mmap: bool) -> list[dict]:
+    _reset_model()
+    predict_service.configure_model_loading(mmap=mmap)
+    if preload:
+        predict_service.warm_up_model()
+
+    children = []
+    for _ in range(workers):
+        ready_r, ready_w = os.pipe()
+        go_r, go_w = os.pipe()
+        result_r, result_w = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:  # worker
+            before = _smaps_rollup()
+            predict_service.warm_up_model()  # no-op load when preloaded
+            os.write(ready_w, b"1")
+            os.read(go_r, 1)  # wait until all siblings are alive
+            report = {"before": before, "after": _smaps_rollup()}
+            os.write(result_w, json.dumps(report).encode())
+            os._exit(0)
+
+        children.append((pid, ready_r, go_w, result_r))
+
+    for _, ready_r, _, _ in children:
+        os.read(ready_r, 1)
+    for _, _, go_w, _ in children:
+        os.write(go_w, b"1")
+
+    reports = []
+    for pid, _, _, result_r in children:
+        reports.append(json.loads(os.read(result_r, 65536).decode()))
+        os.waitpid(pid, 0)
+    return reports
+
+
+@click.command()
+@click.option("--workers", default=4, show_default=True, type=int)
+def main(workers: int) -> None:
+    modes = [
+        ("lazy", False, False),
+        ("preload", True, False),
+        ("preload+mmap", True, True),
+    ]
+    if not predict_service.FOREST_PATH.is_dir():
+        print(f"(no export at {predict_service.FOREST_PATH} – mmap mode will compile in memory)\n")
+
+    print(
+        f"{'mode':<14} {'Rss before':>11} {'Rss after':>10} "
+        f"{'Pss after':>10} {'Private':>8}   (MB per worker, mean of {workers})"
+    )
+    for name, preload, mmap in modes:
+        reports = _run_mode(name, workers, preload, mmap)
+
+        def mean(stage: str, key: str) -> float:
+            return sum(r[stage][key] for r in reports) / len(reports)
+
+        print(
+            f"{name:<14} {mean('before', 'Rss'):>11.1f} {mean('after', 'Rss'):>10.1f} "
+            f"{mean('after', 'Pss'):>10.1f} {mean('after', 'Private'):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_patient_rows.py
+#
+# Cost of turning patient documents into list-view rows:
+#
+#   type()     – old doctor_patients code: a new class per row via
+#                type("P", (), {...})() – each row carries its own class
+#                object plus an instance __dict__
+#   PatientRow – one shared slotted class (app.db.patient_row)
+#
+# Uses synthetic documents shaped like PATIENT_ROW_PROJECTION output, so
+# no MongoDB is needed. Peak memory comes from tracemalloc with every
+# row kept alive, as a rendered page would.
+#
+#     python -m scripts.bench_patient_rows [--rows 100000]
+
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+
+import click
+from bson import ObjectId
+
+from app.db.patient_row import PatientRow
+
+
+def _synthetic_docs(n: int) -> list[dict]:
+    levels = ("Low", "Moderate", "High")
+    return [
+        {
+            "_id": ObjectId(),
+            "original_id": i,
+            "demographics": {
+                "name": f"Patient {i}",
+                "gender": "Female" if i % 2 else "Male",
+                "age": 20 + i % 70,
+            },
+            "risk_assessment": {"_level": levels[i % 3], "_score": (i % 1000) / 1000},
+        }
+        for i in range(n)
+    ]
+
+
+def _dynamic_class_row(d: dict):
+    ra = d.get("risk_assessment") or {}
+    demo = d.get("demographics") or {}
+    return type(
+        "P",
+        (),
+        {
+            "id": str(d.get("_id")),
+            "name": demo.get("name") or f"Patient {d.get('original_id')}",
+            "gender": demo.get("gender"),
+            "age": demo.get("age"),
+            "risk_level": ra.get("_level") or "Unknown",
+            "risk_score": float(ra.get("_score") or 0.0),
+        },
+    )()
+
+
+def _measure(build, docs: list[dict]) -> dict:
+    # Timed pass first: tracemalloc slows allocation down considerably
+    gc.collect()
+    t0 = time.perf_counter()
+    rows = [build(d) for d in docs]
+    elapsed = time.perf_counter() - t0
+    del rows
+    gc.collect()
+
+    tracemalloc.start()
+    rows = [build(d) for d in docs]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    gc.collect()
+    return {"seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+@click.command()
+@click.option("--rows", default=100_000, show_default=True, help="Synthetic documents to convert.")
+def main(rows: int) -> None:
+    docs = _synthetic_docs(rows)
+
+    results = {
+        "type()": _measure(_dynamic_class_row, docs),
+        "PatientRow": _measure(PatientRow.from_doc, docs),
+    }
+
+    base = results["type()"]
+    click.echo(f"{rows} rows")
+    for name, r in results.items():
+        click.echo(
+            f"  {name:<11} {r['seconds'] * 1000:8.1f} ms  "
+            f"{rows / r['seconds']:10.0f} rows/s  peak {r['peak_mb']:7.1f} MB  "
+            f"({base['seconds'] / r['seconds']:.1f}x time, "
+            f"{base['peak_mb'] / r['peak_mb']:.1f}x memory vs type())"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/bench_predict_latency.py
+#
+# Single-row /predict latency microbenchmark.
+#
+# Compares the pandas reference path (_predict_risk_pandas) with the
+# numpy fast path (predict_risk) on instance/stroke_model.joblib, using
+# real rows from the Kaggle CSV as inputs. Both are timed with the
+# prediction cache disabled (the inputs repeat, so they would otherwise
+# measure cache hits); the "cached" line is predict_risk on a warm cache.
+#
+#     python -m scripts.bench_predict_latency [--iterations 2000]
+
+from __future__ import annotations
+
+import csv
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import click
+import numpy as np
+
+from app.ml import predict_service
+
+CSV_PATH = Path("data") / "healthcare-dataset-stroke-data.csv"
+
+
+def _load_features(limit: int) -> List[Dict[str, Any]]:
+    features: List[Dict[str, Any]] = []
+    with CSV_PATH.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            features.append(
+                {
+                    "gender": row["gender"],
+                    "age": row["age"],
+                    "hypertension": row["hypertension"],
+                    "heart_disease": row["heart_disease"],
+                    "ever_married": row["ever_married"],
+                    "work_type": row["work_type"],
+                    "Residence_type": row["Residence_type"],
+                    "avg_glucose_level": row["avg_glucose_level"],
+                    "bmi": row["bmi"],
+                    "smoking_status": row["smoking_status"],
+                }
+            )
+            if len(features) >= limit:
+                break
+    return features
+
+
+def _time_path(
+    fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+    features: List[Dict[str, Any]],
+    iterations: int,
+) -> np.ndarray:
+    # warm-up (model already loaded, caches/allocations primed)
+    for f in features[:20]:
+        fn(f)
+
+    timings = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        f = features[i % len(features)]
+        start = time.perf_counter()
+        fn(f)
+        timings[i] = time.perf_counter() - start
+    return timings * 1000.0  # ms
+
+
+def _report(name: str, ms: np.ndarray) -> None:
+    print(
+        f"{name:<10} {np.percentile(ms, 50):>10.3f} "
+        f"{np.percentile(ms, 99):>10.3f} {ms.mean():>10.3f}"
+    )
+
+
+@click.command()
+@click.option("--iterations", default=2000, show_default=True, type=int)
+def main(iterations: int) -> None:
+    predict_service._ensure_model_loaded()
+    features = _load_features(500)
+
+    # Both paths must agree before timing means anything
+    for f in features:
+        fast = predict_service.predict_risk(f)
+        ref = predict_service._predict_risk_pandas(f)
+        if abs(fast["probability"] - ref["probability"]) > 1e-12:
+            raise SystemExit(f"Fast path disagrees with pandas path for {f!r}")
+
+    print(f"Model: {predict_service.MODEL_PATH}")
+    print(f"Iterations per path: {iterations}\n")
+    print(f"{'path':<10} {'p50 ms':>10} {'p99 ms':>10} {'mean ms':>10}")
+
+    predict_service.configure_prediction_cache(maxsize=0)
+    try:
+        for name, fn in (
+            ("pandas", predict_service._predict_risk_pandas),
+            ("fast", predict_service.predict_risk),
+        ):
+            _report(name, _time_path(fn, features, iterations))
+    finally:
+        predict_service.configure_prediction_cache()
+
+    # every input is cached after the first pass over `features`
+    for f in features:
+        predict_service.predict_risk(f)
+    _report("cached", _time_path(predict_service.predict_risk, features, iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,27 +13,72 @@ AI Statement: Portions of this file were drafted or refined using
 ===========================================================
 '''
 
-"""
-Recompute ML stroke-risk predictions for **all active patients** in MongoDB.
-
-This script:
- - Uses app.ml.predict_service.run_ml_on_patient_doc()
-   (the SAME helper the doctor & HCP views use)
- - Writes risk_assessment = {
-       _score, _level, _flag, _calculated_at
-   }
-
-It is also imported by tests/test_risk_label.py for the risk_label()
-helper below.
-"""
+# scripts/compute_ml_for_existing_docs.py
+#
+# Incremental recompute of ML stroke-risk predictions for all active
+# patients in MongoDB.
+#
+#  - streams the active patients in _id order, `--batch-size` at a time
+#  - skips documents whose stored risk_assessment.feature_hash and
+#    risk_assessment.model_version match the current features / model
+#  - scores the rest with one predict_risk_many call per batch
+#  - writes each batch with one unordered bulk_write
+#  - records the last written _id in a checkpoint file, so a crashed run
+#    resumes where it stopped (`--restart` ignores the checkpoint)
+#  - with `--processes N`, splits the _id range into N partitions and runs
+#    each in its own process (own MongoClient, own model copy)
+#
+# Writes risk_assessment.{score, level, flag, calculated_at, model_version,
+# feature_hash} into the canonical risk sub-document, stamps schema_version
+# and drops the legacy _score/_level style keys, carrying values only they
+# held (e.g. _factors) over (see app/db/risk_schema.py).
+#
+#     python -m scripts.compute_ml_for_existing_docs [--batch-size 1000] [--force] [--processes 4]
 
 from __future__ import annotations
 
+import hashlib
+import json
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import click
+from bson import json_util
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 
 from app import create_app
 from app.db.mongo import get_patient_collection
-from app.ml.predict_service import run_ml_on_patient_doc  # reuse doctor logic
+from app.db.risk_schema import migration_update
+from app.ml import predict_service
+from app.ml.predict_service import build_features_from_patient_doc, predict_risk_many
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHECKPOINT = predict_service.BASE_DIR / "instance" / "recompute_checkpoint.json"
+
+# Worker processes are spawned: no inherited sockets / locks
+MP_START_METHOD = "spawn"
+
+# Everything build_features_from_patient_doc reads, plus the whole
+# risk_assessment: the stored hashes, and the legacy keys the rewrite
+# carries over (see _updates_for_batch)
+_PROJECTION = {
+    "demographics": 1,
+    "medical_history": 1,
+    "risk_assessment": 1,
+    **{
+        key: 1
+        for key in (
+            "gender", "age", "hypertension", "heart_disease", "ever_married",
+            "work_type", "Residence_type", "avg_glucose_level", "bmi", "smoking_status",
+        )
+    },
+}
 
 
 # ----------------------------------------------------------------------
@@ -65,61 +110,398 @@ def risk_label(score: float | None) -> str:
 
 
 # ----------------------------------------------------------------------
-# Main recompute routine
+# Change detection
 # ----------------------------------------------------------------------
-def run_recompute() -> None:
-    coll = get_patient_collection()
+def feature_hash(features: Dict[str, Any]) -> str:
+    """Stable hash of the model inputs built from a patient document."""
+    payload = json.dumps(features, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-    print(" Fetching active patients from MongoDB…")
-    docs = list(coll.find({"system_metadata.is_active": True}))
-    print(f"Found {len(docs)} patients. Computing ML predictions…")
 
+def _is_current(doc: Dict[str, Any], fhash: str, model_version: str) -> bool:
+    risk = doc.get("risk_assessment") or {}
+    return risk.get("feature_hash") == fhash and risk.get("model_version") == model_version
+
+
+# ----------------------------------------------------------------------
+# Checkpoint (last _id whose batch was fully written)
+# ----------------------------------------------------------------------
+def _load_checkpoint(path: Path, model_version: str) -> Dict[str, Any] | None:
+    if not path.exists():
+        return None
+
+    checkpoint = json_util.loads(path.read_text())
+    # A different model invalidates everything already "done"
+    if checkpoint.get("model_version") != model_version:
+        return None
+    return checkpoint
+
+
+def _save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json_util.dumps(checkpoint))
+    tmp_path.replace(path)
+
+
+# ----------------------------------------------------------------------
+# Main recompute routine
+# ----------------------------------------------------------------------
+def _updates_for_batch(
+    docs: List[Dict[str, Any]],
+    model_version: str,
+    force: bool,
+) -> List[UpdateOne]:
+    """Score only the changed docs of one batch; return their updates."""
+    pending = []
     for d in docs:
-        oid = d["_id"]
+        features = build_features_from_patient_doc(d)
+        fhash = feature_hash(features)
+        if force or not _is_current(d, fhash, model_version):
+            pending.append((d, features, fhash))
+
+    if not pending:
+        return []
+
+    results = predict_risk_many([f for _, f, _ in pending], batch_size=len(pending))
+    now = datetime.utcnow()
+
+    updates = []
+    for (doc, _, fhash), r in zip(pending, results):
+        # Start from the canonical (v2) risk_assessment so legacy-only
+        # values such as _factors end up in factors, not dropped
+        update = migration_update(doc)
+        update["$set"]["risk_assessment"].update(
+            score=float(r["probability"]),
+            level=r["risk_level"],
+            flag=int(r["stroke_flag"]),
+            calculated_at=now,
+            model_version=r["model_version"],
+            feature_hash=fhash,
+        )
+        update["$set"]["system_metadata.last_modified_at"] = now
+        updates.append(UpdateOne({"_id": doc["_id"]}, update))
+    return updates
+
+
+def _process_batch(
+    coll: Any,
+    batch: List[Dict[str, Any]],
+    model_version: str,
+    force: bool,
+    stats: Dict[str, Any],
+    checkpoint_path: Path | None,
+) -> None:
+    updates = _updates_for_batch(batch, model_version, force)
 
+    if updates:
         try:
-            # probability (0–1), stroke_flag (0/1), risk_level ("Low"/"Medium"/"High")
-            proba, stroke_flag, risk_level = run_ml_on_patient_doc(d)
-        except Exception as e:
-            print(f" Skipped patient {oid}: model error → {e}")
-            continue
-
-        now = datetime.utcnow()
-
-        coll.update_one(
-            {"_id": oid},
-            {
-                "$set": {
-                # preferred schema
-                "risk_assessment.score": float(proba),
-                "risk_assessment.level": risk_level,
-                "risk_assessment.flag": int(stroke_flag),
-                "risk_assessment.calculated_at": now,
-
-                # legacy keys (keep for safety)
-                "risk_assessment._score": float(proba),
-                "risk_assessment._level": risk_level,
-                "risk_assessment._flag": int(stroke_flag),
-                "risk_assessment._calculated_at": now,
-
-                "system_metadata.last_modified_at": now,
-}
+            coll.bulk_write(updates, ordered=False)
+        except BulkWriteError as exc:
+            stats["write_errors"] += len(exc.details.get("writeErrors", []))
+
+    stats["scanned"] += len(batch)
+    stats["updated"] += len(updates)
+    stats["skipped"] += len(batch) - len(updates)
 
-            },
+    if checkpoint_path is not None:
+        _save_checkpoint(
+            checkpoint_path,
+            {"last_id": batch[-1]["_id"], "model_version": model_version, "stats": stats},
         )
 
-        print(
-            f"✔ Updated {oid}: "
-            f"score={proba:.2f}, level={risk_level}, flag={stroke_flag}"
+
+def _id_query(id_range: Tuple[Any, Any] | None, after: Any = None) -> Dict[str, Any]:
+    """
+    _id condition for one partition [low, high) – None bounds are open –
+    optionally narrowed to ids after a checkpointed `after`.
+    """
+    low, high = id_range if id_range is not None else (None, None)
+    cond: Dict[str, Any] = {}
+    if after is not None:
+        cond["$gt"] = after
+    elif low is not None:
+        cond["$gte"] = low
+    if high is not None:
+        cond["$lt"] = high
+    return cond
+
+
+def run_recompute(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Path | None = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    force: bool = False,
+    id_range: Tuple[Any, Any] | None = None,
+    progress: Callable[[Dict[str, Any]], None] | None = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    Rescore active patients whose features or model version changed.
+    Returns counters (scanned / skipped / updated / write_errors).
+
+    `id_range` limits the run to one [low, high) _id partition (see
+    run_partitioned); `progress` is called with the counters after
+    every batch.
+    """
+    coll = get_patient_collection()
+    model_version = predict_service._ensure_model_loaded().version
+
+    checkpoint = None
+    if checkpoint_path is not None and not restart:
+        checkpoint = _load_checkpoint(checkpoint_path, model_version)
+
+    stats: Dict[str, Any] = {"scanned": 0, "skipped": 0, "updated": 0, "write_errors": 0}
+    query: Dict[str, Any] = {"system_metadata.is_active": True}
+    after = None
+    if checkpoint is not None:
+        after = checkpoint["last_id"]
+        stats.update(checkpoint["stats"])
+        log(f" Resuming after _id {after} ({stats['scanned']} already scanned)")
+
+    id_cond = _id_query(id_range, after)
+    if id_cond:
+        query["_id"] = id_cond
+
+    log(f" Recomputing with model {model_version}…")
+    started = time.perf_counter()
+    scanned_at_start = stats["scanned"]
+
+    cursor = (
+        coll.find(query, _PROJECTION)
+        .sort("_id", ASCENDING)
+        .batch_size(batch_size)
+    )
+
+    batch: List[Dict[str, Any]] = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            _process_batch(coll, batch, model_version, force, stats, checkpoint_path)
+            batch = []
+            if progress is not None:
+                progress(dict(stats))
+            rate = (stats["scanned"] - scanned_at_start) / (time.perf_counter() - started)
+            log(
+                f" … {stats['scanned']} scanned, {stats['updated']} updated, "
+                f"{stats['skipped']} unchanged ({rate:,.0f} docs/sec)"
+            )
+    if batch:
+        _process_batch(coll, batch, model_version, force, stats, checkpoint_path)
+        if progress is not None:
+            progress(dict(stats))
+
+    # Finished cleanly – nothing to resume
+    if checkpoint_path is not None and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_seconds"] = elapsed
+    log(
+        f" DONE! {stats['scanned']} scanned, {stats['updated']} updated, "
+        f"{stats['skipped']} unchanged, {stats['write_errors']} write errors "
+        f"in {elapsed:.1f}s."
+    )
+    return stats
+
+
+# ----------------------------------------------------------------------
+# Multi-process mode: one process per _id partition
+# ----------------------------------------------------------------------
+def plan_partitions(coll: Any, n: int) -> List[Tuple[Any, Any]]:
+    """
+    Split the active patients' _id range into `n` contiguous [low, high)
+    partitions of roughly equal size ($bucketAuto over the _id index).
+    The outer bounds are left open so nothing inserted meanwhile is lost.
+    With fewer active patients than `n`, $bucketAuto returns fewer
+    buckets and the plan is shorter than `n`.
+    """
+    if n <= 1:
+        return [(None, None)]
+
+    buckets = list(
+        coll.aggregate(
+            [
+                {"$match": {"system_metadata.is_active": True}},
+                {"$project": {"_id": 1}},
+                {"$bucketAuto": {"groupBy": "$_id", "buckets": n}},
+            ],
+            allowDiskUse=True,
         )
+    )
+    cuts = [b["_id"]["min"] for b in buckets[1:]]
+    bounds = [None, *cuts, None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _partition_checkpoint(checkpoint_path: Path | None, index: int, n: int) -> Path | None:
+    if checkpoint_path is None:
+        return None
+    return checkpoint_path.with_name(f"{checkpoint_path.stem}.p{index}of{n}{checkpoint_path.suffix}")
+
+
+def _run_partition(
+    index: int,
+    id_range: Tuple[Any, Any],
+    batch_size: int,
+    checkpoint_path: Path | None,
+    restart: bool,
+    force: bool,
+    progress_queue: Any,
+) -> Dict[str, Any]:
+    """
+    Worker-process entry point. A spawned process builds its own app,
+    MongoClient and model copy (loaded from the shared bundle file).
+    """
+    app = create_app()
+    with app.app_context():
+        return run_recompute(
+            batch_size,
+            checkpoint_path,
+            restart=restart,
+            force=force,
+            id_range=id_range,
+            progress=lambda stats: progress_queue.put((index, stats)),
+            log=lambda _msg: None,
+        )
+
+
+def run_partitioned(
+    processes: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Path | None = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Recompute with `processes` worker processes, one per _id partition.
+    Progress and failures are aggregated here; a failed partition does
+    not stop the others and can be resumed from its own checkpoint.
+    """
+    coll = get_patient_collection()
+    model_version = predict_service._ensure_model_loaded().version
+
+    # Re-use the partition plan of an interrupted run so the per-partition
+    # checkpoints still line up with their ranges. The plan is matched on
+    # the requested process count: it may hold fewer partitions.
+    plan_path = checkpoint_path.with_suffix(".plan.json") if checkpoint_path else None
+    plan = None
+    if plan_path is not None and plan_path.exists() and not restart:
+        saved = json_util.loads(plan_path.read_text())
+        if saved.get("model_version") == model_version and saved.get("processes") == processes:
+            plan = [tuple(p) for p in saved["partitions"]]
+
+    # Partition checkpoints left without their plan describe other ranges
+    partition_restart = restart or plan is None
+    if plan is None:
+        plan = plan_partitions(coll, processes)
+        if plan_path is not None:
+            _save_checkpoint(
+                plan_path,
+                {"model_version": model_version, "processes": processes, "partitions": plan},
+            )
+
+    if len(plan) < processes:
+        print(f" Only {len(plan)} partition(s) for {processes} processes (few active patients).")
+    print(f" Recomputing with model {model_version} across {len(plan)} processes…")
+    started = time.perf_counter()
+
+    ctx = multiprocessing.get_context(MP_START_METHOD)
+    manager = ctx.Manager()
+    progress_queue = manager.Queue()
+    latest: Dict[int, Dict[str, Any]] = {}
+    results: Dict[int, Dict[str, Any]] = {}
+    failures: Dict[int, str] = {}
+
+    def drain(timeout: float) -> None:
+        try:
+            while True:
+                index, stats = progress_queue.get(timeout=timeout)
+                latest[index] = stats
+                timeout = 0
+        except queue.Empty:
+            return
+
+    with manager, ProcessPoolExecutor(max_workers=len(plan), mp_context=ctx) as pool:
+        futures = {
+            pool.submit(
+                _run_partition,
+                i,
+                id_range,
+                batch_size,
+                _partition_checkpoint(checkpoint_path, i, len(plan)),
+                partition_restart,
+                force,
+                progress_queue,
+            ): i
+            for i, id_range in enumerate(plan)
+        }
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=2.0)
+            for future in done:
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    latest[i] = results[i]
+                except Exception as exc:
+                    failures[i] = repr(exc)
+                    print(f" ! Partition {i} {plan[i]} failed: {exc!r}")
+
+            drain(0.1)
+            scanned = sum(s["scanned"] for s in latest.values())
+            updated = sum(s["updated"] for s in latest.values())
+            rate = scanned / (time.perf_counter() - started)
+            print(
+                f" … {scanned} scanned, {updated} updated, "
+                f"{len(results)}/{len(plan)} partitions done ({rate:,.0f} docs/sec)"
+            )
+
+    totals: Dict[str, Any] = {
+        key: sum(s.get(key, 0) for s in latest.values())
+        for key in ("scanned", "skipped", "updated", "write_errors")
+    }
+    totals["elapsed_seconds"] = time.perf_counter() - started
+    totals["failed_partitions"] = failures
+
+    if not failures and plan_path is not None and plan_path.exists():
+        plan_path.unlink()
 
-    print(" DONE! All patient risk scores recalculated.")
+    print(
+        f" DONE! {totals['scanned']} scanned, {totals['updated']} updated, "
+        f"{totals['skipped']} unchanged, {totals['write_errors']} write errors, "
+        f"{len(failures)} failed partitions in {totals['elapsed_seconds']:.1f}s."
+    )
+    return totals
 
 
-def main() -> None:
+@click.command()
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, type=click.IntRange(1))
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    default=str(DEFAULT_CHECKPOINT),
+    show_default=True,
+    type=click.Path(path_type=Path),
+)
+@click.option("--restart", is_flag=True, help="Ignore any checkpoint and scan from the start.")
+@click.option("--force", is_flag=True, help="Rescore every patient, changed or not.")
+@click.option(
+    "--processes",
+    default=1,
+    show_default=True,
+    type=click.IntRange(1),
+    help="Split the _id range into N partitions, one worker process each.",
+)
+def main(batch_size: int, checkpoint_path: Path, restart: bool, force: bool, processes: int) -> None:
     app = create_app()
     with app.app_context():
-        run_recompute()
+        if processes > 1:
+            totals = run_partitioned(processes, batch_size, checkpoint_path, restart, force)
+            if totals["failed_partitions"]:
+                raise SystemExit(1)
+        else:
+            run_recompute(batch_size, checkpoint_path, restart=restart, force=force)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,349 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/explain_queries.py
+#
+# Query-plan check for the patient queries the routes actually send.
+#
+# Seeds a throw-away database on a local mongod with synthetic patients,
+# applies the declarative index set (app/db/indexes.py), then runs every
+# query builder (_build_patient_filter, _hcp_patient_filter, keyset page
+# filters, the risk distribution pipeline, …) through
+# explain("executionStats"). A query fails when its winning plan contains
+# a COLLSCAN, or when it examines more than --max-ratio documents per
+# document returned. Queries that must read every active patient by
+# design (full export, dashboard counts) are marked as allowed scans.
+#
+# tests/test_query_plans.py runs the same cases and skips when no mongod
+# is reachable.
+#
+#     python -m scripts.explain_queries [--uri mongodb://127.0.0.1:27017] [--docs 20000]
+
+from __future__ import annotations
+
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Sequence
+
+import click
+from bson import ObjectId, SON
+from pymongo import MongoClient
+
+from app.db.indexes import apply_indexes
+from app.db.pagination import keyset_filter, keyset_pipeline
+from app.db.patient_row import PATIENT_ROW_FLAT_PROJECT, PATIENT_ROW_PROJECTION
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION
+from app.db.risk_stats import ACTIVE_FILTER, risk_distribution_pipeline
+from app.routes.admin import ADMIN_PATIENT_SORTS, _admin_patient_filter
+from app.routes.doctor import PATIENT_LIST_SORT, _build_patient_filter
+from app.routes.hcp import HIGH_RISK_FILTER, _hcp_patient_filter
+from app.utils.export import EXPORT_PROJECTION
+
+DEFAULT_URI = os.environ.get("MONGO_URI", "mongodb://127.0.0.1:27017")
+DEFAULT_DOCS = 20_000
+DEFAULT_MAX_RATIO = float(os.environ.get("EXPLAIN_MAX_RATIO", 3))
+
+
+@dataclass
+class QueryCase:
+    name: str
+    filter: Dict[str, Any] = field(default_factory=dict)
+    sort: Sequence[tuple] | None = None
+    limit: int | None = None
+    projection: Dict[str, Any] | None = None
+    pipeline: List[Dict[str, Any]] | None = None  # aggregate instead of find
+    allow_collscan: str | None = None  # reason, when a full scan is the point
+
+
+# ----------------------------------------------------------------------
+# Seed data
+# ----------------------------------------------------------------------
+def _synthetic_patients(n: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    levels = ("Low", "Low", "Low", "Medium", "High", "Unknown")
+    smoking = ("never smoked", "formerly smoked", "smokes", "Unknown")
+    for i in range(n):
+        level = rng.choice(levels)
+        yield {
+            "_id": ObjectId(),
+            "original_id": i,
+            "demographics": {
+                "name": f"Patient {i}" if rng.random() < 0.3 else None,
+                "gender": rng.choice(("Female", "Male")),
+                "age": float(rng.randint(1, 82)),
+                "work_type": rng.choice(("Private", "Self-employed", "Govt_job", "children")),
+                "residence_type": rng.choice(("Urban", "Rural")),
+            },
+            "medical_history": {
+                "hypertension": rng.randint(0, 1),
+                "heart_disease": rng.randint(0, 1),
+                "avg_glucose_level": round(rng.uniform(55, 270), 2),
+                "bmi": round(rng.uniform(15, 50), 1),
+                "smoking_status": rng.choice(smoking),
+                "stroke": int(rng.random() < 0.05),
+            },
+            "risk_assessment": {
+                "level": level,
+                "score": 0.0 if level == "Unknown" else round(rng.random(), 4),
+                "flag": 0,
+                "factors": [],
+                "calculated_at": None,
+            },
+            "system_metadata": {"is_active": rng.random() < 0.9},
+            "schema_version": CURRENT_SCHEMA_VERSION,
+        }
+
+
+def seed_database(db: Any, n: int) -> Any:
+    """Fill `db.patients` with `n` synthetic patients and apply the index set."""
+    coll = db["patients"]
+    batch: List[Dict[str, Any]] = []
+    for doc in _synthetic_patients(n):
+        batch.append(doc)
+        if len(batch) >= 5000:
+            coll.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        coll.insert_many(batch, ordered=False)
+
+    apply_indexes(coll, db["schema_meta"])
+    return coll
+
+
+# ----------------------------------------------------------------------
+# Cases: every filter the routes build
+# ----------------------------------------------------------------------
+def query_cases(coll: Any, page_size: int = 50) -> List[QueryCase]:
+    # A realistic page-2 key: the last row of the first doctor list page
+    first_page = list(
+        coll.find(_build_patient_filter("all", ""), {"_id": 1, "original_id": 1, "risk_assessment.score": 1})
+        .sort(PATIENT_LIST_SORT)
+        .limit(page_size)
+    )
+    last = first_page[-1]
+    page_key = [last["risk_assessment"]["score"], last["original_id"], last["_id"]]
+    deep_key = [0.05, 0, ObjectId("0" * 24)]
+
+    cases = [
+        QueryCase(
+            "doctor list (all)",
+            _build_patient_filter("all", ""),
+            PATIENT_LIST_SORT, page_size + 1, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "doctor list (high)",
+            _build_patient_filter("high", ""),
+            PATIENT_LIST_SORT, page_size + 1, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "doctor list page 2",
+            {"$and": [_build_patient_filter("all", ""), keyset_filter(PATIENT_LIST_SORT, page_key)]},
+            PATIENT_LIST_SORT, page_size + 1, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "doctor list deep page (high)",
+            {"$and": [_build_patient_filter("high", ""), keyset_filter(PATIENT_LIST_SORT, deep_key)]},
+            PATIENT_LIST_SORT, page_size + 1, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "doctor list search (id)",
+            _build_patient_filter("all", "Patient 1234"),
+            PATIENT_LIST_SORT, page_size + 1, PATIENT_ROW_PROJECTION,
+            allow_collscan="free-text $or over unindexed gender / work_type / smoking_status",
+        ),
+        QueryCase(
+            "doctor export (high)",
+            _build_patient_filter("high", ""),
+            projection=EXPORT_PROJECTION,
+        ),
+        QueryCase(
+            "doctor export (all)",
+            _build_patient_filter("all", ""),
+            projection=EXPORT_PROJECTION,
+            allow_collscan="full export reads every active patient",
+        ),
+        QueryCase(
+            "hcp list (all)",
+            _hcp_patient_filter("all", ""),
+            [("original_id", 1)], 50, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "hcp list (medium)",
+            _hcp_patient_filter("medium", ""),
+            [("original_id", 1)], 50, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "hcp list search (id)",
+            _hcp_patient_filter("all", "Patient 4321"),
+            [("original_id", 1)], 50, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "hcp high-risk list",
+            HIGH_RISK_FILTER,
+            [("demographics.age", -1)], 50, PATIENT_ROW_PROJECTION,
+        ),
+        QueryCase(
+            "risk distribution",
+            pipeline=risk_distribution_pipeline(ACTIVE_FILTER),
+            allow_collscan="dashboard counts group every active patient",
+        ),
+    ]
+    return cases + admin_cases()
+
+
+def _admin_page(match: Dict[str, Any], sort_name: str, page_size: int = 50) -> List[Dict[str, Any]]:
+    # First page of admin_patients, as aggregate_keyset_page reads it
+    return keyset_pipeline(match, ADMIN_PATIENT_SORTS[sort_name], page_size + 1, PATIENT_ROW_FLAT_PROJECT)
+
+
+def admin_cases() -> List[QueryCase]:
+    return [
+        QueryCase(
+            "admin list (newest)",
+            pipeline=_admin_page(_admin_patient_filter("active", "all", ""), "newest"),
+        ),
+        QueryCase(
+            "admin list (high, newest)",
+            pipeline=_admin_page(_admin_patient_filter("active", "high", ""), "newest"),
+        ),
+        QueryCase(
+            "admin list (risk)",
+            pipeline=_admin_page(_admin_patient_filter("active", "all", ""), "risk"),
+        ),
+        QueryCase(
+            "admin list (medium, risk)",
+            pipeline=_admin_page(_admin_patient_filter("all", "medium", ""), "risk"),
+        ),
+    ]
+
+
+# ----------------------------------------------------------------------
+# explain("executionStats")
+# ----------------------------------------------------------------------
+def _explain(db: Any, coll_name: str, case: QueryCase) -> Dict[str, Any]:
+    if case.pipeline is not None:
+        command = SON([("aggregate", coll_name), ("pipeline", case.pipeline), ("cursor", {})])
+    else:
+        command = SON([("find", coll_name), ("filter", case.filter)])
+        if case.sort:
+            command["sort"] = SON(list(case.sort))
+        if case.limit:
+            command["limit"] = case.limit
+        if case.projection:
+            command["projection"] = case.projection
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def _walk(node: Any, skip: tuple = ("rejectedPlans", "allPlansExecution")) -> Iterator[Dict[str, Any]]:
+    if isinstance(node, dict):
+        yield node
+        for key, value in node.items():
+            if key not in skip:
+                yield from _walk(value, skip)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item, skip)
+
+
+def summarize(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stages and executionStats counters of one explain."""
+    stages: List[str] = []
+    indexes: List[str] = []
+    for node in _walk(explain):
+        if "winningPlan" in node:
+            for plan_node in _walk(node["winningPlan"]):
+                if isinstance(plan_node.get("stage"), str):
+                    stages.append(plan_node["stage"])
+                if isinstance(plan_node.get("indexName"), str):
+                    indexes.append(plan_node["indexName"])
+
+    stats = next(
+        (n["executionStats"] for n in _walk(explain)
+         if isinstance(n.get("executionStats"), dict) and "totalDocsExamined" in n["executionStats"]),
+        {},
+    )
+    return {
+        "stages": stages,
+        "indexes": sorted(set(indexes)),
+        "returned": int(stats.get("nReturned", 0)),
+        "keys_examined": int(stats.get("totalKeysExamined", 0)),
+        "docs_examined": int(stats.get("totalDocsExamined", 0)),
+        "millis": int(stats.get("executionTimeMillis", 0)),
+    }
+
+
+def check_case(db: Any, coll_name: str, case: QueryCase, max_ratio: float) -> Dict[str, Any]:
+    report = {"name": case.name, **summarize(_explain(db, coll_name, case))}
+    report["ratio"] = report["docs_examined"] / max(1, report["returned"])
+
+    problems = []
+    if case.allow_collscan is None:
+        if "COLLSCAN" in report["stages"]:
+            problems.append("COLLSCAN")
+        if report["ratio"] > max_ratio:
+            problems.append(f"examined {report['ratio']:.1f}x returned (> {max_ratio:g}x)")
+    report["problems"] = problems
+    report["note"] = case.allow_collscan
+    return report
+
+
+def run_checks(db: Any, coll: Any, max_ratio: float = DEFAULT_MAX_RATIO) -> List[Dict[str, Any]]:
+    return [check_case(db, coll.name, case, max_ratio) for case in query_cases(coll)]
+
+
+def format_report(reports: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'query':<30} {'plan':<34} {'returned':>8} {'keys':>8} {'docs':>8} {'ratio':>6} {'ms':>5}  result"
+    ]
+    for r in reports:
+        plan = ">".join(reversed(r["stages"]))[:34]
+        verdict = "FAIL: " + "; ".join(r["problems"]) if r["problems"] else (
+            f"ok ({r['note']})" if r["note"] else "ok"
+        )
+        lines.append(
+            f"{r['name']:<30} {plan:<34} {r['returned']:>8} {r['keys_examined']:>8} "
+            f"{r['docs_examined']:>8} {r['ratio']:>6.1f} {r['millis']:>5}  {verdict}"
+        )
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option("--uri", default=DEFAULT_URI, show_default=True)
+@click.option("--docs", default=DEFAULT_DOCS, show_default=True, type=click.IntRange(100))
+@click.option("--max-ratio", default=DEFAULT_MAX_RATIO, show_default=True, type=float)
+@click.option("--keep", is_flag=True, help="Keep the seeded database for inspection.")
+def main(uri: str, docs: int, max_ratio: float, keep: bool) -> None:
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    db_name = f"strokecare_explain_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    try:
+        click.echo(f"Seeding {docs} patients into {db_name}…")
+        coll = seed_database(db, docs)
+        reports = run_checks(db, coll, max_ratio)
+        click.echo(format_report(reports))
+    finally:
+        if not keep:
+            client.drop_database(db_name)
+        client.close()
+
+    failed = [r["name"] for r in reports if r["problems"]]
+    if failed:
+        raise click.ClickException(f"{len(failed)} queries failed the plan check: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
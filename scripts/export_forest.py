@@ -0,0 +1,46 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/export_forest.py
+#
+# Flatten the RandomForest in instance/stroke_model.joblib into contiguous
+# node arrays (feature, threshold, left, right, value) next to the bundle.
+#
+#     python -m scripts.export_forest [OUT_DIR]
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from app.ml.forest import export_forest
+from app.ml.predict_service import MODEL_PATH
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        out_dir = Path(sys.argv[1]).expanduser().resolve()
+    else:
+        out_dir = MODEL_PATH.with_suffix(".forest")
+
+    forest = export_forest(MODEL_PATH, out_dir)
+    print(
+        f"✔ Exported {forest.n_trees} trees "
+        f"({forest.feature.shape[0]} nodes, max depth {forest.max_depth}) to {out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
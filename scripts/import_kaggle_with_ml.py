@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import csv
-import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+import click
+from pymongo import UpdateOne
 
 from app import create_app
+from app.db.bulk import BulkWriter, chunked
 from app.db.mongo import get_patient_collection
-from app.ml.predict_service import run_ml_on_patient_doc  # ML helper
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION
+from app.ml.predict_service import build_features_from_patient_doc, predict_risk_many  # ML helpers
+
+# Rows parsed + scored per model call / per bulk_write
+DEFAULT_CHUNK_SIZE = 1000
+# Concurrent bulk_write threads (each holds one pooled connection)
+DEFAULT_WRITERS = 2
 
 
 # ----------------------------------------------------------------------
@@ -79,107 +89,160 @@ def _build_doc_from_row(row: Dict[str, str]) -> Dict[str, Any]:
             "created_by": None,
             "import_source": "kaggle_csv",
         },
+        "schema_version": CURRENT_SCHEMA_VERSION,
     }
     return doc
 
 
-def _apply_ml_to_doc(doc: Dict[str, Any]) -> None:
-    """
-    Run ML model and update risk_assessment fields in-place.
-    """
-    proba, stroke_flag, risk_level = run_ml_on_patient_doc(doc)
-    now = datetime.utcnow()
+def _is_importable(doc: Dict[str, Any]) -> bool:
+    """Needs an original_id (upsert key) and at least one clinical value."""
+    if doc.get("original_id") is None:
+        return False
 
-    doc.setdefault("risk_assessment", {})
-    doc["risk_assessment"].update(
-        {
-            "score": float(proba),
-            "level": risk_level,
-            "flag": int(stroke_flag),
-            "calculated_at": now,
-        }
+    demo = doc.get("demographics", {}) or {}
+    med = doc.get("medical_history", {}) or {}
+    return not (
+        demo.get("age") is None
+        and med.get("avg_glucose_level") is None
+        and med.get("bmi") is None
     )
 
-    meta = doc.setdefault("system_metadata", {})
-    meta["last_modified_at"] = now
+
+def _score_docs(docs: List[Dict[str, Any]]) -> None:
+    """Score `docs` with ONE model call; update risk_assessment in-place."""
+    features = [build_features_from_patient_doc(d) for d in docs]
+    results = predict_risk_many(features, batch_size=max(1, len(features)))
+    now = datetime.utcnow()
+
+    for doc, result in zip(docs, results):
+        doc.setdefault("risk_assessment", {})
+        doc["risk_assessment"].update(
+            {
+                "score": float(result["probability"]),
+                "level": result["risk_level"],
+                "flag": int(result["stroke_flag"]),
+                "calculated_at": now,
+                "model_version": result.get("model_version"),
+            }
+        )
+
+        meta = doc.setdefault("system_metadata", {})
+        meta["last_modified_at"] = now
+
+
+def _apply_ml_to_docs(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score a whole chunk with one model call and return the scored docs.
+    If that call fails, the chunk is scored row by row so only the rows
+    that fail on their own are left out (and reported).
+    """
+    try:
+        _score_docs(docs)
+        return docs
+    except Exception as exc:
+        print(f"  ! Chunk scoring failed: {exc!r} — scoring its rows one by one")
+
+    scored = []
+    for doc in docs:
+        try:
+            _score_docs([doc])
+        except Exception as exc:
+            print(f"  ! Error on patient {doc.get('original_id')}: {exc!r} — row skipped")
+            continue
+        scored.append(doc)
+    return scored
 
 
 # ----------------------------------------------------------------------
-# Main import routine (UPSERT)
+# Main import routine (streaming bulk UPSERT)
 # ----------------------------------------------------------------------
-def import_kaggle_with_ml(csv_path: Path) -> None:
+def import_kaggle_with_ml(
+    csv_path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    writers: int = DEFAULT_WRITERS,
+) -> dict:
+    """
+    Stream the CSV in chunks of `chunk_size` rows: build docs, score the
+    chunk with one model call, and hand one unordered bulk_write of
+    UpdateOne(upsert=True) ops to a pool of `writers` threads, which
+    write while the next chunk is parsed + scored.
+    """
     coll = get_patient_collection()
 
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
     print(f"📄 Loading Kaggle stroke CSV from: {csv_path}")
+    print(f"   chunk size {chunk_size}, {writers} writer thread(s)")
 
-    upserted = 0
+    rows_read = 0
     skipped = 0
 
-    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
+    with csv_path.open("r", encoding="utf-8-sig", newline="") as f, \
+            BulkWriter(coll, writers=writers) as writer:
         reader = csv.DictReader(f)
 
-        for idx, row in enumerate(reader, start=1):
-            try:
-                doc = _build_doc_from_row(row)
-
-                # must have a valid original_id for upsert
-                if doc.get("original_id") is None:
+        for chunk in chunked(enumerate(reader, start=1), chunk_size):
+            docs: List[Dict[str, Any]] = []
+            for idx, row in chunk:
+                try:
+                    doc = _build_doc_from_row(row)
+                except Exception as exc:
                     skipped += 1
-                    print(f"  · Skipping row {idx}: missing id")
+                    print(f"  ! Error on row {idx}: {exc!r} — row skipped")
                     continue
 
-                # Skip obviously bad rows (no age + no glucose + no BMI)
-                demo = doc.get("demographics", {}) or {}
-                med = doc.get("medical_history", {}) or {}
-                if (
-                    demo.get("age") is None
-                    and med.get("avg_glucose_level") is None
-                    and med.get("bmi") is None
-                ):
+                if not _is_importable(doc):
                     skipped += 1
                     continue
+                docs.append(doc)
 
-                # Run ML scoring before write
-                _apply_ml_to_doc(doc)
+            rows_read += len(chunk)
 
-                # UPSERT by original_id (prevents duplicates)
-                res = coll.update_one(
-                    {"original_id": doc["original_id"]},
-                    {"$set": doc},
-                    upsert=True,
-                )
+            # Run ML scoring before write (one call per chunk)
+            scored = _apply_ml_to_docs(docs) if docs else []
+            skipped += len(docs) - len(scored)
+            docs = scored
+            if not docs:
+                continue
 
-                if res.upserted_id is not None or res.modified_count > 0:
-                    upserted += 1
+            # UPSERT by original_id (prevents duplicates)
+            writer.submit(
+                [
+                    UpdateOne({"original_id": d["original_id"]}, {"$set": d}, upsert=True)
+                    for d in docs
+                ]
+            )
 
-                if upserted % 500 == 0:
-                    ra = doc.get("risk_assessment", {}) or {}
-                    print(
-                        f"  ✔ Upserted {upserted} patients so far "
-                        f"(last: score={ra.get('score', 0):.2f}, level={ra.get('level')})"
-                    )
+            elapsed = time.perf_counter() - writer.started_at
+            print(f"  ✔ {rows_read} rows read ({rows_read / elapsed:,.0f} rows/sec)")
 
-            except Exception as exc:
-                skipped += 1
-                print(f"  ! Error on row {idx}: {exc!r} — row skipped")
+        stats = writer.close()
 
+    elapsed = stats["elapsed_seconds"]
     print("\nImport complete.")
-    print(f"   Upserted: {upserted} patients")
+    print(f"   Upserted: {stats['upserted']} new, {stats['modified']} updated patients")
     print(f"   Skipped : {skipped} rows")
-
-
-def main() -> None:
-    if len(sys.argv) > 1:
-        csv_path = Path(sys.argv[1]).expanduser().resolve()
-    else:
-        csv_path = Path("data") / "healthcare-dataset-stroke-data.csv"
-
+    if stats["write_errors"]:
+        print(f"   Write errors: {stats['write_errors']}")
+    print(f"   Rate    : {rows_read / elapsed:,.0f} rows/sec ({elapsed:.1f}s)")
+
+    return {**stats, "rows_read": rows_read, "skipped": skipped}
+
+
+@click.command()
+@click.argument(
+    "csv_path",
+    required=False,
+    default=str(Path("data") / "healthcare-dataset-stroke-data.csv"),
+    type=click.Path(path_type=Path),
+)
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, show_default=True, type=click.IntRange(1))
+@click.option("--writers", default=DEFAULT_WRITERS, show_default=True, type=click.IntRange(1))
+def main(csv_path: Path, chunk_size: int, writers: int) -> None:
     app = create_app()
     with app.app_context():
-        import_kaggle_with_ml(csv_path)
+        import_kaggle_with_ml(csv_path.expanduser().resolve(), chunk_size, writers)
 
 
 if __name__ == "__main__":
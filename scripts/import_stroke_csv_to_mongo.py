@@ -20,9 +20,14 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+import click
+from pymongo import UpdateOne
+
 from app import create_app
+from app.db.bulk import BulkWriter, chunked
 from app.db.mongo import get_patient_collection
-from app.ml.predict_service import run_ml_on_patient_doc
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION
+from app.ml.predict_service import build_features_from_patient_doc, predict_risk_many
 
 CSV_PATH = Path("data/healthcare-dataset-stroke-data.csv")
 
@@ -128,12 +133,55 @@ def row_to_patient_doc(row: dict) -> dict:
             "is_active": True,
             "import_source": "kaggle_csv",
         },
+        "schema_version": CURRENT_SCHEMA_VERSION,
     }
 
     return doc
 
 
-def main() -> None:
+def _score_docs(docs: list[dict]) -> None:
+    """Score `docs` with ONE model call; ML results replace the rule-based risk."""
+    features = [build_features_from_patient_doc(d) for d in docs]
+    results = predict_risk_many(features, batch_size=max(1, len(features)))
+    now = datetime.utcnow()
+
+    for doc, result in zip(docs, results):
+        doc["risk_assessment"]["score"] = float(result["probability"])
+        doc["risk_assessment"]["level"] = result["risk_level"]
+        doc["risk_assessment"]["flag"] = int(result["stroke_flag"])
+        doc["risk_assessment"]["calculated_at"] = now
+        doc["risk_assessment"]["model_version"] = result.get("model_version")
+        doc["system_metadata"]["last_modified_at"] = now
+
+
+def _apply_ml_to_docs(docs: list[dict]) -> list[dict]:
+    """
+    Score a chunk with one model call and return the scored docs; if that
+    call fails, score row by row and leave out only the failing rows.
+    """
+    try:
+        _score_docs(docs)
+        return docs
+    except Exception as exc:
+        print(f"[WARN] Chunk scoring failed: {exc!r} — scoring its rows one by one")
+
+    scored = []
+    for doc in docs:
+        try:
+            _score_docs([doc])
+        except Exception as exc:
+            print(f"[WARN] Scoring failed (id={doc.get('original_id')}): {exc}")
+            continue
+        scored.append(doc)
+    return scored
+
+
+@click.command()
+@click.option("--chunk-size", default=1000, show_default=True, type=click.IntRange(1),
+              help="Rows parsed + scored per model call / per bulk_write.")
+@click.option("--writers", default=2, show_default=True, type=click.IntRange(1),
+              help="Concurrent bulk_write threads.")
+def main(chunk_size: int, writers: int) -> None:
     app = create_app()
 
     with app.app_context():
@@ -146,43 +194,50 @@ def main() -> None:
         if not CSV_PATH.exists():
             raise FileNotFoundError(f"CSV file not found: {CSV_PATH}")
 
-        with CSV_PATH.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-
-            upserted = 0
-            skipped = 0
+        rows_read = 0
+        skipped = 0
 
-            for idx, row in enumerate(reader, start=1):
-                try:
-                    doc = row_to_patient_doc(row)
-
-                    # ML prediction
-                    proba, flag, level = run_ml_on_patient_doc(doc)
-                    now = datetime.utcnow()
-
-                    doc["risk_assessment"]["score"] = float(proba)
-                    doc["risk_assessment"]["level"] = level
-                    doc["risk_assessment"]["flag"] = int(flag)
-                    doc["risk_assessment"]["calculated_at"] = now
-                    doc["system_metadata"]["last_modified_at"] = now
-
-                    # UPSERT by original_id
-                    res = coll.update_one(
-                        {"original_id": doc["original_id"]},
-                        {"$set": doc},
-                        upsert=True,
-                    )
-
-                    if res.upserted_id is not None or res.modified_count > 0:
-                        upserted += 1
-
-                except Exception as exc:
-                    skipped += 1
-                    print(f"[WARN] Row {idx} import failed (id={row.get('id')}): {exc}")
+        with CSV_PATH.open(newline="", encoding="utf-8") as f, \
+                BulkWriter(coll, writers=writers) as writer:
+            reader = csv.DictReader(f)
 
-            print(f"Upserted {upserted} patient records into MongoDB.")
-            if skipped:
-                print(f"Skipped {skipped} rows.")
+            for chunk in chunked(enumerate(reader, start=1), chunk_size):
+                docs = []
+                for idx, row in chunk:
+                    try:
+                        docs.append(row_to_patient_doc(row))
+                    except Exception as exc:
+                        skipped += 1
+                        print(f"[WARN] Row {idx} import failed (id={row.get('id')}): {exc}")
+
+                rows_read += len(chunk)
+
+                # ML prediction (one call per chunk)
+                scored = _apply_ml_to_docs(docs) if docs else []
+                skipped += len(docs) - len(scored)
+                docs = scored
+                if not docs:
+                    continue
+
+                # UPSERT by original_id
+                writer.submit(
+                    [
+                        UpdateOne({"original_id": d["original_id"]}, {"$set": d}, upsert=True)
+                        for d in docs
+                    ]
+                )
+
+            stats = writer.close()
+
+        elapsed = stats["elapsed_seconds"]
+        print(
+            f"Upserted {stats['upserted']} new / updated {stats['modified']} patient "
+            f"records into MongoDB ({rows_read / elapsed:,.0f} rows/sec)."
+        )
+        if skipped:
+            print(f"Skipped {skipped} rows.")
+        if stats["write_errors"]:
+            print(f"{stats['write_errors']} write errors.")
 
 
 if __name__ == "__main__":
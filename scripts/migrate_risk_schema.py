@@ -0,0 +1,223 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# scripts/migrate_risk_schema.py
+#
+# Online migration of patient documents to the canonical risk schema
+# (schema_version 2, see app/db/risk_schema.py).
+#
+#  - streams documents with schema_version != 2 in _id order,
+#    `--batch-size` at a time (active and archived alike)
+#  - rewrites risk_assessment into the canonical shape, removes the
+#    legacy _level/_score keys and flat admin fields, stamps schema_version
+#  - one unordered bulk_write per batch; each update only applies if the
+#    document's risk_assessment is still what was read, so a concurrent
+#    edit is never overwritten – the document is left for the next pass
+#  - records the last migrated _id in a checkpoint file, so a crashed run
+#    resumes where it stopped (`--restart` ignores the checkpoint)
+#
+# Safe to run while the app is serving traffic and safe to re-run: new
+# writes already use version 2 and migrated documents are never read
+# again.
+#
+#     python -m scripts.migrate_risk_schema [--batch-size 1000] [--max-passes 3]
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import click
+from bson import json_util
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app import create_app
+from app.db.mongo import get_patient_collection
+from app.db.risk_schema import CURRENT_SCHEMA_VERSION, migration_update
+from app.ml import predict_service
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHECKPOINT = predict_service.BASE_DIR / "instance" / "risk_schema_checkpoint.json"
+
+# Only the fields canonical_risk() reads
+_PROJECTION = {
+    "schema_version": 1,
+    "risk_assessment": 1,
+    "risk_label": 1,
+    "risk_level": 1,
+    "risk_score": 1,
+    "probability": 1,
+}
+
+
+def _load_checkpoint(path: Path) -> Dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json_util.loads(path.read_text())
+
+
+def _save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json_util.dumps(checkpoint))
+    tmp_path.replace(path)
+
+
+def _updates_for_batch(docs: List[Dict[str, Any]]) -> List[UpdateOne]:
+    updates = []
+    for d in docs:
+        guard: Dict[str, Any] = {
+            "_id": d["_id"],
+            "schema_version": {"$ne": CURRENT_SCHEMA_VERSION},
+        }
+        # Optimistic concurrency: only rewrite what we actually read
+        if "risk_assessment" in d:
+            guard["risk_assessment"] = d["risk_assessment"]
+        else:
+            guard["risk_assessment"] = {"$exists": False}
+        updates.append(UpdateOne(guard, migration_update(d)))
+    return updates
+
+
+def _process_batch(
+    coll: Any,
+    batch: List[Dict[str, Any]],
+    stats: Dict[str, Any],
+    checkpoint_path: Path | None,
+) -> None:
+    updates = _updates_for_batch(batch)
+
+    try:
+        result = coll.bulk_write(updates, ordered=False)
+        matched = result.matched_count
+    except BulkWriteError as exc:
+        matched = exc.details.get("nMatched", 0)
+        stats["write_errors"] += len(exc.details.get("writeErrors", []))
+
+    stats["scanned"] += len(batch)
+    stats["migrated"] += matched
+    stats["conflicts"] += len(updates) - matched
+
+    if checkpoint_path is not None:
+        _save_checkpoint(checkpoint_path, {"last_id": batch[-1]["_id"], "stats": stats})
+
+
+def migrate_pass(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Path | None = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    One scan over every document still below CURRENT_SCHEMA_VERSION.
+    Returns counters (scanned / migrated / conflicts / write_errors).
+    """
+    coll = get_patient_collection()
+
+    stats: Dict[str, Any] = {"scanned": 0, "migrated": 0, "conflicts": 0, "write_errors": 0}
+    query: Dict[str, Any] = {"schema_version": {"$ne": CURRENT_SCHEMA_VERSION}}
+
+    checkpoint = None
+    if checkpoint_path is not None and not restart:
+        checkpoint = _load_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        query["_id"] = {"$gt": checkpoint["last_id"]}
+        stats.update(checkpoint["stats"])
+        log(f" Resuming after _id {checkpoint['last_id']} ({stats['scanned']} already scanned)")
+
+    started = time.perf_counter()
+    cursor = coll.find(query, _PROJECTION).sort("_id", ASCENDING).batch_size(batch_size)
+
+    batch: List[Dict[str, Any]] = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            _process_batch(coll, batch, stats, checkpoint_path)
+            batch = []
+            rate = stats["scanned"] / (time.perf_counter() - started)
+            log(
+                f" … {stats['scanned']} scanned, {stats['migrated']} migrated, "
+                f"{stats['conflicts']} changed meanwhile ({rate:,.0f} docs/sec)"
+            )
+    if batch:
+        _process_batch(coll, batch, stats, checkpoint_path)
+
+    # Finished cleanly – nothing to resume
+    if checkpoint_path is not None and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    stats["elapsed_seconds"] = time.perf_counter() - started
+    return stats
+
+
+def run_migration(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_path: Path | None = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    max_passes: int = 3,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """
+    Migrate until a pass sees no concurrent edits (or `max_passes` is
+    reached). Returns the last pass's counters plus how many documents
+    are still below the current version.
+    """
+    log(f" Migrating patients to risk schema v{CURRENT_SCHEMA_VERSION}…")
+    for n in range(1, max_passes + 1):
+        stats = migrate_pass(batch_size, checkpoint_path, restart=restart and n == 1, log=log)
+        log(
+            f" Pass {n}: {stats['scanned']} scanned, {stats['migrated']} migrated, "
+            f"{stats['conflicts']} changed meanwhile, {stats['write_errors']} write errors "
+            f"in {stats['elapsed_seconds']:.1f}s."
+        )
+        if not stats["conflicts"]:
+            break
+
+    stats["passes"] = n
+    stats["remaining"] = get_patient_collection().count_documents(
+        {"schema_version": {"$ne": CURRENT_SCHEMA_VERSION}}
+    )
+    log(f" DONE! {stats['remaining']} documents left below v{CURRENT_SCHEMA_VERSION}.")
+    return stats
+
+
+@click.command()
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, type=click.IntRange(1))
+@click.option(
+    "--checkpoint",
+    "checkpoint_path",
+    default=str(DEFAULT_CHECKPOINT),
+    show_default=True,
+    type=click.Path(path_type=Path),
+)
+@click.option("--restart", is_flag=True, help="Ignore any checkpoint and scan from the start.")
+@click.option(
+    "--max-passes",
+    default=3,
+    show_default=True,
+    type=click.IntRange(1),
+    help="Re-scan for documents edited during a pass at most this many times.",
+)
+def main(batch_size: int, checkpoint_path: Path, restart: bool, max_passes: int) -> None:
+    app = create_app()
+    with app.app_context():
+        stats = run_migration(batch_size, checkpoint_path, restart=restart, max_passes=max_passes)
+        if stats["remaining"] or stats["write_errors"]:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,9 @@ import click
 
 from app import create_app
 from app.extensions import db
-from app.models import StrokePrediction, AuditLog
+from app.models import AuditLog
 from app.db.mongo import get_patient_collection
+from app.db.prediction_rollup import purge_predictions
 
 # ---------------------------------------------------------------------
 # CONFIGURATION
@@ -26,15 +27,12 @@ DAYS_TO_KEEP = 30  # delete all records older than this
 # CLEAN SQL TABLES
 # ---------------------------------------------------------------------
 def purge_sql_logs(cutoff: datetime) -> tuple[int, int]:
-    # Delete old predictions
-    deleted_pred = (
-        StrokePrediction.query.filter(StrokePrediction.created_at < cutoff)
-        .delete(synchronize_session=False)
-    )
+    # Delete old predictions (and subtract them from the daily rollup)
+    deleted_pred = purge_predictions(cutoff)
 
     # Delete old audit logs
     deleted_audit = (
-        AuditLog.query.filter(AuditLog.timestamp < cutoff)
+        AuditLog.query.filter(AuditLog.created_at < cutoff)
         .delete(synchronize_session=False)
     )
 
@@ -35,9 +35,15 @@ class TestConfig(Config):
     WTF_CSRF_ENABLED = False          # disable CSRF checks for tests
     RATELIMIT_DEFAULT = "1000 per minute"
 
+    # audit rows written inline, so tests can query them right away
+    AUDIT_ASYNC_ENABLED = False
+
     # use an in-memory SQLite DB for isolation
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
 
+    # no mongod in CI – fail fast instead of waiting on server selection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = 200
+
 
 # -----------------------------
 # App + client fixtures
@@ -113,3 +119,72 @@ def create_admin_user(create_user) -> Callable:
         return create_user(email=email, password=password, role="admin", **extra)
 
     return _create_admin_user
+
+
+# -----------------------------
+# Small in-memory ML bundle
+# -----------------------------
+@pytest.fixture
+def tiny_model_bundle(monkeypatch):
+    """
+    Train a very small RandomForest + LabelEncoders on synthetic data and
+    install it into app.ml.predict_service, so prediction tests do not need
+    instance/stroke_model.joblib.
+    """
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    from app.ml import predict_service
+
+    categories = {
+        "gender": ["Female", "Male", "Other"],
+        "ever_married": ["No", "Yes"],
+        "work_type": ["Govt_job", "Never_worked", "Private", "Self-employed", "children"],
+        "Residence_type": ["Rural", "Urban"],
+        "smoking_status": ["Unknown", "formerly smoked", "never smoked", "smokes"],
+    }
+    feature_order = [
+        "gender",
+        "age",
+        "hypertension",
+        "heart_disease",
+        "ever_married",
+        "work_type",
+        "Residence_type",
+        "avg_glucose_level",
+        "bmi",
+        "smoking_status",
+    ]
+
+    encoders = {col: LabelEncoder().fit(values) for col, values in categories.items()}
+
+    rng = np.random.default_rng(0)
+    n = 400
+    columns = {
+        "age": rng.uniform(1, 90, n),
+        "hypertension": rng.integers(0, 2, n),
+        "heart_disease": rng.integers(0, 2, n),
+        "avg_glucose_level": rng.uniform(55, 270, n),
+        "bmi": rng.uniform(12, 60, n),
+    }
+    for col, values in categories.items():
+        columns[col] = rng.integers(0, len(values), n)
+
+    X = np.column_stack([columns[c] for c in feature_order]).astype(float)
+    y = ((X[:, 1] > 60) | (X[:, 7] > 200)).astype(int)
+
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0)
+    model.fit(X, y)
+
+    monkeypatch.setattr(
+        predict_service,
+        "_ACTIVE",
+        predict_service.build_loaded_model(
+            {"model": model, "encoders": encoders, "feature_order": feature_order},
+            sha256="tiny-test-model",
+        ),
+    )
+    predict_service.configure_prediction_cache()
+
+    return {"model": model, "encoders": encoders, "feature_order": feature_order}
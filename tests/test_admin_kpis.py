@@ -0,0 +1,127 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_admin_kpis.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.db import admin_kpis
+from app.db.admin_kpis import KpiSnapshotCache, compute_admin_kpis, get_admin_kpis
+from app.extensions import db
+from app.models import StrokePrediction
+
+
+def _prediction(created_at: datetime) -> StrokePrediction:
+    return StrokePrediction(
+        probability=0.1,
+        stroke_flag=0,
+        risk_level="Low",
+        raw_features={},
+        created_at=created_at,
+    )
+
+
+def test_kpis_match_per_count_queries(app, create_user):
+    for i, role in enumerate(["admin", "doctor", "doctor", "hcp", "patient", "patient", "patient"]):
+        create_user(email=f"u{i}@stroke.test", role=role)
+    now = datetime(2025, 5, 2, 15, 30)
+    db.session.add_all(
+        [_prediction(now - timedelta(hours=h)) for h in (1, 2, 14, 20, 40)]
+    )
+    db.session.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        kpis = compute_admin_kpis(now)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 3  # one per table
+    assert kpis == {
+        "total_users": 7,
+        "admin_count": 1,
+        "doctor_count": 2,
+        "hcp_count": 1,
+        "patient_count": 3,
+        "total_predictions": 5,
+        "predictions_today": 3,  # 14:30, 13:30, 01:30
+        "active_sessions": 0,
+    }
+
+
+def test_snapshot_is_cached_until_a_user_or_prediction_is_written(app, create_user, monkeypatch):
+    cache = KpiSnapshotCache(ttl_seconds=300)
+    monkeypatch.setattr(admin_kpis, "_CACHE", cache)
+
+    create_user(email="a@stroke.test", role="admin")
+    assert get_admin_kpis()["total_users"] == 1
+    assert get_admin_kpis()["total_users"] == 1
+    assert cache.stats()["hits"] == 1
+
+    create_user(email="d@stroke.test", role="doctor")  # after_insert invalidates
+    assert get_admin_kpis()["doctor_count"] == 1
+
+    db.session.add(_prediction(datetime.utcnow()))
+    db.session.commit()
+    assert get_admin_kpis()["predictions_today"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_snapshot_taken_before_a_rollback_is_dropped(app, monkeypatch):
+    cache = KpiSnapshotCache(ttl_seconds=300)
+    monkeypatch.setattr(admin_kpis, "_CACHE", cache)
+
+    db.session.add(_prediction(datetime.utcnow()))
+    db.session.flush()
+    assert get_admin_kpis()["total_predictions"] == 1  # uncommitted row
+
+    db.session.rollback()
+    assert get_admin_kpis()["total_predictions"] == 0
+
+
+def test_purge_drops_the_snapshot(app, monkeypatch):
+    from app.db.prediction_rollup import purge_predictions
+
+    cache = KpiSnapshotCache(ttl_seconds=300)
+    monkeypatch.setattr(admin_kpis, "_CACHE", cache)
+
+    db.session.add_all([_prediction(datetime(2025, 1, 1)), _prediction(datetime.utcnow())])
+    db.session.commit()
+    assert get_admin_kpis()["total_predictions"] == 2
+
+    purge_predictions(datetime(2025, 6, 1))  # Core delete: no ORM events
+    db.session.commit()
+    assert get_admin_kpis()["total_predictions"] == 1
+
+
+def test_invalidation_during_compute_is_not_cached():
+    cache = KpiSnapshotCache(ttl_seconds=300)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            cache.invalidate()  # a write lands while the first snapshot is computed
+        return {"total_users": len(calls)}
+
+    assert cache.get(compute) == {"total_users": 1}
+    assert cache.get(compute) == {"total_users": 2}
+    assert cache.get(compute) == {"total_users": 2}
+    assert len(calls) == 2
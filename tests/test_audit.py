@@ -0,0 +1,237 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_audit.py
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, select
+
+from app.models import AuditLog
+from app.utils import audit as audit_module
+from app.utils.audit import AuditSink, audit
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    AuditLog.__table__.create(engine)
+    return engine
+
+
+def _count(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(AuditLog.__table__)).scalar_one()
+
+
+def test_sink_writes_concurrent_events_in_batches(tmp_path):
+    engine = _engine(tmp_path)
+    sink = AuditSink(engine, batch_size=50, flush_ms=20)
+
+    def event(i):
+        return sink.submit({"user_id": i, "action": "user_login_failed", "ip_address": "10.0.0.1"})
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        assert all(pool.map(event, range(400)))
+
+    assert sink.flush(5)
+    assert _count(engine) == 400
+
+    stats = sink.stats()
+    assert stats["written"] == 400
+    assert stats["dropped"] == 0
+    assert stats["queued"] == 0
+    assert stats["batches"] < 400
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    sink = AuditSink(engine, batch_size=1, flush_ms=0, max_queue=2)
+
+    started, release = threading.Event(), threading.Event()
+    write = sink._write
+
+    def slow_write(rows):
+        started.set()
+        release.wait(5)
+        write(rows)
+
+    monkeypatch.setattr(sink, "_write", slow_write)
+
+    assert sink.submit({"action": "a"})
+    assert started.wait(5)               # writer is stuck on the first row
+    assert sink.submit({"action": "b"})
+    assert sink.submit({"action": "c"})
+    assert not sink.submit({"action": "d"})  # queue full: dropped, not blocked
+
+    assert sink.stats()["dropped"] == 1
+    release.set()
+    assert sink.flush(5)
+    assert _count(engine) == 3
+
+
+def test_replacing_the_sink_stops_the_old_writer(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    monkeypatch.setattr(audit_module, "_SINK", None)
+
+    first = audit_module.configure_audit_sink(engine, enabled=True, flush_ms=50)
+    for i in range(5):
+        assert first.submit({"user_id": i, "action": "user_login"})
+    thread = first._thread
+
+    audit_module.configure_audit_sink(engine, enabled=False)
+    assert not thread.is_alive()
+    assert _count(engine) == 5  # queued rows were written before the exit
+
+
+def test_audit_goes_through_the_configured_sink(app, tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    sink = AuditSink(engine, batch_size=10, flush_ms=10)
+    monkeypatch.setattr(audit_module, "_SINK", sink)
+
+    with app.test_request_context("/auth/login", environ_base={"REMOTE_ADDR": "10.1.2.3"}):
+        audit(7, "user_login", resource_type="auth", details="ok")
+
+    assert sink.flush(5)
+    with engine.connect() as conn:
+        row = conn.execute(select(AuditLog.__table__)).one()
+    assert row.user_id == 7
+    assert row.action == "user_login | resource_type=auth; details=ok"
+    assert row.ip_address == "10.1.2.3"
+    assert row.created_at is not None
+
+
+# ----------------------------------------------------------------------
+# Admin audit browser
+# ----------------------------------------------------------------------
+def _seed_logs(n: int) -> list[int]:
+    from datetime import datetime, timedelta
+
+    from app.extensions import db
+
+    base = datetime(2025, 3, 1, 12, 0, 0)
+    for i in range(n):
+        db.session.add(
+            AuditLog(
+                user_id=i % 3,
+                action=f"event {i}",
+                event_type="user_login_failed" if i % 2 else "user_login",
+                resource_type="auth",
+                resource_id=str(i % 3),
+                # ties on created_at (and sub-millisecond steps) must not break pages
+                created_at=base + timedelta(microseconds=(i // 4) * 250),
+            )
+        )
+    db.session.commit()
+    return [log.id for log in AuditLog.query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())]
+
+
+def test_sql_keyset_pages_walk_newest_first_and_back(app):
+    from app.db.pagination import fetch_sql_keyset_page
+    from app.extensions import db
+
+    columns = (AuditLog.created_at, AuditLog.id)
+    with app.app_context():
+        db.create_all()
+        expected = _seed_logs(45)
+
+        seen, token, pages = [], None, []
+        while True:
+            rows, next_token, prev_token = fetch_sql_keyset_page(AuditLog.query, columns, 10, token)
+            seen.extend(r.id for r in rows)
+            pages.append((rows, prev_token))
+            if next_token is None:
+                break
+            token = next_token
+        assert seen == expected
+
+        rows, prev_token = pages[-1]
+        for earlier, _ in reversed(pages[:-1]):
+            rows, _, prev_token = fetch_sql_keyset_page(AuditLog.query, columns, 10, prev_token)
+            assert [r.id for r in rows] == [r.id for r in earlier]
+        assert prev_token is None
+
+
+def test_audit_browser_filters_use_an_index_range(app):
+    from datetime import datetime
+
+    from sqlalchemy import text, tuple_
+
+    from app.extensions import db
+
+    with app.app_context():
+        db.create_all()
+        after = tuple_(AuditLog.created_at, AuditLog.id) < tuple_(datetime(2025, 1, 1), 10)
+        queries = [
+            AuditLog.query,
+            AuditLog.query.filter(AuditLog.event_type == "user_login"),
+            AuditLog.query.filter(AuditLog.user_id == 3),
+            AuditLog.query.filter(AuditLog.resource_type == "auth"),
+            AuditLog.query.filter(AuditLog.resource_type == "auth", AuditLog.resource_id == "3"),
+        ]
+        for query in queries:
+            page = query.filter(after).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(101)
+            sql = str(page.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            plan = " ".join(r[-1] for r in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+            assert "USING INDEX ix_audit_logs_" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
+
+
+def test_admin_audit_browser_filters_and_pages(client, monkeypatch, create_admin_user):
+    from app.extensions import db
+    from app.forms import LoginForm
+
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+    admin = create_admin_user()
+    _seed_logs(30)
+    db.session.expire_all()
+
+    with client:
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        resp = client.get(
+            "/admin/audit?event_type=user_login_failed&user_id=1"
+            "&date_from=2025-03-01&date_to=2025-03-01"
+        )
+
+    assert resp.status_code == 200
+    html = resp.get_data(as_text=True)
+    # odd i with i % 3 == 1: 1, 7, 13, 19, 25
+    assert [f"event {i}<" in html for i in (1, 7, 13, 19, 25)] == [True] * 5
+    assert "event 3<" not in html
+
+
+def test_admin_audit_browser_ignores_tampered_cursors(client, monkeypatch, create_admin_user):
+    import base64
+
+    from app.extensions import db
+    from app.forms import LoginForm
+
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+    admin = create_admin_user()
+    _seed_logs(5)
+    db.session.expire_all()
+
+    def token(key: str) -> str:
+        return base64.urlsafe_b64encode(f'{{"k": {key}, "b": false}}'.encode()).decode()
+
+    with client:
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        for key in ('["not-a-date", 5]', '[{"x": 1}, 5]', '["2025-03-01T00:00:00", "5"]'):
+            resp = client.get(f"/admin/audit?cursor={token(key)}")
+            assert resp.status_code == 200, key
+            # served as the first page
+            assert "event 4<" in resp.get_data(as_text=True)
@@ -0,0 +1,126 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_batcher.py
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.ml import predict_service
+from app.ml.batcher import (
+    PredictionBatcher,
+    PredictionQueueFull,
+    PredictionTimeout,
+    configure_batcher,
+)
+
+
+def _features(age: float) -> dict:
+    return {"gender": "Male", "age": age, "avg_glucose_level": 150.0, "bmi": 28.0}
+
+
+def test_concurrent_requests_are_scored_in_batches(tiny_model_bundle):
+    batcher = PredictionBatcher(max_batch_rows=16, max_wait_ms=50)
+    ages = [float(a) for a in range(20, 84)]
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda a: batcher.predict(_features(a)), ages))
+
+    predict_service.configure_prediction_cache(maxsize=0)
+    assert results == [predict_service.predict_risk(_features(a)) for a in ages]
+
+    stats = batcher.stats()
+    assert stats["completed"] == len(ages)
+    assert stats["batches"] < len(ages)
+    assert 1 < stats["largest_batch"] <= 16
+
+
+def test_full_queue_applies_backpressure(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_predict_rows(features_list):
+        started.set()
+        release.wait(5)
+        return [{"probability": 0.0} for _ in features_list]
+
+    monkeypatch.setattr(predict_service, "predict_risk_rows", slow_predict_rows)
+    batcher = PredictionBatcher(max_batch_rows=1, max_wait_ms=0, max_queue=1)
+
+    in_flight = batcher.submit({})
+    assert started.wait(5)             # worker is busy with the first row
+    queued = batcher.submit({})        # fills the queue
+
+    with pytest.raises(PredictionQueueFull):
+        batcher.submit({})
+
+    release.set()
+    assert in_flight.result(5) == queued.result(5) == {"probability": 0.0}
+    assert batcher.stats()["rejected"] == 1
+    assert batcher.stats()["peak_queue_depth"] == 1
+
+
+def test_timed_out_request_is_cancelled_and_skipped(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    scored = []
+
+    def slow_predict_rows(features_list):
+        started.set()
+        release.wait(5)
+        scored.extend(features_list)
+        return [{"probability": 0.0} for _ in features_list]
+
+    monkeypatch.setattr(predict_service, "predict_risk_rows", slow_predict_rows)
+    batcher = PredictionBatcher(max_batch_rows=1, max_wait_ms=0, timeout_seconds=0.05)
+
+    in_flight = batcher.submit({"row": 1})
+    assert started.wait(5)
+    with pytest.raises(PredictionTimeout):   # a PredictionQueueFull: HTTP 503
+        batcher.predict({"row": 2})
+
+    release.set()
+    assert in_flight.result(5) == {"probability": 0.0}
+    batcher.stop()
+    assert scored == [{"row": 1}]
+    assert batcher.stats()["timed_out"] == 1
+
+
+def test_configure_batcher_stops_the_previous_worker(tiny_model_bundle):
+    try:
+        first = configure_batcher(enabled=True, max_wait_ms=0)
+        first.predict(_features(50.0))
+        thread = first._thread
+        assert thread is not None and thread.is_alive()
+
+        configure_batcher(enabled=True, max_wait_ms=0)
+        thread.join(5)
+        assert not thread.is_alive()
+    finally:
+        configure_batcher(enabled=False)
+
+
+def test_model_wrapper_uses_batcher_when_enabled(tiny_model_bundle):
+    from app.ml import predict_risk
+
+    try:
+        batcher = configure_batcher(enabled=True, max_wait_ms=0)
+        result = predict_risk(_features(70.0))
+    finally:
+        configure_batcher(enabled=False)
+
+    assert result == predict_service.predict_risk(_features(70.0))
+    assert batcher.stats()["completed"] == 1
@@ -0,0 +1,154 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_bulk_import.py
+from __future__ import annotations
+
+import threading
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.db.bulk import BulkWriter, chunked
+
+
+class FakeCollection:
+    """Records bulk_write calls (no mongod needed)."""
+
+    def __init__(self, fail_every: int = 0) -> None:
+        self.calls: list = []
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
+
+    def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        with self._lock:
+            self.calls.append(list(operations))
+        if self.fail_every:
+            bad = len(operations[:: self.fail_every])
+            raise BulkWriteError(
+                {
+                    "nUpserted": len(operations) - bad,
+                    "nMatched": 0,
+                    "nModified": 0,
+                    "writeErrors": [{"index": i} for i in range(bad)],
+                }
+            )
+
+        class Result:
+            upserted_count = len(operations)
+            matched_count = 0
+            modified_count = 0
+
+        return Result()
+
+
+def test_chunked_streams_fixed_size_lists():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_bulk_writer_counts_unordered_partial_failures():
+    coll = FakeCollection(fail_every=5)
+    with BulkWriter(coll, writers=3) as writer:
+        for chunk in chunked(range(100), 10):
+            writer.submit(chunk)
+        stats = writer.close()
+
+    assert len(coll.calls) == 10
+    assert stats["operations"] == 100
+    assert stats["write_errors"] == 20
+    assert stats["upserted"] == 80
+
+
+def test_failed_submit_releases_its_writer_slot():
+    writer = BulkWriter(FakeCollection(), writers=1)
+    writer.close()  # pool shut down: every submit fails
+
+    for _ in range(3):  # more than the 2 slots a leaked acquire would use up
+        with pytest.raises(RuntimeError):
+            writer.submit([1])
+    assert writer._slots.acquire(blocking=False)
+
+
+def test_kaggle_import_scores_each_chunk_once(tiny_model_bundle, tmp_path, monkeypatch):
+    from scripts import import_kaggle_with_ml as importer
+
+    csv_path = tmp_path / "stroke.csv"
+    header = "id,gender,age,hypertension,heart_disease,ever_married,work_type," \
+             "Residence_type,avg_glucose_level,bmi,smoking_status,stroke\n"
+    rows = [
+        f"{i},Male,{20 + i},0,1,Yes,Private,Urban,{100 + i},27.5,smokes,0\n"
+        for i in range(1, 24)
+    ]
+    rows.append(",Female,50,0,0,No,Private,Rural,90,N/A,Unknown,0\n")  # no id → skipped
+    csv_path.write_text(header + "".join(rows), encoding="utf-8")
+
+    coll = FakeCollection()
+    model_calls = []
+    real_predict_many = importer.predict_risk_many
+
+    def counting_predict_many(features, batch_size):
+        model_calls.append(len(features))
+        return real_predict_many(features, batch_size=batch_size)
+
+    monkeypatch.setattr(importer, "get_patient_collection", lambda: coll)
+    monkeypatch.setattr(importer, "predict_risk_many", counting_predict_many)
+
+    stats = importer.import_kaggle_with_ml(csv_path, chunk_size=10, writers=2)
+
+    assert model_calls == [10, 10, 3]
+    assert stats["rows_read"] == 24 and stats["skipped"] == 1
+    assert stats["upserted"] == 23
+
+    ops = [op for call in coll.calls for op in call]
+    assert sorted(op._filter["original_id"] for op in ops) == list(range(1, 24))
+    risk = ops[0]._doc["$set"]["risk_assessment"]
+    assert risk["level"] in {"Low", "Medium", "High"}
+    assert risk["model_version"] == "tiny-test-mo"
+
+
+def test_kaggle_import_skips_only_rows_that_fail_to_score(tiny_model_bundle, tmp_path, monkeypatch):
+    from scripts import import_kaggle_with_ml as importer
+
+    csv_path = tmp_path / "stroke.csv"
+    header = "id,gender,age,hypertension,heart_disease,ever_married,work_type," \
+             "Residence_type,avg_glucose_level,bmi,smoking_status,stroke\n"
+    rows = [
+        f"{i},Male,{20 + i},0,1,Yes,Private,Urban,{100 + i},27.5,smokes,0\n"
+        for i in range(1, 24)
+    ]
+    csv_path.write_text(header + "".join(rows), encoding="utf-8")
+
+    coll = FakeCollection()
+    real_predict_many = importer.predict_risk_many
+
+    def failing_predict_many(features, batch_size):
+        # age 32 (row 12) cannot be scored; it fails its whole chunk
+        if any(f["age"] == 32.0 for f in features):
+            raise ValueError("bad row")
+        return real_predict_many(features, batch_size=batch_size)
+
+    monkeypatch.setattr(importer, "get_patient_collection", lambda: coll)
+    monkeypatch.setattr(importer, "predict_risk_many", failing_predict_many)
+
+    stats = importer.import_kaggle_with_ml(csv_path, chunk_size=10, writers=2)
+
+    assert stats["rows_read"] == 23 and stats["skipped"] == 1
+    assert stats["upserted"] == 22
+    ops = [op for call in coll.calls for op in call]
+    assert sorted(op._filter["original_id"] for op in ops) == [i for i in range(1, 24) if i != 12]
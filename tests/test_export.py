@@ -0,0 +1,119 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_export.py
+from __future__ import annotations
+
+import csv
+import io
+
+import pytest
+
+from app.utils.export import EXPORT_COLUMNS, iter_columnar, iter_csv
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for d in self._docs:
+            self.consumed += 1
+            yield d
+
+    def close(self):
+        self.closed = True
+
+
+def _docs(n):
+    return [
+        {
+            "_id": i,
+            "original_id": i,
+            "demographics": {"gender": "Female", "age": 40 + i},
+            "medical_history": {"bmi": 22.5, "stroke": 0},
+            "risk_assessment": {"_level": "Low", "_score": 0.1},
+        }
+        for i in range(n)
+    ]
+
+
+def test_csv_export_streams_in_bounded_chunks():
+    cursor = FakeCursor(_docs(25))
+    chunks = iter_csv(cursor, chunk_rows=10)
+
+    # Header goes out before any document is read
+    assert next(chunks).strip() == ",".join(EXPORT_COLUMNS)
+    assert cursor.consumed == 0
+
+    rest = list(chunks)
+    assert [c.count("\n") for c in rest] == [10, 10, 5]
+    assert cursor.closed
+
+    rows = list(csv.reader(io.StringIO("".join(rest))))
+    assert rows[0][:4] == ["0", "Patient 0", "Female", "40"]
+    assert rows[-1][-2:] == ["Low", "0.1"]
+
+
+def test_csv_export_closes_cursor_when_client_disconnects():
+    cursor = FakeCursor(_docs(100))
+    chunks = iter_csv(cursor, chunk_rows=10)
+
+    next(chunks)
+    next(chunks)
+    chunks.close()  # what werkzeug does when the download is aborted
+
+    assert cursor.closed
+    assert cursor.consumed < 100
+
+
+def test_parquet_export_writes_typed_row_groups():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    docs = _docs(25)
+    docs[3]["medical_history"]["bmi"] = "N/A"  # raw Kaggle value
+    cursor = FakeCursor(docs)
+
+    data = b"".join(iter_columnar(cursor, "parquet", batch_rows=10))
+    parquet = pq.ParquetFile(pa.BufferReader(data))
+
+    assert cursor.closed
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.schema.field("age").type == pa.float64()
+    assert table.schema.field("dataset_stroke_flag").type == pa.int8()
+    assert pa.types.is_dictionary(table.schema.field("risk_level").type)
+    assert table.column("bmi").null_count == 1
+    assert table.column("age").to_pylist()[:2] == [40.0, 41.0]
+
+
+def test_arrow_export_is_a_readable_ipc_stream():
+    pa = pytest.importorskip("pyarrow")
+
+    data = b"".join(iter_columnar(FakeCursor(_docs(25)), "arrow", batch_rows=10))
+    table = pa.ipc.open_stream(data).read_all()
+
+    assert table.num_rows == 25
+    assert table.column("risk_score").to_pylist()[0] == 0.1
+    assert table.column("gender").to_pylist()[0] == "Female"
+
+
+def test_unknown_columnar_format_is_rejected():
+    with pytest.raises(ValueError):
+        next(iter_columnar(FakeCursor([]), "xlsx"))
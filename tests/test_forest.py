@@ -0,0 +1,87 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_forest.py
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.ml.forest import CompiledForest
+
+
+def _train(n_classes: int = 2, **params) -> tuple[RandomForestClassifier, np.ndarray]:
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(600, 10))
+    y = (np.digitize(X[:, 0] + X[:, 3] * X[:, 7], [-0.5, 0.5])) % n_classes
+    model = RandomForestClassifier(random_state=0, **params).fit(X, y)
+    return model, rng.normal(size=(300, 10))
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"n_estimators": 25, "max_depth": 6},
+        {"n_estimators": 40, "max_depth": None},  # deep, unbalanced trees
+        {"n_estimators": 10, "max_depth": 4, "n_classes": 3},
+    ],
+)
+def test_compiled_forest_matches_sklearn(params):
+    """Compiled numpy evaluator must match predict_proba to within 1e-9."""
+    params = dict(params)
+    model, X = _train(params.pop("n_classes", 2), **params)
+    forest = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_allclose(
+        forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9
+    )
+    # single row (the /predict case)
+    np.testing.assert_allclose(
+        forest.predict_proba(X[:1]), model.predict_proba(X[:1]), rtol=0, atol=1e-9
+    )
+
+
+def test_compiled_forest_save_load_roundtrip(tmp_path):
+    model, X = _train(n_estimators=5, max_depth=5)
+    forest = CompiledForest.from_sklearn(model)
+
+    forest.save(tmp_path / "forest")
+    loaded = CompiledForest.load(tmp_path / "forest")
+
+    assert loaded.n_trees == 5
+    assert loaded.classes == [0, 1]
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+
+
+def test_compiled_forest_mmap_load(tmp_path):
+    """Exported arrays can be memory-mapped read-only and still score."""
+    model, X = _train(n_estimators=5, max_depth=5)
+    forest = CompiledForest.from_sklearn(model)
+    forest.save(tmp_path / "forest")
+
+    mapped = CompiledForest.load(tmp_path / "forest", mmap_mode="r")
+
+    assert isinstance(mapped.threshold, np.memmap)
+    assert isinstance(mapped._children, np.memmap)
+    np.testing.assert_array_equal(mapped.predict_proba(X), forest.predict_proba(X))
+
+
+def test_compiled_forest_rejects_wrong_shape():
+    model, _ = _train(n_estimators=3, max_depth=3)
+    forest = CompiledForest.from_sklearn(model)
+
+    with pytest.raises(ValueError):
+        forest.predict_proba(np.zeros((2, 4)))
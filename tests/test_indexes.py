@@ -0,0 +1,150 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_indexes.py
+from __future__ import annotations
+
+from bson import SON
+
+from app.db import indexes
+from app.db.indexes import (
+    INDEX_SET_VERSION,
+    PATIENT_INDEXES,
+    IndexSpec,
+    apply_indexes,
+    diff_indexes,
+    index_set_version,
+)
+
+
+class FakeIndexedCollection:
+    """list_indexes / create_indexes / drop_index, in pymongo's shapes."""
+
+    def __init__(self, infos=()):
+        self.infos = {"_id_": {"name": "_id_", "key": SON([("_id", 1)]), "v": 2}}
+        for info in infos:
+            self.infos[info["name"]] = info
+        self.commands = []
+
+    def list_indexes(self):
+        return list(self.infos.values())
+
+    def create_indexes(self, models):
+        self.commands.append(("create", [m.document["name"] for m in models]))
+        for model in models:
+            self.infos[model.document["name"]] = {"v": 2, **model.document}
+
+    def drop_index(self, name):
+        self.commands.append(("drop", name))
+        del self.infos[name]
+
+
+class FakeMeta:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        doc.update(update["$set"])
+        doc.setdefault("history", []).extend(update["$push"]["history"]["$each"])
+
+
+def _legacy_indexes():
+    # What the old create_index-on-boot code left behind
+    return [
+        {"name": "idx_is_active", "key": SON([("system_metadata.is_active", 1)])},
+        {
+            "name": "idx_active_score_oid",
+            "key": SON([
+                ("system_metadata.is_active", 1),
+                ("risk_assessment._score", -1),
+                ("original_id", 1),
+                ("_id", 1),
+            ]),
+        },
+        {
+            "name": "uniq_original_id_if_int",
+            "key": SON([("original_id", 1)]),
+            "unique": True,
+            "partialFilterExpression": {"original_id": {"$type": "int"}},
+        },
+    ]
+
+
+def test_diff_classifies_create_rebuild_drop_and_unchanged():
+    diff = diff_indexes(FakeIndexedCollection(_legacy_indexes()))
+
+    assert diff.unchanged == ["uniq_original_id_if_int"]
+    assert [s.name for s in diff.rebuild] == ["idx_active_score_oid"]
+    assert diff.drop == ["idx_is_active"]
+    assert {s.name for s in diff.create} == {s.name for s in PATIENT_INDEXES} - {
+        "uniq_original_id_if_int",
+        "idx_active_score_oid",
+    }
+
+
+def test_apply_converges_and_records_the_version():
+    coll, meta = FakeIndexedCollection(_legacy_indexes()), FakeMeta()
+
+    apply_indexes(coll, meta)
+
+    creates = [c for c in coll.commands if c[0] == "create"]
+    assert len(creates) == 1  # one createIndexes round trip
+    assert diff_indexes(coll).is_empty
+    assert meta.docs["patients.indexes"]["version"] == INDEX_SET_VERSION
+    assert meta.docs["patients.indexes"]["history"][-1]["dropped"] == ["idx_is_active"]
+
+    # Second apply is a no-op
+    coll.commands.clear()
+    apply_indexes(coll, meta)
+    assert coll.commands == []
+
+
+def test_keep_extra_leaves_unknown_indexes():
+    coll = FakeIndexedCollection(_legacy_indexes())
+
+    apply_indexes(coll, FakeMeta(), prune=False)
+
+    assert "idx_is_active" in coll.infos
+
+
+def test_version_changes_with_the_spec():
+    changed = PATIENT_INDEXES + (IndexSpec("idx_demo_name", (("demographics.name", 1),)),)
+
+    assert index_set_version(changed) != INDEX_SET_VERSION
+    assert index_set_version(PATIENT_INDEXES) == INDEX_SET_VERSION
+
+
+def test_startup_check_and_cli(app, monkeypatch):
+    coll, meta = FakeIndexedCollection(), FakeMeta()
+    monkeypatch.setattr(indexes, "get_patient_collection", lambda: coll)
+    monkeypatch.setattr(indexes, "get_meta_collection", lambda: meta)
+    runner = app.test_cli_runner()
+
+    with app.app_context():
+        assert indexes.check_patient_indexes()["current"] is False
+    assert runner.invoke(args=["indexes", "status"]).exit_code == 1
+    assert runner.invoke(args=["indexes", "diff"]).exit_code == 1
+
+    result = runner.invoke(args=["indexes", "apply"])
+    assert result.exit_code == 0, result.output
+    assert "+ idx_active_level_score_oid" in result.output
+
+    with app.app_context():
+        assert indexes.check_patient_indexes()["current"] is True
+    assert runner.invoke(args=["indexes", "diff"]).exit_code == 0
@@ -0,0 +1,63 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_mongo_client.py
+from __future__ import annotations
+
+import os
+
+from app.db import mongo
+
+
+def test_client_is_reused_across_requests(app):
+    """
+    Two separate request contexts should get the SAME pooled client
+    (MongoClient construction does not need a running mongod).
+    """
+    with app.test_request_context("/"):
+        first = mongo._get_mongo_client()
+    with app.test_request_context("/"):
+        second = mongo._get_mongo_client()
+
+    assert first is second
+
+
+def test_client_options_come_from_config(app):
+    app.config["MONGO_MAX_POOL_SIZE"] = 7
+    mongo.close_mongo_client()
+
+    client = mongo._get_mongo_client()
+    opts = client.options.pool_options
+
+    assert opts.max_pool_size == 7
+    assert client.options.server_selection_timeout == 0.2
+
+    stats = mongo.get_pool_stats()
+    assert stats["client_initialised"] is True
+    assert stats["max_pool_size"] == 7
+
+
+def test_client_recreated_after_fork(app, monkeypatch):
+    """
+    If the PID changes (gunicorn forked a worker), a new client must be
+    created for the child instead of re-using the parent's sockets.
+    """
+    parent = mongo._get_mongo_client()
+
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    child = mongo._get_mongo_client()
+
+    assert child is not parent
+    assert mongo.get_pool_stats()["pid"] == -1
@@ -0,0 +1,204 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_pagination.py
+from __future__ import annotations
+
+import base64
+import functools
+import random
+
+from bson import ObjectId
+
+from app.db.pagination import (
+    PAGE_KEY_FIELD,
+    _get_path,
+    aggregate_keyset_page,
+    decode_cursor,
+    encode_cursor,
+    fetch_keyset_page,
+)
+
+SORT = [("risk_assessment._score", -1), ("original_id", 1), ("_id", 1)]
+
+
+# --------------------------------------------------
+# Minimal Mongo query / sort evaluator for the operators keyset uses
+# --------------------------------------------------
+def _cmp(a, b) -> int:
+    # Mongo order for our types: null/missing < numbers < ObjectId
+    rank = lambda v: 0 if v is None else (2 if isinstance(v, ObjectId) else 1)  # noqa: E731
+    if rank(a) != rank(b):
+        return rank(a) - rank(b)
+    if a is None:
+        return 0
+    return (a > b) - (a < b)
+
+
+def _matches(doc, query) -> bool:
+    for key, cond in query.items():
+        if key == "$and":
+            if not all(_matches(doc, q) for q in cond):
+                return False
+        elif key == "$or":
+            if not any(_matches(doc, q) for q in cond):
+                return False
+        else:
+            value = _get_path(doc, key)
+            if isinstance(cond, dict):
+                for op, arg in cond.items():
+                    if op == "$ne" and not value != arg:
+                        return False
+                    if op in ("$gt", "$lt"):
+                        # type bracketing: null never compares to a number
+                        if value is None or arg is None:
+                            return False
+                        if op == "$gt" and not value > arg:
+                            return False
+                        if op == "$lt" and not value < arg:
+                            return False
+                    if op == "$exists" and (value is not None) != arg:
+                        return False
+            elif value != cond:
+                return False
+    return True
+
+
+class FakeCursor(list):
+    def sort(self, spec):
+        def compare(a, b):
+            for field, direction in spec:
+                c = _cmp(_get_path(a, field), _get_path(b, field))
+                if c:
+                    return c * direction
+            return 0
+
+        return FakeCursor(sorted(self, key=functools.cmp_to_key(compare)))
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor(d for d in self.docs if _matches(d, query))
+
+
+def _docs(n: int) -> list:
+    rng = random.Random(4)
+    docs = []
+    for i in range(n):
+        score = rng.choice([None, 0.05, 0.2, 0.2, 0.45, round(rng.random(), 2)])
+        ra = {} if score is None and i % 2 else {"_score": score}
+        docs.append(
+            {
+                "_id": ObjectId(),
+                "original_id": rng.choice([None, None, rng.randint(1, 20)]),
+                "risk_assessment": ra,
+            }
+        )
+    return docs
+
+
+def test_cursor_token_roundtrip_and_tampering():
+    oid = ObjectId()
+    token = encode_cursor([0.5, None, oid], backward=True)
+    assert decode_cursor(token) == ([0.5, None, oid], True)
+    assert decode_cursor("not-a-token!") is None
+    assert decode_cursor(None) is None
+
+
+def _raw_token(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def test_cursor_rejects_non_scalar_keys():
+    # unsigned tokens: an operator dict must never reach keyset_filter
+    assert decode_cursor(_raw_token('{"k": [{"$ne": null}, 1], "b": false}')) is None
+    assert decode_cursor(_raw_token('{"k": [[1, 2]], "b": false}')) is None
+    assert decode_cursor(_raw_token('{"k": {"$ne": null}, "b": false}')) is None
+    assert decode_cursor(_raw_token('{"k": [1], "b": "yes"}')) is None
+    assert decode_cursor(_raw_token('{"k": [0.5, "x", true, null], "b": false}')) == (
+        [0.5, "x", True, None],
+        False,
+    )
+
+
+def test_keyset_pages_walk_the_full_sort_order_both_ways():
+    coll = FakeCollection(_docs(57))
+    expected = [d["_id"] for d in coll.find({}).sort(SORT)]
+
+    # forward with null scores / original_ids and many ties
+    seen, token, pages = [], None, []
+    while True:
+        docs, next_token, prev_token = fetch_keyset_page(coll, {}, SORT, 10, token)
+        assert (prev_token is None) == (token is None)
+        seen.extend(d["_id"] for d in docs)
+        pages.append((docs, prev_token))
+        if next_token is None:
+            break
+        token = next_token
+    assert seen == expected
+
+    # backward from the last page reproduces every earlier page
+    docs, prev_token = pages[-1]
+    for earlier_docs, _ in reversed(pages[:-1]):
+        docs, next_token, prev_token = fetch_keyset_page(coll, {}, SORT, 10, prev_token)
+        assert [d["_id"] for d in docs] == [d["_id"] for d in earlier_docs]
+        assert next_token is not None
+    assert prev_token is None
+
+
+class FakeAggregateCollection(FakeCollection):
+    """$match / $sort / $limit as above; $project keeps _id and the page key."""
+
+    def aggregate(self, pipeline):
+        rows = FakeCursor(self.docs)
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                rows = FakeCursor(d for d in rows if _matches(d, arg))
+            elif op == "$sort":
+                rows = rows.sort(list(arg.items()))
+            elif op == "$limit":
+                rows = rows.limit(arg)
+            elif op == "$project":
+                paths = [expr["$ifNull"][0][1:] for expr in arg[PAGE_KEY_FIELD]]
+                rows = [{"_id": d["_id"], PAGE_KEY_FIELD: [_get_path(d, p) for p in paths]} for d in rows]
+        return iter(rows)
+
+
+def test_aggregate_keyset_pages_match_find_pages():
+    coll = FakeAggregateCollection(_docs(43))
+    expected = [d["_id"] for d in coll.find({}).sort(SORT)]
+
+    seen, token = [], None
+    while True:
+        rows, next_token, _ = aggregate_keyset_page(coll, {}, SORT, 8, token)
+        assert all(PAGE_KEY_FIELD not in r for r in rows)
+        seen.extend(r["_id"] for r in rows)
+        if next_token is None:
+            break
+        token = next_token
+    assert seen == expected
+
+    # one step back from the second page is the first page
+    first, next_token, _ = aggregate_keyset_page(coll, {}, SORT, 8)
+    _, _, prev_token = aggregate_keyset_page(coll, {}, SORT, 8, next_token)
+    back, _, _ = aggregate_keyset_page(coll, {}, SORT, 8, prev_token)
+    assert [r["_id"] for r in back] == [r["_id"] for r in first]
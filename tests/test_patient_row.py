@@ -0,0 +1,65 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_patient_row.py
+from __future__ import annotations
+
+import pytest
+from bson import ObjectId
+
+from app.db.patient_row import PATIENT_ROW_PROJECTION, PatientRow
+
+
+def test_from_doc_maps_projected_fields():
+    oid = ObjectId()
+    doc = {
+        "_id": oid,
+        "original_id": 7,
+        "demographics": {"name": "Ada", "gender": "Female", "age": 61},
+        "risk_assessment": {"_level": "High", "_score": "0.82"},
+        "system_metadata": {"last_modified_at": "2024-01-01"},
+    }
+
+    row = PatientRow.from_doc(doc)
+
+    assert row.id == str(oid)
+    assert (row.name, row.gender, row.age) == ("Ada", "Female", 61)
+    assert row.risk_level == "High"
+    assert row.risk_score == pytest.approx(0.82)
+    assert row.last_update == "2024-01-01"
+    assert row.sex == "Female"
+
+
+def test_from_doc_defaults_for_missing_fields():
+    row = PatientRow.from_doc({"_id": 1, "original_id": 42})
+
+    assert row.name == "Patient 42"
+    assert row.risk_level == "Unknown"
+    assert row.risk_score == 0.0
+    assert row.gender is None and row.last_update is None
+
+
+def test_rows_are_slotted():
+    row = PatientRow("1", "Ada")
+
+    assert not hasattr(row, "__dict__")
+    with pytest.raises(AttributeError):
+        row.unexpected = True  # type: ignore[attr-defined]
+    assert set(row.to_dict()) == set(PatientRow.__slots__)
+
+
+def test_projection_covers_from_doc_fields():
+    assert "_id" not in PATIENT_ROW_PROJECTION  # returned by default
+    assert {"demographics.name", "risk_assessment.level", "risk_assessment.score"} <= set(PATIENT_ROW_PROJECTION)
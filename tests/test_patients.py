@@ -28,3 +28,89 @@ def test_patient_list_route_requires_login(client):
     assert resp.status_code == 302
     location = resp.headers.get("Location", "")
     assert "/auth/login" in location
+
+
+def test_admin_patient_list_reads_one_flattened_page(client, monkeypatch, create_admin_user):
+    """
+    /admin/patients sends one aggregation: filter and keyset sort on the
+    stored fields, then the PatientRow $project – no full find().
+    """
+    from app.forms import LoginForm
+    from app.routes import admin as admin_routes
+
+    pipelines = []
+
+    class FakePatients:
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return iter(
+                [
+                    {"id": "abc", "name": "Ada", "gender": "Female", "age": 70,
+                     "risk_level": "High", "risk_score": 0.4, "hypertension": 1,
+                     "stroke": 0, "last_update": None, "_page_key": ["abc"]},
+                ]
+            )
+
+        def find(self, *args, **kwargs):
+            raise AssertionError("admin list must not find() the collection")
+
+    monkeypatch.setattr(admin_routes, "get_patient_collection", lambda: FakePatients())
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+
+    admin = create_admin_user()
+    with client:
+        client.post(
+            "/auth/login",
+            data={"email": admin.email, "password": "AdminPass123!"},
+            follow_redirects=True,
+        )
+        resp = client.get("/admin/patients?status=all&filter=high&sort=risk&q=Ada")
+
+    assert resp.status_code == 200
+    assert b"Ada" in resp.data
+
+    (pipeline,) = pipelines
+    assert [next(iter(stage)) for stage in pipeline] == ["$match", "$sort", "$limit", "$project"]
+    assert pipeline[0]["$match"]["$and"][0] == {"risk_assessment.level": "High"}
+    assert list(pipeline[1]["$sort"]) == ["risk_assessment.score", "_id"]
+    assert pipeline[2]["$limit"] == 51
+
+
+def test_admin_created_patient_is_picked_up_by_the_recompute_job(client, monkeypatch, create_admin_user):
+    from app.forms import LoginForm
+    from app.routes import admin as admin_routes
+
+    inserted = []
+
+    class FakePatients:
+        def insert_one(self, doc):
+            inserted.append(doc)
+
+    monkeypatch.setattr(admin_routes, "get_patient_collection", lambda: FakePatients())
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+
+    admin = create_admin_user()
+    with client:
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        resp = client.post("/admin/patients/create", data={"name": "Ada", "age": "70"})
+
+    assert resp.status_code == 302
+    (doc,) = inserted
+    assert doc["risk_assessment"]["level"] == "Unknown"
+    # the recompute job selects {"system_metadata.is_active": True}
+    assert doc["system_metadata"]["is_active"] is True
+
+
+def test_doctor_search_matches_the_baseline_fields():
+    from app.routes.doctor import _build_patient_filter
+
+    query = _build_patient_filter("all", "Private")
+    fields = {next(iter(clause)) for clause in query["$or"]}
+
+    assert query["system_metadata.is_active"] is True
+    assert {
+        "demographics.gender",
+        "demographics.work_type",
+        "medical_history.smoking_status",
+    } <= fields
+    assert _build_patient_filter("all", "24289")["$or"][-1] == {"original_id": 24289}
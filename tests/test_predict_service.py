@@ -17,11 +17,24 @@ AI Statement: Portions of this file were drafted or refined using
 
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import Any, Dict
 
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
 from app.ml.predict_service import (
+    _compile_encoder,
+    _predict_risk_pandas,
+    _encode_column,
+    _encode_value,
+    _safe_encode,
     build_features_from_patient_doc,
+    predict_risk,
+    predict_risk_many,
     run_ml_on_patient_doc,
+    run_ml_on_patient_docs,
 )
 
 
@@ -138,3 +151,276 @@ def test_run_ml_on_patient_doc_uses_predict_risk(monkeypatch):
     assert proba == 0.8
     assert flag == 1
     assert level == "High"
+
+
+# --------------------------------------------------
+# Test 3: batch API matches the single-row API
+# --------------------------------------------------
+
+def _sample_features() -> list[Dict[str, Any]]:
+    return [
+        {
+            "gender": "Male",
+            "age": 75,
+            "hypertension": 1,
+            "heart_disease": 1,
+            "ever_married": "Yes",
+            "work_type": "Private",
+            "Residence_type": "Urban",
+            "avg_glucose_level": 228.7,
+            "bmi": 36.6,
+            "smoking_status": "formerly smoked",
+        },
+        {
+            "gender": "Female",
+            "age": "12",
+            "hypertension": 0,
+            "heart_disease": 0,
+            "ever_married": "No",
+            "work_type": "children",
+            "Residence_type": "Rural",
+            "avg_glucose_level": 80.1,
+            "bmi": None,
+            "smoking_status": "Unknown",
+        },
+        {
+            # unseen categories + junk numbers fall back safely
+            "gender": "Unspecified",
+            "age": None,
+            "hypertension": 0,
+            "heart_disease": 0,
+            "ever_married": None,
+            "work_type": None,
+            "Residence_type": "Urban",
+            "avg_glucose_level": "n/a",
+            "bmi": 22.0,
+            "smoking_status": None,
+            "patient_id": "ABC123",
+        },
+    ]
+
+
+def test_predict_risk_many_matches_single_row(tiny_model_bundle):
+    features = _sample_features() * 3
+
+    expected = [predict_risk(f) for f in features]
+    # small batch_size forces several predict_proba chunks
+    actual = predict_risk_many(features, batch_size=2)
+
+    assert actual == expected
+    assert predict_risk_many([]) == []
+
+
+def test_fast_path_matches_pandas_reference(tiny_model_bundle):
+    """
+    The numpy single-row fast path must give exactly the same result as
+    the pandas reference path, including junk / missing inputs.
+    """
+    features = _sample_features() + [
+        {"gender": "Male", "age": " 70 ", "hypertension": True, "bmi": "nan"},
+        {},
+    ]
+
+    for f in features:
+        fast = predict_risk(f)
+        ref = _predict_risk_pandas(f)
+
+        # fast path scores with the compiled forest, reference with sklearn
+        assert fast["probability"] == pytest.approx(ref["probability"], abs=1e-9)
+        assert fast["risk_level"] == ref["risk_level"]
+        assert fast["stroke_flag"] == ref["stroke_flag"]
+
+
+def test_run_ml_on_patient_docs_preserves_order(tiny_model_bundle):
+    docs = [
+        {"demographics": {"gender": "Male", "age": 80}, "medical_history": {"hypertension": 1}},
+        {"demographics": {"gender": "Female", "age": 5}, "medical_history": {}},
+        {"demographics": {"gender": "Male", "age": 67}, "medical_history": {"avg_glucose_level": 250}},
+    ]
+
+    batch = run_ml_on_patient_docs(docs, batch_size=2)
+
+    assert batch == [run_ml_on_patient_doc(d) for d in docs]
+
+
+# --------------------------------------------------
+# Test 5: compiled lookup tables == _safe_encode
+# --------------------------------------------------
+
+def test_encoder_tables_match_safe_encode():
+    """
+    For every known class AND for unseen values, the dict lookup tables
+    must give exactly the same code as the LabelEncoder-based fallback.
+    Covers both the "Unknown" fallback and the first-class fallback.
+    """
+    encoders = {
+        "gender": LabelEncoder().fit(["Female", "Male", "Other"]),
+        "smoking_status": LabelEncoder().fit(
+            ["Unknown", "formerly smoked", "never smoked", "smokes"]
+        ),
+        "lower_unknown": LabelEncoder().fit(["a", "unknown", "z"]),
+        "unk": LabelEncoder().fit(["UNK", "b"]),
+    }
+    unseen = ["", "None", "nan", "female", "Alien", "UNKNOWN"]
+
+    for enc in encoders.values():
+        table, default = _compile_encoder(enc)
+        values = list(enc.classes_) + unseen
+
+        expected = [_safe_encode(enc, v) for v in values]
+
+        assert [_encode_value(table, default, v) for v in values] == expected
+        assert _encode_column(table, default, pd.Series(values)).tolist() == expected
+
+
+# --------------------------------------------------
+# Test 6: prediction cache
+# --------------------------------------------------
+
+def test_prediction_cache_hits_and_model_invalidation(tiny_model_bundle, monkeypatch):
+    from app.ml import predict_service
+
+    features = _sample_features()[0]
+
+    first = predict_risk(features)
+    again = predict_risk(dict(features))
+    stats = predict_service.get_cache_stats()
+
+    assert again == first
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+    # run_ml_on_patient_doc + batch API share the same cache entries
+    doc = {"demographics": {"gender": "Male", "age": 80}, "medical_history": {}}
+    run_ml_on_patient_doc(doc)
+    run_ml_on_patient_docs([doc, doc])
+    assert predict_service.get_cache_stats()["hits"] == 3
+
+    # A different model hash must never see the old entries
+    monkeypatch.setattr(
+        predict_service,
+        "_ACTIVE",
+        replace(predict_service._ACTIVE, sha256="retrained-model"),
+    )
+    predict_risk(features)
+    assert predict_service.get_cache_stats()["misses"] == 3
+
+
+def test_bulk_scoring_bypasses_prediction_cache(tiny_model_bundle, monkeypatch):
+    from app.ml import predict_service
+
+    monkeypatch.setattr(predict_service, "CACHED_BATCH_MAX_ROWS", 2)
+    features = _sample_features()[:1] * 3
+
+    bulk = predict_risk_many(features)
+    stats = predict_service.get_cache_stats()
+    assert stats["size"] == 0 and stats["hits"] == stats["misses"] == 0
+
+    assert predict_risk_many(features[:2]) == bulk[:2]
+    assert predict_service.get_cache_stats()["size"] == 1
+
+
+def test_prediction_cache_lru_eviction_and_ttl(monkeypatch):
+    from app.ml import predict_service
+
+    cache = predict_service.PredictionCache(maxsize=2, ttl_seconds=10)
+    cache.put(("m", 1.0), {"p": 1})
+    cache.put(("m", 2.0), {"p": 2})
+    cache.get(("m", 1.0))              # 1 is now most recently used
+    cache.put(("m", 3.0), {"p": 3})    # evicts 2
+
+    assert cache.get(("m", 2.0)) is None
+    assert cache.get(("m", 1.0)) == {"p": 1}
+    assert cache.stats()["evictions"] == 1
+
+    now = predict_service.time.monotonic()
+    monkeypatch.setattr(predict_service.time, "monotonic", lambda: now + 11)
+    assert cache.get(("m", 3.0)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+# --------------------------------------------------
+# Test 7: memory-mapped loading uses a fresh forest export only
+# --------------------------------------------------
+
+def test_mmap_loading_uses_fresh_export(tiny_model_bundle, tmp_path, monkeypatch):
+    import joblib
+    import numpy as np
+
+    from app.ml import predict_service
+    from app.ml.forest import export_forest
+
+    model_path = tmp_path / "stroke_model.joblib"
+    forest_path = tmp_path / "stroke_model.forest"
+    joblib.dump(tiny_model_bundle, model_path)
+    export_forest(model_path, forest_path)
+
+    monkeypatch.setattr(predict_service, "MODEL_PATH", model_path)
+    monkeypatch.setattr(predict_service, "FOREST_PATH", forest_path)
+    monkeypatch.setattr(predict_service, "_ACTIVE", None)
+    monkeypatch.setattr(predict_service, "_MMAP", True)
+
+    report = predict_service.warm_up_model()
+
+    assert report["mmap"] is True
+    assert isinstance(predict_service._ACTIVE.forest.threshold, np.memmap)
+
+    # A different bundle makes the export stale → compiled in memory instead
+    joblib.dump(tiny_model_bundle, model_path, compress=3)
+    monkeypatch.setattr(predict_service, "_ACTIVE", None)
+    loaded = predict_service._ensure_model_loaded()
+
+    assert not isinstance(loaded.forest.threshold, np.memmap)
+
+
+# --------------------------------------------------
+# Test 8: hot reload swaps bundles atomically
+# --------------------------------------------------
+
+def test_registry_hot_reloads_new_bundle_versions(tiny_model_bundle, tmp_path, monkeypatch):
+    import joblib
+
+    from app.ml import predict_service
+    from app.ml.registry import ModelRegistry
+
+    model_path = tmp_path / "stroke_model.joblib"
+    joblib.dump(tiny_model_bundle, model_path)
+    monkeypatch.setattr(predict_service, "_ACTIVE", None)
+
+    registry = ModelRegistry(model_path, interval=60)
+    assert registry.check() is True
+    first = predict_service._ACTIVE
+    assert registry.check() is False  # unchanged file → stat-only check
+
+    features = _sample_features()[0]
+    assert predict_risk(features)["model_version"] == first.version
+
+    # Same model, different bytes → new content hash → new version
+    joblib.dump(tiny_model_bundle, model_path, compress=3)
+    assert registry.check() is True
+    second = predict_service._ACTIVE
+    assert second.version != first.version
+    assert predict_risk(features)["model_version"] == second.version
+
+    # A bundle held by an in-flight request keeps working after the swap
+    assert first.model.predict_proba(predict_service._features_to_row(first, features)).shape == (1, 2)
+
+    # A broken upload is reported and the serving model is kept
+    model_path.write_bytes(b"not a joblib bundle")
+    assert registry.check() is False
+    assert predict_service._ACTIVE is second
+    assert registry.stats()["failures"] == 1
+
+
+def test_missing_sql_columns_are_added_in_place(app):
+    from sqlalchemy import inspect, text
+
+    from app.db.schema import ensure_sql_columns
+    from app.extensions import db
+
+    db.session.execute(text("ALTER TABLE stroke_predictions DROP COLUMN model_version"))
+    db.session.commit()
+
+    assert ensure_sql_columns() == ["stroke_predictions.model_version"]
+    columns = {c["name"] for c in inspect(db.engine).get_columns("stroke_predictions")}
+    assert "model_version" in columns
+    assert ensure_sql_columns() == []
@@ -0,0 +1,187 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_prediction_rollup.py
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from app.db.prediction_rollup import (
+    ANONYMOUS_ROLE,
+    ROLLUP,
+    predictions_by_risk,
+    predictions_per_bucket,
+    purge_predictions,
+    rebuild_rollup,
+)
+from app.extensions import db
+from app.models import StrokePrediction
+
+
+def _prediction(created_at: datetime, level: str = "Low", user_id: int | None = None) -> StrokePrediction:
+    return StrokePrediction(
+        user_id=user_id,
+        probability=0.1,
+        stroke_flag=0,
+        risk_level=level,
+        raw_features={},
+        created_at=created_at,
+    )
+
+
+def _rollup() -> dict:
+    rows = db.session.execute(ROLLUP.select()).all()
+    return {(r.day, r.risk_level, r.user_role): r.count for r in rows}
+
+
+def _seed(create_user) -> None:
+    doctor = create_user(email="doc@stroke.test", role="doctor")
+    db.session.add_all(
+        [
+            _prediction(datetime(2025, 3, 1, 9), "Low", doctor.id),
+            _prediction(datetime(2025, 3, 1, 18), "Low", doctor.id),
+            _prediction(datetime(2025, 3, 1, 20), "High"),
+            _prediction(datetime(2025, 3, 2, 8), "Medium", doctor.id),
+            _prediction(datetime(2025, 4, 10, 12), "High", doctor.id),
+        ]
+    )
+    db.session.commit()
+
+
+def test_orm_inserts_and_deletes_maintain_the_rollup(app, create_user):
+    _seed(create_user)
+
+    assert _rollup() == {
+        (date(2025, 3, 1), "Low", "doctor"): 2,
+        (date(2025, 3, 1), "High", ANONYMOUS_ROLE): 1,
+        (date(2025, 3, 2), "Medium", "doctor"): 1,
+        (date(2025, 4, 10), "High", "doctor"): 1,
+    }
+
+    db.session.delete(StrokePrediction.query.filter_by(risk_level="Medium").one())
+    db.session.commit()
+    assert (date(2025, 3, 2), "Medium", "doctor") not in _rollup()
+
+    db.session.delete(StrokePrediction.query.filter_by(risk_level="Low").first())
+    db.session.rollback()  # nothing flushed: the rollup is untouched
+    assert _rollup()[(date(2025, 3, 1), "Low", "doctor")] == 2
+
+
+def test_purge_subtracts_and_rebuild_matches(app, create_user):
+    _seed(create_user)
+
+    assert purge_predictions(datetime(2025, 3, 1, 19)) == 2
+    db.session.commit()
+    incremental = _rollup()
+    assert incremental == {
+        (date(2025, 3, 1), "High", ANONYMOUS_ROLE): 1,
+        (date(2025, 3, 2), "Medium", "doctor"): 1,
+        (date(2025, 4, 10), "High", "doctor"): 1,
+    }
+
+    db.session.execute(ROLLUP.delete())
+    assert rebuild_rollup() == 3
+    db.session.commit()
+    assert _rollup() == incremental
+
+    # --since only rewrites the days from that date on
+    db.session.execute(ROLLUP.update().values(count=99))
+    rebuild_rollup(since=date(2025, 3, 2))
+    db.session.commit()
+    assert _rollup()[(date(2025, 3, 1), "High", ANONYMOUS_ROLE)] == 99
+    assert _rollup()[(date(2025, 3, 2), "Medium", "doctor")] == 1
+
+
+def test_role_change_before_purge_leaves_no_phantom_counts(app, create_user):
+    user = create_user(email="pat@stroke.test", role="patient")
+    db.session.add(_prediction(datetime(2025, 3, 1, 9), "Low", user.id))
+    db.session.commit()
+    assert StrokePrediction.query.one().user_role == "patient"
+
+    user.role = "doctor"
+    db.session.commit()
+
+    assert purge_predictions(datetime(2025, 3, 2)) == 1
+    db.session.commit()
+    assert StrokePrediction.query.count() == 0
+    assert _rollup() == {}
+
+    # an ORM delete after a role change uses the stored role too
+    db.session.add(_prediction(datetime(2025, 3, 3, 9), "High", user.id))
+    db.session.commit()
+    user.role = "hcp"
+    db.session.commit()
+    db.session.delete(StrokePrediction.query.one())
+    db.session.commit()
+    assert _rollup() == {}
+
+
+def test_range_reads(app, create_user):
+    _seed(create_user)
+
+    assert predictions_per_bucket(date(2025, 3, 1), date(2025, 3, 31)) == {
+        "2025-03-01": 3,
+        "2025-03-02": 1,
+    }
+    assert predictions_per_bucket(date(2025, 1, 1), date(2025, 12, 31), monthly=True) == {
+        "2025-03": 4,
+        "2025-04": 1,
+    }
+    assert dict(predictions_by_risk(date(2025, 3, 1), date(2025, 3, 1))) == {"Low": 2, "High": 1}
+
+
+def test_admin_analytics_range(client, monkeypatch, create_admin_user, create_user):
+    from app.forms import LoginForm
+
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+    admin = create_admin_user()
+    _seed(create_user)
+
+    with client:
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        daily = client.get("/admin/analytics?start=2025-03-01&end=2025-03-07")
+        monthly = client.get("/admin/analytics?start=2024-06-01&end=2025-05-31")
+
+    assert daily.status_code == 200
+    html = daily.get_data(as_text=True)
+    assert "2025-03-07" in html and "Daily count" in html
+
+    assert monthly.status_code == 200
+    html = monthly.get_data(as_text=True)
+    assert "2024-06" in html and "Monthly count" in html
+
+
+def test_admin_analytics_clamps_out_of_range_dates(client, monkeypatch, create_admin_user):
+    import re
+
+    from app.forms import LoginForm
+    from app.routes.admin import ANALYTICS_MAX_SPAN_DAYS
+
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+    admin = create_admin_user()
+
+    with client:
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        near_min = client.get("/admin/analytics?end=0001-01-05")
+        huge = client.get("/admin/analytics?start=0001-01-01&end=9999-12-31")
+
+    assert near_min.status_code == 200
+    assert 'value="0001-01-01"' in near_min.get_data(as_text=True)
+
+    assert huge.status_code == 200
+    html = huge.get_data(as_text=True)
+    start = re.search(r'name="start" value="([\d-]+)"', html).group(1)
+    assert (date(9999, 12, 31) - date.fromisoformat(start)).days == ANALYTICS_MAX_SPAN_DAYS - 1
+    assert "Monthly count" in html
@@ -0,0 +1,110 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_query_plans.py
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from scripts import explain_queries
+from scripts.explain_queries import QueryCase, check_case, format_report, summarize
+
+# A find explain as mongod 7 returns it (trimmed)
+IXSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "LIMIT",
+            "inputStage": {
+                "stage": "FETCH",
+                "inputStage": {"stage": "IXSCAN", "indexName": "idx_active_score_oid"},
+            },
+        },
+        "rejectedPlans": [{"stage": "COLLSCAN"}],
+    },
+    "executionStats": {
+        "nReturned": 51,
+        "executionTimeMillis": 1,
+        "totalKeysExamined": 51,
+        "totalDocsExamined": 51,
+    },
+}
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}},
+    "executionStats": {
+        "nReturned": 51,
+        "executionTimeMillis": 9,
+        "totalKeysExamined": 0,
+        "totalDocsExamined": 20000,
+    },
+}
+
+
+def test_summarize_reads_winning_plan_only():
+    summary = summarize(IXSCAN_EXPLAIN)
+
+    assert summary["stages"] == ["LIMIT", "FETCH", "IXSCAN"]
+    assert summary["indexes"] == ["idx_active_score_oid"]
+    assert summary["returned"] == 51
+    assert summary["docs_examined"] == 51
+
+
+def test_check_case_flags_collscan_unless_allowed(monkeypatch):
+    monkeypatch.setattr(explain_queries, "_explain", lambda db, name, case: COLLSCAN_EXPLAIN)
+
+    failing = check_case(None, "patients", QueryCase("list"), max_ratio=3)
+    allowed = check_case(None, "patients", QueryCase("export", allow_collscan="full export"), max_ratio=3)
+
+    assert "COLLSCAN" in failing["problems"]
+    assert any("examined" in p for p in failing["problems"])
+    assert allowed["problems"] == []
+    assert "FAIL" in format_report([failing])
+
+
+# ----------------------------------------------------------------------
+# Real plans: needs a mongod (MONGO_URI or localhost), skipped otherwise
+# ----------------------------------------------------------------------
+@pytest.fixture(scope="module")
+def seeded_db():
+    uri = os.environ.get("MONGO_URI", "mongodb://127.0.0.1:27017")
+    client = MongoClient(uri, serverSelectionTimeoutMS=300)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("no mongod reachable for query plan checks")
+
+    db_name = f"strokecare_explain_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    try:
+        coll = explain_queries.seed_database(db, 5000)
+        yield db, coll
+    finally:
+        client.drop_database(db_name)
+        client.close()
+
+
+def test_patient_queries_use_indexes(seeded_db):
+    db, coll = seeded_db
+
+    reports = explain_queries.run_checks(db, coll, max_ratio=3)
+
+    failed = [r for r in reports if r["problems"]]
+    assert not failed, format_report(reports)
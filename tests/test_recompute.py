@@ -0,0 +1,235 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_recompute.py
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+from bson import ObjectId
+
+from app.ml import predict_service
+
+
+class FakePatients:
+    """Just enough of a pymongo Collection for the recompute job."""
+
+    def __init__(self, docs, crash_after_writes: int | None = None) -> None:
+        self.docs = {d["_id"]: d for d in docs}
+        self.writes = []
+        self.crash_after_writes = crash_after_writes
+
+    def find(self, query, projection=None):
+        cond = query.get("_id", {})
+        matched = [
+            d for oid, d in sorted(self.docs.items())
+            if d["system_metadata"]["is_active"]
+            and ("$gt" not in cond or oid > cond["$gt"])
+            and ("$gte" not in cond or oid >= cond["$gte"])
+            and ("$lt" not in cond or oid < cond["$lt"])
+        ]
+        return FakeCursor(matched)
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        # Only the $bucketAuto plan used by plan_partitions
+        n = pipeline[-1]["$bucketAuto"]["buckets"]
+        ids = sorted(oid for oid, d in self.docs.items() if d["system_metadata"]["is_active"])
+        size = -(-len(ids) // n)
+        return [
+            {"_id": {"min": ids[i], "max": ids[min(i + size, len(ids) - 1)]}}
+            for i in range(0, len(ids), size)
+        ]
+
+    def bulk_write(self, operations, ordered=True):
+        if self.crash_after_writes is not None and len(self.writes) >= self.crash_after_writes:
+            raise RuntimeError("simulated crash")
+        self.writes.append(operations)
+        for op in operations:
+            doc = self.docs[op._filter["_id"]]
+            for path, value in op._doc["$set"].items():
+                target = doc
+                *parents, leaf = path.split(".")
+                for key in parents:
+                    target = target.setdefault(key, {})
+                target[leaf] = value
+
+
+class FakeCursor(list):
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+
+def _patients(n: int) -> list:
+    return [
+        {
+            "_id": ObjectId(),
+            "demographics": {"gender": "Female", "age": 30 + i},
+            "medical_history": {"avg_glucose_level": 90.0 + i, "bmi": 24.0},
+            "system_metadata": {"is_active": True},
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def recompute(tiny_model_bundle, monkeypatch):
+    from scripts import compute_ml_for_existing_docs as job
+
+    def use(coll):
+        monkeypatch.setattr(job, "get_patient_collection", lambda: coll)
+        return job
+
+    return use
+
+
+def test_recompute_only_touches_changed_patients(recompute, tmp_path, monkeypatch):
+    coll = FakePatients(_patients(25))
+    job = recompute(coll)
+    checkpoint = tmp_path / "checkpoint.json"
+
+    first = job.run_recompute(batch_size=10, checkpoint_path=checkpoint)
+    assert first["updated"] == 25 and first["skipped"] == 0
+    assert not checkpoint.exists()  # clean finish
+
+    # Nothing changed → nothing scored or written
+    coll.writes.clear()
+    second = job.run_recompute(batch_size=10, checkpoint_path=checkpoint)
+    assert second["updated"] == 0 and second["skipped"] == 25
+    assert coll.writes == []
+
+    # One patient's features change → only that one is rewritten
+    changed = next(iter(coll.docs.values()))
+    changed["demographics"]["age"] = 88
+    third = job.run_recompute(batch_size=10, checkpoint_path=checkpoint)
+    assert third["updated"] == 1
+    assert changed["risk_assessment"]["feature_hash"] == job.feature_hash(
+        predict_service.build_features_from_patient_doc(changed)
+    )
+
+    # A new model version rescored everything
+    monkeypatch.setattr(
+        predict_service, "_ACTIVE", replace(predict_service._ACTIVE, sha256="retrained-model")
+    )
+    fourth = job.run_recompute(batch_size=10, checkpoint_path=checkpoint)
+    assert fourth["updated"] == 25
+    assert {d["risk_assessment"]["model_version"] for d in coll.docs.values()} == {"retrained-mo"}
+
+
+def test_recompute_resumes_from_checkpoint(recompute, tmp_path):
+    coll = FakePatients(_patients(25), crash_after_writes=2)
+    job = recompute(coll)
+    checkpoint = tmp_path / "checkpoint.json"
+
+    with pytest.raises(RuntimeError):
+        job.run_recompute(batch_size=10, checkpoint_path=checkpoint)
+    assert checkpoint.exists()
+
+    # Resume: only the unfinished tail is scanned again
+    coll.crash_after_writes = None
+    stats = job.run_recompute(batch_size=10, checkpoint_path=checkpoint, force=True)
+    assert stats["scanned"] == 25
+    assert [len(ops) for ops in coll.writes] == [10, 10, 5]
+    assert all("model_version" in d["risk_assessment"] for d in coll.docs.values())
+
+
+def test_partitions_cover_every_patient_exactly_once(recompute):
+    coll = FakePatients(_patients(23))
+    job = recompute(coll)
+
+    plan = job.plan_partitions(coll, 4)
+    assert len(plan) == 4
+    assert plan[0][0] is None and plan[-1][1] is None  # open outer bounds
+
+    seen = []
+    for i, id_range in enumerate(plan):
+        stats = job.run_recompute(
+            batch_size=5, checkpoint_path=None, id_range=id_range, log=lambda _: None
+        )
+        seen.append(stats["scanned"])
+
+    assert sum(seen) == 23 and min(seen) > 0
+    assert sum(len(ops) for ops in coll.writes) == 23
+    assert job._id_query((1, 9), after=4) == {"$gt": 4, "$lt": 9}
+
+
+@pytest.mark.parametrize("n_patients, expected_partitions", [(11, 2), (1, 1)])
+def test_run_partitioned_with_worker_processes(
+    recompute, app, tmp_path, monkeypatch, n_patients, expected_partitions
+):
+    coll = FakePatients(_patients(n_patients))
+    job = recompute(coll)
+    # fork: the workers inherit the fake collection, model and app
+    monkeypatch.setattr(job, "MP_START_METHOD", "fork")
+    monkeypatch.setattr(job, "create_app", lambda: app)
+    checkpoint = tmp_path / "checkpoint.json"
+
+    totals = job.run_partitioned(2, batch_size=5, checkpoint_path=checkpoint)
+
+    assert totals["failed_partitions"] == {}
+    assert totals["scanned"] == totals["updated"] == n_patients
+    assert len(job.plan_partitions(coll, 2)) == expected_partitions
+    assert not checkpoint.with_suffix(".plan.json").exists()
+
+
+def test_short_saved_plan_is_reused(recompute, app, tmp_path, monkeypatch):
+    from bson import json_util
+
+    coll = FakePatients(_patients(1))
+    job = recompute(coll)
+    monkeypatch.setattr(job, "MP_START_METHOD", "fork")
+    monkeypatch.setattr(job, "create_app", lambda: app)
+    checkpoint = tmp_path / "checkpoint.json"
+
+    # plan of an interrupted 3-process run over one patient: one partition
+    plan = job.plan_partitions(coll, 3)
+    assert len(plan) == 1
+    checkpoint.with_suffix(".plan.json").write_text(
+        json_util.dumps(
+            {
+                "model_version": predict_service._ensure_model_loaded().version,
+                "processes": 3,
+                "partitions": plan,
+            }
+        )
+    )
+
+    replans = []
+    monkeypatch.setattr(job, "plan_partitions", lambda *args: replans.append(args) or plan)
+    totals = job.run_partitioned(3, batch_size=5, checkpoint_path=checkpoint)
+
+    assert replans == []
+    assert totals["scanned"] == 1 and totals["failed_partitions"] == {}
+
+
+def test_rescoring_keeps_legacy_only_factors(recompute):
+    job = recompute(FakePatients([]))
+    (doc,) = _patients(1)
+    doc["risk_assessment"] = {"_level": "Low", "_score": 0.05, "_flag": 0, "_factors": ["age"]}
+    doc["risk_label"] = "Low"
+
+    (op,) = job._updates_for_batch([doc], "model-v", force=False)
+    risk = op._doc["$set"]["risk_assessment"]
+
+    assert risk["factors"] == ["age"]
+    assert risk["feature_hash"] == job.feature_hash(
+        predict_service.build_features_from_patient_doc(doc)
+    )
+    assert not any(key.startswith("_") for key in risk)
+    assert op._doc["$set"]["schema_version"] == 2
+    assert "risk_label" in op._doc["$unset"]
@@ -0,0 +1,251 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_risk_schema.py
+from __future__ import annotations
+
+import copy
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.db.risk_schema import (
+    CURRENT_SCHEMA_VERSION,
+    canonical_risk,
+    migration_update,
+    risk_of,
+)
+
+
+# --------------------------------------------------
+# Read adapter
+# --------------------------------------------------
+def test_canonical_risk_reads_every_legacy_shape():
+    plain = {"risk_assessment": {"level": "High", "score": 0.41, "calculated_at": "t"}}
+    underscore = {"risk_assessment": {"_level": "Medium", "_score": 0.2, "_factors": ["bmi"]}}
+    flat = {"name": "Ada", "risk_label": "Low", "risk_score": "0.05"}
+    probability_only = {"risk_assessment": {"probability": 0.35}}
+
+    assert canonical_risk(plain) == {
+        "level": "High", "score": 0.41, "flag": 0, "factors": [], "calculated_at": "t",
+    }
+    assert canonical_risk(underscore)["factors"] == ["bmi"]
+    assert "_level" not in canonical_risk(underscore)
+    assert risk_of(underscore) == ("Medium", 0.2)
+    assert risk_of(flat) == ("Low", 0.05)
+    assert risk_of(probability_only) == ("High", 0.35)  # model thresholds
+    assert risk_of({}) == ("Unknown", 0.0)
+
+
+def test_plain_keys_win_over_underscore_keys():
+    # doctor edits wrote level/score; _level/_score were left stale
+    doc = {"risk_assessment": {"level": "Low", "score": 0.05, "_level": "High", "_score": 0.9}}
+
+    assert risk_of(doc) == ("Low", 0.05)
+
+
+def test_unexpected_label_becomes_unknown():
+    assert risk_of({"risk_assessment": {"level": "Severe", "score": 0.5}}) == ("Unknown", 0.5)
+
+
+def test_migrated_documents_are_read_directly():
+    doc = {
+        "schema_version": CURRENT_SCHEMA_VERSION,
+        "risk_assessment": {"level": "Medium", "score": 0.15},
+    }
+
+    assert risk_of(doc) == ("Medium", 0.15)
+
+
+def test_migration_update_replaces_risk_and_drops_flat_fields():
+    update = migration_update({"risk_label": "High", "probability": 0.7})
+
+    assert update["$set"]["schema_version"] == CURRENT_SCHEMA_VERSION
+    assert update["$set"]["risk_assessment"]["level"] == "High"
+    assert set(update["$unset"]) == {"risk_label", "risk_level", "risk_score", "probability"}
+
+
+# --------------------------------------------------
+# Migration job
+# --------------------------------------------------
+class FakePatients:
+    """Just enough of a pymongo Collection for scripts.migrate_risk_schema."""
+
+    def __init__(self, docs, crash_after_writes: int | None = None, on_write=None) -> None:
+        self.docs = {d["_id"]: d for d in docs}
+        self.writes = []
+        self.crash_after_writes = crash_after_writes
+        self.on_write = on_write
+
+    def _pending(self, query):
+        cond = query.get("_id", {})
+        return [
+            d for oid, d in sorted(self.docs.items())
+            if d.get("schema_version") != CURRENT_SCHEMA_VERSION
+            and ("$gt" not in cond or oid > cond["$gt"])
+        ]
+
+    def find(self, query, projection=None):
+        return FakeCursor(copy.deepcopy(d) for d in self._pending(query))
+
+    def count_documents(self, query):
+        return len(self._pending(query))
+
+    def bulk_write(self, operations, ordered=True):
+        if self.crash_after_writes is not None and len(self.writes) >= self.crash_after_writes:
+            raise RuntimeError("simulated crash")
+        if self.on_write is not None:
+            self.on_write(self)
+        self.writes.append(operations)
+
+        matched = 0
+        for op in operations:
+            guard = op._filter
+            doc = self.docs[guard["_id"]]
+            if doc.get("schema_version") == CURRENT_SCHEMA_VERSION:
+                continue
+            expected = guard["risk_assessment"]
+            if expected == {"$exists": False} and "risk_assessment" in doc:
+                continue
+            if expected != {"$exists": False} and doc.get("risk_assessment") != expected:
+                continue
+
+            matched += 1
+            doc.update(op._doc["$set"])
+            for key in op._doc["$unset"]:
+                doc.pop(key, None)
+        return SimpleNamespace(matched_count=matched)
+
+
+class FakeCursor(list):
+    def sort(self, *args):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+
+def _legacy_patients(n: int) -> list:
+    shapes = [
+        lambda: {"risk_assessment": {"level": "High", "score": 0.4}},
+        lambda: {"risk_assessment": {"_level": "Low", "_score": 0.02}},
+        lambda: {"risk_label": "Medium", "probability": 0.2},
+    ]
+    return [{"_id": ObjectId(), **shapes[i % 3]()} for i in range(n)]
+
+
+@pytest.fixture
+def migration(monkeypatch):
+    from scripts import migrate_risk_schema as job
+
+    def use(coll):
+        monkeypatch.setattr(job, "get_patient_collection", lambda: coll)
+        return job
+
+    return use
+
+
+def test_migration_rewrites_every_shape(migration, tmp_path):
+    coll = FakePatients(_legacy_patients(25))
+    job = migration(coll)
+
+    stats = job.run_migration(batch_size=10, checkpoint_path=tmp_path / "cp.json", log=lambda _: None)
+
+    assert stats["migrated"] == 25 and stats["remaining"] == 0
+    for doc in coll.docs.values():
+        assert doc["schema_version"] == CURRENT_SCHEMA_VERSION
+        assert set(doc["risk_assessment"]) == {"level", "score", "flag", "factors", "calculated_at"}
+        assert "risk_label" not in doc and "probability" not in doc
+
+    # Nothing left to do on a re-run
+    coll.writes.clear()
+    job.run_migration(batch_size=10, checkpoint_path=tmp_path / "cp.json", log=lambda _: None)
+    assert coll.writes == []
+
+
+def test_migration_never_overwrites_a_concurrent_edit(migration, tmp_path):
+    docs = _legacy_patients(5)
+    target = docs[1]["_id"]  # _level/_score shape
+
+    def doctor_edits_once(coll):
+        doc = coll.docs[target]
+        if doc["risk_assessment"].get("level") != "High":
+            doc["risk_assessment"] = {"level": "High", "score": 0.9}
+
+    coll = FakePatients(docs, on_write=doctor_edits_once)
+    stats = migration(coll).run_migration(
+        batch_size=10, checkpoint_path=tmp_path / "cp.json", log=lambda _: None
+    )
+
+    assert stats["passes"] == 2 and stats["remaining"] == 0
+    assert coll.docs[target]["risk_assessment"]["level"] == "High"
+    assert coll.docs[target]["risk_assessment"]["score"] == 0.9
+
+
+def test_migration_resumes_from_checkpoint(migration, tmp_path):
+    coll = FakePatients(_legacy_patients(25), crash_after_writes=2)
+    job = migration(coll)
+    checkpoint = tmp_path / "cp.json"
+
+    with pytest.raises(RuntimeError):
+        job.run_migration(batch_size=10, checkpoint_path=checkpoint, log=lambda _: None)
+    assert checkpoint.exists()
+
+    coll.crash_after_writes = None
+    coll.writes.clear()
+    stats = job.run_migration(batch_size=10, checkpoint_path=checkpoint, log=lambda _: None)
+
+    assert len(coll.writes) == 1  # only the last 5 documents
+    assert stats["migrated"] == 25 and stats["remaining"] == 0
+
+
+# --------------------------------------------------
+# Writers
+# --------------------------------------------------
+def test_doctor_risk_update_keeps_legacy_risk_fields(client, monkeypatch, create_user):
+    from app.forms import LoginForm
+    from app.routes import doctor as doctor_routes
+
+    oid = ObjectId()
+    stored = {
+        "_id": oid,
+        "system_metadata": {"is_active": True},
+        "risk_assessment": {"_level": "Low", "_score": 0.1, "_flag": 1, "_factors": ["age"]},
+    }
+    updates = []
+
+    class FakePatients:
+        def find_one(self, query, *args):
+            return copy.deepcopy(stored) if query["_id"] == oid else None
+
+        def update_one(self, query, update):
+            updates.append(update)
+
+    monkeypatch.setattr(doctor_routes, "get_patient_collection", lambda: FakePatients())
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+
+    doctor = create_user(email="doc@stroke.test", password="Password123!", role="doctor")
+    with client:
+        client.post("/auth/login", data={"email": doctor.email, "password": "Password123!"})
+        resp = client.post(f"/doctor/patients/{oid}/risk", data={"risk_label": "High", "risk_score": "0.7"})
+
+    assert resp.status_code == 302
+    (update,) = updates
+    risk = update["$set"]["risk_assessment"]
+    assert update["$set"]["schema_version"] == CURRENT_SCHEMA_VERSION
+    assert (risk["level"], risk["score"]) == ("High", 0.7)
+    assert (risk["flag"], risk["factors"]) == (1, ["age"])
+    assert not any(key.startswith("_") for key in risk)
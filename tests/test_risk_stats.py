@@ -0,0 +1,85 @@
+'''
+===========================================================
+StrokeCare Web Application — Secure Software Development
+Author: Vishvapriya Sangvikar
+
+Course: COM7033 – MSc Data Science & Artificial Intelligence
+Student ID: 2415083
+Institution: Leeds Trinity University
+Assessment: Assessment 1 – Software Artefact (70%)
+AI Statement: Portions of this file were drafted or refined using
+    generative AI for planning and editing only,
+    as permitted in the module brief.
+===========================================================
+'''
+
+# tests/test_risk_stats.py
+from __future__ import annotations
+
+from app.db.risk_stats import ACTIVE_FILTER, risk_distribution
+
+
+class FakePatients:
+    """Evaluates the $match / $group pipeline risk_distribution sends."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def count_documents(self, *args, **kwargs):  # pragma: no cover
+        raise AssertionError("risk_distribution must not count per bucket")
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        match, group = pipeline[0]["$match"], pipeline[1]["$group"]
+
+        def active(doc):
+            meta = doc.get("system_metadata", {})
+            if match == ACTIVE_FILTER:
+                return meta.get("is_active") is True
+            return meta.get("is_active", True) is True
+
+        buckets: dict = {}
+        for doc in filter(active, self.docs):
+            risk = doc.get("risk_assessment", {})
+            label = risk.get("level")
+            if label is None:
+                label = risk.get("_level")
+            buckets[label] = buckets.get(label, 0) + 1
+        assert group["count"] == {"$sum": 1}
+        return [{"_id": k, "count": v} for k, v in buckets.items()]
+
+
+def _doc(active=True, **risk):
+    doc = {"risk_assessment": risk}
+    if active is not None:
+        doc["system_metadata"] = {"is_active": active}
+    return doc
+
+
+DOCS = [
+    _doc(level="High"),
+    _doc(_level="High"),                   # unmigrated document
+    _doc(_level="Low", level="High"),      # canonical label wins
+    _doc(level="Medium"),
+    _doc(),                                # not scored yet
+    _doc(level="Severe"),                  # unexpected label
+    _doc(active=False, level="High"),      # archived
+    _doc(active=None, level="Low"),        # no is_active flag
+]
+
+
+def test_risk_distribution_counts_every_bucket_in_one_aggregation():
+    coll = FakePatients(DOCS)
+
+    counts = risk_distribution(coll)
+
+    assert len(coll.pipelines) == 1
+    assert counts == {"Low": 0, "Medium": 1, "High": 3, "Unknown": 2, "total": 6}
+
+
+def test_risk_distribution_can_include_unflagged_documents():
+    counts = risk_distribution(FakePatients(DOCS), include_unflagged=True)
+
+    assert counts["Low"] == 1
+    assert counts["total"] == 7
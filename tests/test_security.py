@@ -187,3 +187,24 @@ def test_basic_rate_limit_smoke(app):
     assert "RATELIMIT_DEFAULT" in app.config
     assert isinstance(app.config["RATELIMIT_DEFAULT"], str)
     assert app.config["RATELIMIT_DEFAULT"]
+
+
+def test_debug_counters_are_admin_only(client, monkeypatch, create_user, create_admin_user):
+    monkeypatch.setattr(LoginForm, "validate_on_submit", lambda self: True, raising=True)
+    doctor = create_user(email="doc@stroke.test", password="Password123!", role="doctor")
+    admin = create_admin_user()
+
+    urls = ["/debug/mongo/pool", "/debug/ml/cache", "/debug/ml/model", "/debug/ml/batcher", "/debug/audit"]
+
+    for url in urls:
+        resp = client.get(url)
+        assert resp.status_code in (302, 303), url
+        assert "/auth/login" in resp.headers.get("Location", "")
+
+    with client:
+        client.post("/auth/login", data={"email": doctor.email, "password": "Password123!"})
+        assert [client.get(url).status_code for url in urls] == [403] * len(urls)
+        client.get("/auth/logout")
+
+        client.post("/auth/login", data={"email": admin.email, "password": "AdminPass123!"})
+        assert [client.get(url).status_code for url in urls] == [200] * len(urls)